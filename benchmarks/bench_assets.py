@@ -0,0 +1,52 @@
+# benchmarks/bench_assets.py
+"""Screen construction with the shared AssetManager vs per-screen loading.
+
+app.py builds a new Menu on every pass through its main loop. Before the
+AssetManager each construction decoded menu_bg.png, rescaled it and looked
+up the system font again; now only the first one does.
+
+Run from the repository root:  python -m benchmarks.bench_assets
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import config
+from client.assets import assets
+from client.ui.menu import Menu
+from client.ui.setting_menu import SettingsMenu
+
+
+def _legacy_menu_assets():
+    """What Menu.__init__ loaded before the AssetManager."""
+    bg = pygame.image.load("client/data/assets/images/menu_bg.png").convert_alpha()
+    pygame.transform.scale(bg, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+    pygame.font.SysFont(config.FONT_NAME, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+
+
+def _ms(fn, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) * 1e3 / repeat
+
+
+def main():
+    pygame.init()
+    print(f"{'resolution':>11} {'legacy ms':>10} {'first ms':>9} {'repeat ms':>10}")
+    for width, height in SettingsMenu(pygame.display.set_mode((800, 600))).resolutions:
+        config.SCREEN_WIDTH, config.SCREEN_HEIGHT = width, height
+        screen = pygame.display.set_mode((width, height))
+        legacy_ms = _ms(_legacy_menu_assets, repeat=5)
+        assets.clear()
+        first_ms = _ms(Menu, screen)
+        repeat_ms = _ms(Menu, screen, repeat=100)
+        print(f"{width:>5}x{height:<5} {legacy_ms:>10.2f} {first_ms:>9.2f} {repeat_ms:>10.4f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
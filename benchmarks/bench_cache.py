@@ -0,0 +1,64 @@
+# benchmarks/bench_cache.py
+"""Screen startup work with an empty vs a warm on-disk UI cache.
+
+Times what Login and CharacterSelection derive from their assets at start
+(scaled backgrounds, field rects, slot masks) at each settings resolution.
+"cold" runs against an empty cache directory and includes writing the
+entries; "warm" reloads them.
+
+Run from the repository root:  python -m benchmarks.bench_cache
+"""
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import cache
+from client.ui.setting_menu import SettingsMenu
+
+LOGIN_WINDOW = "client/data/assets/images/login_window.png"
+LOGIN_MASK = "client/data/assets/images/login_window_mask.png"
+LOGIN_BG = "client/data/assets/images/menu_bg.png"
+LOGIN_COLORS = [(0, 0, 255), (0, 255, 255), (0, 255, 0), (255, 0, 0)]
+SELECTION_BG = "client/data/assets/images/character_selection.png"
+SELECTION_MASK = "client/data/assets/images/character_selection_mask.png"
+SELECTION_COLORS = {(0, 128, 0): "start_btn", (176, 224, 230): "slot",
+                    (255, 0, 0): "return_btn", (0, 0, 255): "delete_btn"}
+
+
+def _startup(size, window_size):
+    cache.load_scaled(LOGIN_BG, size)
+    cache.cached_color_bounds(LOGIN_MASK, window_size, LOGIN_COLORS)
+    cache.load_scaled(SELECTION_BG, size)
+    cache.cached_regions(SELECTION_MASK, size, SELECTION_COLORS, split=("slot",))
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1e3
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    resolutions = SettingsMenu(screen).resolutions
+    window_w, window_h = pygame.image.load(LOGIN_WINDOW).get_size()
+
+    print(f"{'resolution':>11} {'cold ms':>9} {'warm ms':>9} {'speedup':>8}")
+    for width, height in resolutions:
+        ratio = height * 0.7 / window_h
+        window_size = (int(window_w * ratio), int(window_h * ratio))
+        with tempfile.TemporaryDirectory() as directory:
+            cache.ui_cache = cache.DiskCache(directory, 1 << 30)
+            cold_ms = _timed(_startup, (width, height), window_size)
+            warm_ms = _timed(_startup, (width, height), window_size)
+        print(f"{width:>5}x{height:<5} {cold_ms:>9.1f} {warm_ms:>9.1f} {cold_ms / warm_ms:>7.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_codecs.py
+"""Encode/decode throughput and bytes per message for each wire codec.
+
+Run from the repository root:  python -m benchmarks.bench_codecs
+"""
+import time
+
+from network import protocol
+from network.protocol import JsonLineCodec, MsgpackCodec
+
+MESSAGES = {
+    "login": {"action": "login", "data": {"username": "adventurer", "password": "hunter22"}},
+    "character_list": {
+        "action": "character_list",
+        "user": {"id": 42, "username": "adventurer"},
+        "characters": [
+            {"id": i, "name": f"Hero{i}", "stats": {"Level": 10 + i, "HP": 250, "MP": 80, "STR": 12, "DEX": 9}}
+            for i in range(6)
+        ],
+    },
+    "move": {"action": "move", "data": {"x": 1024.5, "y": 377.25}},
+    "stat_update": {"action": "stat_update", "data": {"id": 42, "hp": 231, "mp": 64}},
+}
+
+
+def _measure(codec, message, n):
+    framer = codec.new_framer()
+    start = time.perf_counter()
+    for _ in range(n):
+        data = codec.encode(message)
+    encode_s = time.perf_counter() - start
+
+    framer.feed(data * n)
+    start = time.perf_counter()
+    for frame in framer.drain():
+        codec.decode(frame)
+    decode_s = time.perf_counter() - start
+    return len(data), n / encode_s, n / decode_s
+
+
+def main(n=20_000):
+    codecs = [("json", JsonLineCodec())]
+    if protocol.msgpack is not None:
+        codecs.append(("msgpack (C)", MsgpackCodec()))
+    codecs.append(("msgpack (py)", MsgpackCodec()))
+
+    print(f"{'message':<15} {'codec':<13} {'bytes':>6} {'encode/s':>11} {'decode/s':>11}")
+    for name, message in MESSAGES.items():
+        for label, codec in codecs:
+            saved = protocol.msgpack
+            if label.endswith("(py)"):
+                protocol.msgpack = None
+            try:
+                size, enc, dec = _measure(codec, message, n)
+            finally:
+                protocol.msgpack = saved
+            print(f"{name:<15} {label:<13} {size:>6} {enc:>11,.0f} {dec:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_compression.py
+"""CPU cost of stream compression against the bandwidth it saves.
+
+Replays a message trace through each stream compression as the writer
+thread would: messages are encoded with the wire codec and grouped into
+batches, and each batch becomes one chunk (raw below the threshold,
+otherwise compressed with a sync flush). The receiving side unwraps
+every chunk again. Per setting it prints the wire bytes, the share
+saved against uncompressed frames, and the CPU time both ends spent
+per MB of messages, for each threshold in THRESHOLDS.
+
+The trace is a recorded session: one JSON message per line, as logged
+with the "network" logger at DEBUG and cleaned up, given as the first
+argument. Without one, a session is generated: login with a character
+list, character creation and deletion, then a stream of stat_update,
+state_delta and chat messages.
+
+Run from the repository root:  python -m benchmarks.bench_compression [trace.jsonl]
+"""
+import json
+import random
+import sys
+import time
+
+from network.protocol import (
+    COMPRESSORS, CompressedFramer, JsonLineCodec, MsgpackCodec, ZlibStream, ZstdStream,
+)
+
+BATCH_SIZES = (1, 8)
+THRESHOLDS = (32, 256)
+
+
+def generated_trace(count=20_000, seed=5):
+    rng = random.Random(seed)
+    characters = [{"id": i, "name": f"Hero{i}", "stats": {"Level": rng.randrange(1, 60), "HP": 100, "MP": 50,
+                                                          "guild": rng.choice([None, "Night Watch"])}}
+                  for i in range(1, 7)]
+    trace = [
+        {"action": "login", "data": {"username": "tester01", "password": "secret99"}},
+        {"action": "character_list", "user": {"id": 7, "username": "tester01"}, "session_token": "tok-4f2a",
+         "characters": characters},
+        {"action": "create_character", "data": {"name": "NewHero"}},
+        {"action": "character_created", "character": {"id": 7, "name": "NewHero", "stats": {"Level": 1}}},
+        {"action": "delete_character", "data": {"char_id": 3}},
+    ]
+    version = 1
+    while len(trace) < count:
+        roll = rng.random()
+        if roll < 0.6:
+            trace.append({"action": "stat_update", "data": {"id": rng.randrange(1, 7),
+                                                            "hp": rng.randrange(100), "mp": rng.randrange(50)}})
+        elif roll < 0.9:
+            version += 1
+            trace.append({"action": "state_delta", "version": version, "base": version - 1,
+                          "update": [{"id": rng.randrange(1, 7), "stats": {"HP": rng.randrange(100)}}]})
+        else:
+            trace.append({"action": "chat", "data": {"from": f"Hero{rng.randrange(1, 7)}",
+                                                     "text": rng.choice(["hello", "on my way", "need heals",
+                                                                         "gg", "meet at the gate"])}})
+    return trace
+
+
+def load_trace(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _batches(codec, trace, size):
+    frames = [codec.encode(message) for message in trace]
+    return [b"".join(frames[i:i + size]) for i in range(0, len(frames), size)]
+
+
+def _run(stream_factory, threshold, codec, batches):
+    sender, receiver = stream_factory(threshold), stream_factory(threshold)
+    framer = CompressedFramer(codec.new_framer(), receiver)
+    start = time.process_time()
+    wire = 0
+    for batch in batches:
+        chunk = sender.wrap(batch)
+        wire += len(chunk)
+        framer.feed(chunk)
+        framer.drain()
+    return wire, time.process_time() - start
+
+
+def main():
+    trace = load_trace(sys.argv[1]) if len(sys.argv) > 1 else generated_trace()
+    settings = [
+        ("zlib level 1", lambda threshold: ZlibStream(threshold, level=1)),
+        ("zlib level 6", lambda threshold: ZlibStream(threshold, level=6)),
+    ]
+    if "zstd" in COMPRESSORS:
+        settings += [
+            ("zstd level 1", lambda threshold: ZstdStream(threshold, level=1)),
+            ("zstd level 3", lambda threshold: ZstdStream(threshold, level=3)),
+        ]
+    else:
+        print("zstandard is not installed; zstd skipped")
+
+    print(f"{len(trace)} messages")
+    print(f"{'codec':>8} {'batch':>5} {'threshold':>9} {'setting':>13} {'wire KB':>9} {'saved':>6} {'CPU ms/MB':>10}")
+    for codec in (JsonLineCodec(), MsgpackCodec()):
+        for size in BATCH_SIZES:
+            batches = _batches(codec, trace, size)
+            raw = sum(map(len, batches))
+            print(f"{codec.name:>8} {size:>5} {'-':>9} {'none':>13} {raw / 1024:>9.0f} {'-':>6} {'-':>10}")
+            for threshold in THRESHOLDS:
+                for name, factory in settings:
+                    wire, cpu = _run(factory, threshold, codec, batches)
+                    print(f"{codec.name:>8} {size:>5} {threshold:>9} {name:>13} {wire / 1024:>9.0f} "
+                          f"{1 - wire / raw:>6.0%} {cpu * 1000 / (raw / 1e6):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_connect.py
+"""How long connecting keeps the caller waiting.
+
+The server has two addresses and the first one is dead: a listener
+whose backlog is full, so connecting to it hangs like a dropped IPv6
+route does. Per strategy it prints how long until a socket is connected:
+
+- "in order": each address in turn with the whole timeout, what a
+  plain ``socket.create_connection`` does
+- "happy eyeballs": ``open_connection``, the next address starting
+  ATTEMPT_DELAY after the previous one
+
+Then the cost of resolving the host, uncached and from ``AddressCache``,
+and how long ``GameClient.connect`` and ``connect_async`` block the
+calling (UI) thread while the server takes ACCEPT_DELAY to answer.
+
+Run from the repository root:  python -m benchmarks.bench_connect
+"""
+import socket
+import threading
+import time
+
+from network.client import GameClient
+from network.connect import AddressCache, open_connection
+
+TIMEOUT = 2.0
+ATTEMPT_DELAY = 0.25
+ACCEPT_DELAY = 0.5
+
+
+def _stalled_listener():
+    server = socket.create_server(("127.0.0.1", 0), backlog=0)
+    filler = socket.create_connection(server.getsockname())
+    return server, filler
+
+
+def _in_order(infos):
+    for family, type_, proto, _, sockaddr in infos:
+        sock = socket.socket(family, type_, proto)
+        sock.settimeout(TIMEOUT)
+        try:
+            sock.connect(sockaddr)
+            return sock
+        except OSError:
+            sock.close()
+    raise ConnectionError("no address connected")
+
+
+def _slow_server():
+    """Listener that answers the codec handshake ACCEPT_DELAY after each connection."""
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            time.sleep(ACCEPT_DELAY)
+            conn.recv(4096)
+            conn.sendall(b'{"action": "hello_ok", "codec": "json"}\n')
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server
+
+
+def main():
+    stalled, filler = _stalled_listener()
+    working = socket.create_server(("127.0.0.1", 0))
+    infos = [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", stalled.getsockname()),
+             (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", working.getsockname())]
+    cache = AddressCache()
+    cache.put("game.test", 5000, infos)
+
+    print(f"First of two addresses dead, {TIMEOUT:.0f} s timeout")
+    start = time.perf_counter()
+    _in_order(infos).close()
+    print(f"{'in order':>16}: {(time.perf_counter() - start) * 1000:7.0f} ms")
+    start = time.perf_counter()
+    open_connection("game.test", 5000, TIMEOUT, ATTEMPT_DELAY, cache=cache).close()
+    print(f"{'happy eyeballs':>16}: {(time.perf_counter() - start) * 1000:7.0f} ms")
+    for sock in (stalled, filler, working):
+        sock.close()
+
+    print("\nResolving localhost")
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        socket.getaddrinfo("localhost", 5000, type=socket.SOCK_STREAM)
+    print(f"{'getaddrinfo':>16}: {(time.perf_counter() - start) / runs * 1e6:7.1f} µs")
+    cache = AddressCache()
+    start = time.perf_counter()
+    for _ in range(runs):
+        cache.resolve("localhost", 5000)
+    print(f"{'AddressCache':>16}: {(time.perf_counter() - start) / runs * 1e6:7.1f} µs")
+
+    print(f"\nServer answering {ACCEPT_DELAY * 1000:.0f} ms after connect; time the caller is blocked")
+    server = _slow_server()
+    host, port = server.getsockname()
+    for name in ("connect", "connect_async"):
+        client = GameClient(host, port, codecs=("msgpack", "json"), auto_reconnect=False)
+        start = time.perf_counter()
+        result = getattr(client, name)()
+        blocked = time.perf_counter() - start
+        if result is not None:
+            result.result(timeout=5)
+        print(f"{name:>16}: {blocked * 1000:7.1f} ms")
+        client.close()
+    server.close()
+
+
+if __name__ == "__main__":
+    main()
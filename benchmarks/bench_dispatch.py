@@ -0,0 +1,71 @@
+# benchmarks/bench_dispatch.py
+"""Server messages handed to the UI thread during a burst.
+
+A producer thread posts BURST stat_update messages as fast as it can,
+standing in for the client's receive thread, while the "UI" drains the
+MessageDispatcher once per simulated frame with the configured budget.
+For each inbox size it prints the post rate, the worst per-frame drain
+time, the largest backlog seen between frames and how many messages
+were dropped. For comparison, "unbounded queue" is the previous
+queue.Queue the receive thread filled and nothing read: its size after
+the burst is memory the client never gets back.
+
+Run from the repository root:  python -m benchmarks.bench_dispatch
+"""
+import queue
+import threading
+import time
+
+from client import config
+from network.dispatcher import MessageDispatcher
+
+BURST = 200_000
+MESSAGE = {"action": "stat_update", "data": {"id": 42, "hp": 231, "mp": 64}}
+
+
+def _producer(post, started, done):
+    started.wait()
+    t0 = time.perf_counter()
+    for _ in range(BURST):
+        post(MESSAGE)
+    done.append(BURST / (time.perf_counter() - t0))
+
+
+def _run(inbox_size, budget):
+    dispatcher = MessageDispatcher(inbox_size)
+    handled = []
+    dispatcher.subscribe("stat_update", handled.append)
+    started, done = threading.Event(), []
+    thread = threading.Thread(target=_producer, args=(dispatcher.post, started, done))
+    thread.start()
+    started.set()
+
+    worst_ms, backlog = 0.0, 0
+    while thread.is_alive() or len(dispatcher):
+        backlog = max(backlog, len(dispatcher))
+        t0 = time.perf_counter()
+        dispatcher.drain(budget)
+        worst_ms = max(worst_ms, (time.perf_counter() - t0) * 1000)
+        time.sleep(0.001)  # the rest of the frame
+    thread.join()
+    return done[0], worst_ms, backlog, dispatcher.dropped, len(handled)
+
+
+def main():
+    budget = config.NETWORK_MESSAGES_PER_FRAME
+    print(f"{BURST} messages, {budget} per frame")
+
+    unbounded = queue.Queue()
+    t0 = time.perf_counter()
+    for _ in range(BURST):
+        unbounded.put(MESSAGE)
+    rate = BURST / (time.perf_counter() - t0)
+    print(f"{'inbox':>16} {'posts/s':>10} {'worst drain ms':>15} {'max backlog':>12} {'dropped':>8} {'handled':>8}")
+    print(f"{'unbounded queue':>16} {rate:>10.0f} {'-':>15} {unbounded.qsize():>12} {0:>8} {0:>8}")
+    for inbox_size in (256, config.NETWORK_INBOX_SIZE, 16384):
+        rate, worst_ms, backlog, dropped, handled = _run(inbox_size, budget)
+        print(f"{inbox_size:>16} {rate:>10.0f} {worst_ms:>15.3f} {backlog:>12} {dropped:>8} {handled:>8}")
+
+
+if __name__ == "__main__":
+    main()
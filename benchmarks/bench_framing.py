@@ -0,0 +1,76 @@
+# benchmarks/bench_framing.py
+"""Per-message cost of line framing for large server bursts.
+
+Run from the repository root:  python -m benchmarks.bench_framing
+"""
+import json
+import time
+
+from network.protocol import LineFramer
+
+
+class _BurstSocket:
+    """Replays a pre-built byte stream through recv/recv_into in fixed-size reads."""
+
+    def __init__(self, payload, chunk):
+        self.payload = memoryview(payload)
+        self.chunk = chunk
+        self.pos = 0
+
+    def recv(self, n):
+        data = self.payload[self.pos:self.pos + n]
+        self.pos += len(data)
+        return bytes(data)
+
+    def recv_into(self, buf, n=0):
+        n = min(n or len(buf), len(self.payload) - self.pos)
+        buf[:n] = self.payload[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+
+def _string_concat(sock):
+    """The original GameClient._receive_loop framing."""
+    count = 0
+    buffer = ""
+    while True:
+        data = sock.recv(sock.chunk)
+        if not data:
+            return count
+        buffer += data.decode("utf-8")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            if line.strip():
+                count += 1
+
+
+def _line_framer(sock):
+    count = 0
+    framer = LineFramer(sock.chunk)
+    while framer.recv_into(sock):
+        for line in framer:
+            if line:
+                count += 1
+    return count
+
+
+def _burst(n):
+    msg = {"action": "stat_update", "data": {"id": 1, "hp": 100, "mp": 50, "x": 10.5, "y": -3.25}}
+    return ("\n".join(json.dumps(msg) for _ in range(n)) + "\n").encode("utf-8")
+
+
+def main():
+    print(f"{'chunk':>7} {'messages':>9} {'concat us/msg':>14} {'framer us/msg':>14}")
+    for chunk in (4096, 65536, 1 << 20):
+        for n in (1_000, 10_000, 50_000):
+            payload = _burst(n)
+            row = []
+            for fn in (_string_concat, _line_framer):
+                start = time.perf_counter()
+                assert fn(_BurstSocket(payload, chunk)) == n
+                row.append((time.perf_counter() - start) / n * 1e6)
+            print(f"{chunk:>7} {n:>9} {row[0]:>14.3f} {row[1]:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_game_state.py
+"""Applying 10k state updates: full lists vs versioned deltas.
+
+Each update changes one stat of one character. "full list" is what the
+screens did with ``character_list``: decode the whole list and replace
+the previous one. "delta" decodes a ``state_delta`` naming only that
+character and applies it to GameState in place; "stat_update" is the
+hot-schema message going through the same store. For each roster size it
+prints the bytes on the wire per update, the time per update (decoding
+included) and the peak memory traced while applying them, in a second
+run under tracemalloc.
+
+Run from the repository root:  python -m benchmarks.bench_game_state
+"""
+import json
+import time
+import tracemalloc
+
+from core.game_state import GameState
+
+UPDATES = 10_000
+
+
+def _roster(size):
+    return [{"id": i, "name": f"Hero{i}", "stats": {"Level": i % 60, "HP": 100, "MP": 50, "guild": None}}
+            for i in range(size)]
+
+
+def _full_list_frames(roster):
+    frames = []
+    for n in range(UPDATES):
+        roster[n % len(roster)]["stats"]["HP"] = n
+        frames.append(json.dumps({"action": "character_list", "user": {"id": 1}, "characters": roster}))
+    return frames
+
+
+def _delta_frames(roster, version):
+    return [json.dumps({"action": "state_delta", "version": version + n + 1,
+                        "update": [{"id": n % len(roster), "stats": {"HP": n}}]})
+            for n in range(UPDATES)]
+
+
+def _stat_frames(roster):
+    return [json.dumps({"action": "stat_update", "data": {"id": n % len(roster), "hp": n, "mp": 50}})
+            for n in range(UPDATES)]
+
+
+def _run(apply, frames):
+    for frame in frames:
+        apply(json.loads(frame))
+
+
+def _measure(apply, frames, reset=lambda: None):
+    reset()
+    start = time.perf_counter()
+    _run(apply, frames)
+    elapsed = time.perf_counter() - start
+    reset()
+    tracemalloc.start()
+    _run(apply, frames)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = sum(map(len, frames)) / len(frames)
+    return size, elapsed * 1e6 / len(frames), peak / 1024
+
+
+def main():
+    print(f"{UPDATES} updates of one stat")
+    print(f"{'roster':>6} {'path':>12} {'bytes/update':>13} {'us/update':>10} {'peak KB':>8}")
+    for size in (6, 50, 500):
+        roster = _roster(size)
+        screen = {}
+
+        def replace(message):
+            screen["characters"] = message["characters"]
+
+        state = GameState.from_snapshot({"version": 1, "characters": roster})
+
+        def rewind():  # so the second run's deltas are not duplicates
+            state.version = 1
+
+        results = [
+            ("full list", _measure(replace, _full_list_frames(roster))),
+            ("delta", _measure(state.apply, _delta_frames(roster, 1), rewind)),
+            ("stat_update", _measure(state._on_stat_update, _stat_frames(roster))),
+        ]
+        for name, (nbytes, us, peak) in results:
+            print(f"{size:>6} {name:>12} {nbytes:>13.0f} {us:>10.2f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_hittest.py
+"""Mouse-motion hit-testing: linear scans vs the HitGrid.
+
+Replays a trace of 20,000 MOUSEMOTION positions. The trace is generated
+with a fixed seed: pointer sweeps between random targets with some
+jitter, sampled the way SDL reports motion (every few pixels). It
+replays against two screens:
+
+- "selection": CharacterSelection's regions. "linear" is the old
+  _get_field_at_pos, Mask.get_at on six slot masks then three button
+  masks per event.
+- "menu": the Menu's option rects, a collidepoint loop vs the grid.
+
+Run from the repository root:  python -m benchmarks.bench_hittest
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import config
+from client.ui.character_selection import CharacterSelection
+from client.ui.menu import Menu
+from client.ui.setting_menu import SettingsMenu
+from core.game_state import GameState
+
+EVENTS = 20_000
+
+
+def mouse_trace(width, height, count=EVENTS, seed=7):
+    rng = random.Random(seed)
+    x, y = width // 2, height // 2
+    trace = []
+    while len(trace) < count:
+        tx, ty = rng.randrange(width), rng.randrange(height)
+        steps = max(1, int(((tx - x) ** 2 + (ty - y) ** 2) ** 0.5 / rng.uniform(3, 12)))
+        for step in range(1, steps + 1):
+            px = x + (tx - x) * step // steps + rng.randint(-2, 2)
+            py = y + (ty - y) * step // steps + rng.randint(-2, 2)
+            trace.append((min(max(px, 0), width - 1), min(max(py, 0), height - 1)))
+        x, y = tx, ty
+    return trace[:count]
+
+
+def _selection_linear(selection):
+    slots = selection.masks["slots"]
+    buttons = [(name, selection.masks[name]) for name in ("start_btn", "delete_btn", "return_btn")]
+
+    def field_at(pos):
+        for i, mask in enumerate(slots):
+            if mask.get_at(pos):
+                return f"slot{i}"
+        for name, mask in buttons:
+            if mask.get_at(pos):
+                return name
+        return None
+    return field_at
+
+
+def _menu_linear(menu):
+    def option_at(pos):
+        for i, (_, rect) in enumerate(menu.option_rects):
+            if rect.collidepoint(pos):
+                return i
+        return None
+    return option_at
+
+
+def _us_per_event(query, trace):
+    start = time.perf_counter()
+    for pos in trace:
+        query(pos)
+    return (time.perf_counter() - start) * 1e6 / len(trace)
+
+
+def main():
+    pygame.init()
+    print(f"{EVENTS} motion events")
+    print(f"{'resolution':>11} {'screen':>10} {'linear us':>10} {'grid us':>8}")
+    for width, height in SettingsMenu(pygame.display.set_mode((800, 600))).resolutions:
+        config.SCREEN_WIDTH, config.SCREEN_HEIGHT = width, height
+        screen = pygame.display.set_mode((width, height))
+        trace = mouse_trace(width, height)
+
+        selection = CharacterSelection(screen, GameState(), client=None)
+        menu = Menu(screen)
+        menu.draw()
+        for name, linear, grid in (("selection", _selection_linear(selection), selection.hits.at),
+                                   ("menu", _menu_linear(menu), menu.hits.at)):
+            assert all(linear(pos) == grid(pos) for pos in trace[:2000])
+            print(f"{width:>5}x{height:<5} {name:>10} {_us_per_event(linear, trace):>10.2f} "
+                  f"{_us_per_event(grid, trace):>8.2f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
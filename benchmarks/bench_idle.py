@@ -0,0 +1,80 @@
+# benchmarks/bench_idle.py
+"""CPU use of an idle screen: fixed-FPS loop vs the FrameScheduler.
+
+Each case runs for a few seconds with no input and reports process CPU
+time as a percentage of one core:
+
+- "tick loop": the old Menu.run (full redraw + clock.tick(config.FPS))
+- "busy prompt": the old _confirm_delete (event.get() in a bare while)
+- "menu scene": the current menu run by a SceneManager, retained
+  rendering + FrameScheduler
+- "Login blink": a scheduler loop woken only for a 0.5 s cursor blink
+
+Run from the repository root:  python -m benchmarks.bench_idle [seconds]
+"""
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import config
+from client.ui.menu import Menu
+from client.ui.scenes import SceneManager
+from client.ui.scheduler import FrameScheduler, blink_wake_in
+
+
+def _tick_loop(screen, menu, deadline):
+    clock = pygame.time.Clock()
+    while time.monotonic() < deadline:
+        screen.blit(menu.bg_img, (0, 0))
+        for i, option in enumerate(menu.options):
+            screen.blit(menu.font.render(option, True, (255, 255, 255)), (100, 100 + i * 60))
+        pygame.display.flip()
+        pygame.event.get()
+        clock.tick(config.FPS)
+
+
+def _busy_prompt(screen, menu, deadline):
+    while time.monotonic() < deadline:
+        for event in pygame.event.get():
+            pass
+
+
+def _menu_scene(screen, menu, deadline):
+    menu.selected = menu.options.index("Exit")
+    exit_key = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN)
+    threading.Timer(deadline - time.monotonic(), pygame.event.post, args=(exit_key,)).start()
+    SceneManager(screen).run(menu)
+
+
+def _blink_loop(screen, menu, deadline):
+    frame = FrameScheduler()
+    last_blink = time.time()
+    while time.monotonic() < deadline:
+        if time.time() - last_blink > 0.5:
+            last_blink = time.time()
+        menu.draw()
+        frame.events(wake_in=min(blink_wake_in(last_blink), deadline - time.monotonic()))
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    pygame.init()
+    screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+    print(f"{config.SCREEN_WIDTH}x{config.SCREEN_HEIGHT}, {seconds:.0f} s idle each")
+    for label, fn in (("tick loop", _tick_loop), ("busy prompt", _busy_prompt),
+                      ("menu scene", _menu_scene), ("Login blink", _blink_loop)):
+        menu = Menu(screen)
+        cpu, wall = time.process_time(), time.monotonic()
+        fn(screen, menu, wall + seconds)
+        cpu, wall = time.process_time() - cpu, time.monotonic() - wall
+        print(f"{label:<12} {100 * cpu / wall:6.1f}% CPU")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_input.py
+"""Input handling time per frame with a fast-moving mouse.
+
+Replays the bench_hittest trace on the character selection screen in
+batches of BATCH motion events per frame, roughly what a quick flick
+queues up between two 60 FPS frames. "per event" hit-tests and applies
+every motion event, as the screens' event loops did. "dispatcher" is
+InputDispatcher.dispatch: only the last motion per frame is hit-tested,
+and hover only runs when the region changes. Its own per-frame metric
+(mean_ms) is printed alongside.
+
+Run from the repository root:  python -m benchmarks.bench_input
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from benchmarks.bench_hittest import mouse_trace
+from client import config
+from client.ui.character_selection import CharacterSelection
+from client.ui.scenes import SceneManager
+from client.ui.setting_menu import SettingsMenu
+from core.game_state import GameState
+
+BATCH = 24
+
+
+def _frames(trace):
+    events = [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)) for pos in trace]
+    return [events[i:i + BATCH] for i in range(0, len(events), BATCH)]
+
+
+def _per_event_ms(selection, frames):
+    start = time.perf_counter()
+    for batch in frames:
+        for event in batch:
+            field = selection.hit_test(event.pos)
+            if field:
+                selection.active_field = field
+    return (time.perf_counter() - start) * 1e3 / len(frames)
+
+
+def _dispatcher_ms(manager, frames):
+    start = time.perf_counter()
+    for batch in frames:
+        manager.input.dispatch(manager, batch)
+    return (time.perf_counter() - start) * 1e3 / len(frames)
+
+
+def main():
+    pygame.init()
+    print(f"{BATCH} motion events per frame")
+    print(f"{'resolution':>11} {'per event ms':>13} {'dispatcher ms':>14} {'metric ms':>10} {'hovers':>7}")
+    for width, height in SettingsMenu(pygame.display.set_mode((800, 600))).resolutions:
+        config.SCREEN_WIDTH, config.SCREEN_HEIGHT = width, height
+        screen = pygame.display.set_mode((width, height))
+        frames = _frames(mouse_trace(width, height))
+        selection = CharacterSelection(screen, GameState(), client=None)
+        manager = SceneManager(screen)
+        manager.push(selection)
+
+        per_event = _per_event_ms(selection, frames)
+        dispatched = _dispatcher_ms(manager, frames)
+        print(f"{width:>5}x{height:<5} {per_event:>13.4f} {dispatched:>14.4f} "
+              f"{manager.input.mean_ms:>10.4f} {manager.input.hover_changes:>7}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_logging.py
+"""Receive-path throughput: print() per message vs level-gated logging.
+
+Run from the repository root:  python -m benchmarks.bench_logging
+The old print() goes to stdout: run it in a terminal, redirect stdout to a
+file, or pass --to-memory to discard it. Results are written to stderr.
+"""
+import io
+import json
+import sys
+import time
+
+from core.utils import setup_logging, shutdown_logging
+from network.client import GameClient
+from network.protocol import JsonLineCodec
+
+MESSAGE = {"action": "stat_update", "data": {"id": 42, "hp": 231, "mp": 64, "buffs": ["haste", "shield"]}}
+
+
+def _frames(n):
+    return [json.dumps(MESSAGE)] * n
+
+
+def _print_path(client, codec, frames):
+    """The previous receive path: decode, then print every message."""
+    for frame in frames:
+        message = codec.decode(frame)
+        print("[<] Server:", message)
+        client.dispatcher.post(message)
+
+
+def _logging_path(client, codec, frames):
+    for frame in frames:
+        client._handle_frame(codec, frame)
+
+
+def _rate(fn, client, codec, frames):
+    start = time.perf_counter()
+    fn(client, codec, frames)
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main(n=50_000):
+    codec = JsonLineCodec()
+    frames = _frames(n)
+    results = []
+
+    real_stdout = sys.stdout
+    if "--to-memory" in sys.argv:
+        sys.stdout = io.StringIO()
+    try:
+        results.append(("print() every message", _rate(_print_path, GameClient(), codec, frames)))
+    finally:
+        sys.stdout = real_stdout
+
+    setup_logging({"network": "INFO"}, stream=io.StringIO())
+    results.append(("logging, debug disabled", _rate(_logging_path, GameClient(), codec, frames)))
+    setup_logging({"network": "DEBUG"}, stream=io.StringIO())
+    results.append(("logging, debug enabled", _rate(_logging_path, GameClient(), codec, frames)))
+    shutdown_logging()
+
+    for label, rate in results:
+        print(f"{label:<26} {rate:>12,.0f} msg/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
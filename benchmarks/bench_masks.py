@@ -0,0 +1,119 @@
+# benchmarks/bench_masks.py
+"""Mask analysis at every resolution offered in the settings menu.
+
+Times Login field-rect extraction and CharacterSelection mask labelling,
+each against the per-pixel implementation it replaced.
+
+Run from the repository root:  python -m benchmarks.bench_masks [--skip-legacy]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client.ui.masks import find_color_bounds, label_regions
+from client.ui.setting_menu import SettingsMenu
+
+LOGIN_MASK = "client/data/assets/images/login_window_mask.png"
+LOGIN_COLORS = [(0, 0, 255), (0, 255, 255), (0, 255, 0), (255, 0, 0)]
+SELECTION_MASK = "client/data/assets/images/character_selection_mask.png"
+SELECTION_COLORS = {(0, 128, 0): "start_btn", (176, 224, 230): "slot",
+                    (255, 0, 0): "return_btn", (0, 0, 255): "delete_btn"}
+
+
+def _legacy_bounds(surface, color):
+    """The previous Login._find_color_bounds: one get_at call per pixel."""
+    coords = [(x, y) for x in range(surface.get_width())
+              for y in range(surface.get_height())
+              if surface.get_at((x, y))[:3] == color]
+    if not coords:
+        return None
+    xs, ys = zip(*coords)
+    return pygame.Rect(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+
+def _legacy_build_masks(surface):
+    """The previous CharacterSelection._build_masks: get_at scan plus Python flood fill."""
+    width, height = surface.get_size()
+    masks = {name: pygame.Mask((width, height)) for name in SELECTION_COLORS.values() if name != "slot"}
+    visited = pygame.Mask((width, height))
+    slot_masks = []
+    for x in range(width):
+        for y in range(height):
+            color = surface.get_at((x, y))[:3]
+            name = SELECTION_COLORS.get(color)
+            if name == "slot" and not visited.get_at((x, y)):
+                slot_mask = pygame.Mask((width, height))
+                to_check = [(x, y)]
+                while to_check:
+                    cx, cy = to_check.pop()
+                    if 0 <= cx < width and 0 <= cy < height:
+                        if not visited.get_at((cx, cy)) and surface.get_at((cx, cy))[:3] == color:
+                            visited.set_at((cx, cy), 1)
+                            slot_mask.set_at((cx, cy), 1)
+                            to_check.extend([(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)])
+                slot_masks.append(slot_mask)
+            elif name is not None and name != "slot":
+                masks[name].set_at((x, y), 1)
+    return masks, slot_masks
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    resolutions = SettingsMenu(screen).resolutions
+    skip_legacy = "--skip-legacy" in sys.argv
+
+    _bench_login(resolutions, skip_legacy)
+    print()
+    _bench_selection(resolutions, skip_legacy)
+    pygame.quit()
+
+
+def _bench_selection(resolutions, skip_legacy):
+    base = pygame.image.load(SELECTION_MASK).convert()
+    print("CharacterSelection._build_masks")
+    print(f"{'resolution':>11} {'legacy ms':>10} {'labelled ms':>12}")
+    for width, height in resolutions:
+        mask = pygame.transform.scale(base, (width, height))
+
+        legacy_ms = float("nan")
+        if not skip_legacy:
+            start = time.perf_counter()
+            _legacy_build_masks(mask)
+            legacy_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        label_regions(mask, SELECTION_COLORS, split=("slot",))
+        fast_ms = (time.perf_counter() - start) * 1e3
+        print(f"{width:>5}x{height:<5} {legacy_ms:>10.1f} {fast_ms:>12.2f}")
+
+
+def _bench_login(resolutions, skip_legacy):
+    base = pygame.image.load(LOGIN_MASK).convert()
+    print("Login field rects")
+    print(f"{'resolution':>11} {'mask size':>10} {'legacy ms':>10} {'vectorized ms':>14}")
+    for width, height in resolutions:
+        ratio = height * 0.7 / base.get_height()
+        mask = pygame.transform.scale(base, (int(base.get_width() * ratio), int(base.get_height() * ratio)))
+
+        legacy_ms = float("nan")
+        if not skip_legacy:
+            start = time.perf_counter()
+            for color in LOGIN_COLORS:
+                _legacy_bounds(mask, color)
+            legacy_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        find_color_bounds(mask, LOGIN_COLORS)
+        fast_ms = (time.perf_counter() - start) * 1e3
+
+        size = f"{mask.get_width()}x{mask.get_height()}"
+        print(f"{width:>5}x{height:<5} {size:>10} {legacy_ms:>10.1f} {fast_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_overlays.py
+"""CPU time per frame on the character selection screen.
+
+"legacy" repeats the draw from before the retained renderer: background,
+a full-screen SRCALPHA overlay from ``Mask.to_surface`` per highlight,
+every label re-rendered, flip. "rebaked" is the retained renderer with
+an overlay cache that keeps nothing, so each highlight move rebuilds its
+cropped overlay; "baked" is the current screen with overlays baked once.
+Both move the highlight every frame; "idle" changes nothing.
+
+Run from the repository root:  python -m benchmarks.bench_overlays
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import config
+from client.ui import character_selection, render
+from client.ui.character_selection import CharacterSelection
+from client.ui.setting_menu import SettingsMenu
+from core.game_state import GameState
+
+FRAMES = 200
+CHARACTERS = [{"id": 1, "name": "Hero", "stats": {"Level": 12}}, {"id": 2, "name": "Mage", "stats": {"Level": 3}}]
+
+
+def _legacy_draw(selection):
+    screen = selection.screen
+    screen.blit(selection.bg_img, (0, 0))
+    fields = [f"slot{selection.selected_slot}", selection.active_field]
+    for field, color in zip(fields, (selection.SELECTED_COLOR, selection.HIGHLIGHT_COLOR)):
+        mask = (selection.masks["slots"][int(field[4:])] if field.startswith("slot")
+                else selection.masks.get(field))
+        if mask:
+            overlay = pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), pygame.SRCALPHA)
+            mask.to_surface(overlay, setcolor=color, unsetcolor=(0, 0, 0, 0))
+            screen.blit(overlay, (0, 0))
+    for i, mask in enumerate(selection.masks["slots"]):
+        rect = mask.get_bounding_rects()[0]
+        text = f"{CHARACTERS[i]['name']} (Lv {CHARACTERS[i]['stats']['Level']})" if i < len(CHARACTERS) else "Empty Slot"
+        surface = selection.font.render(text, True, (255, 255, 255))
+        screen.blit(surface, surface.get_rect(center=rect.center))
+    pygame.display.flip()
+
+
+def _cpu_ms(draw, selection, moving):
+    start = time.process_time()
+    for frame in range(FRAMES):
+        if moving:
+            selection.active_field = selection.focus_order[frame % len(selection.focus_order)]
+        draw(selection)
+    return (time.process_time() - start) * 1e3 / FRAMES
+
+
+def _with_overlays(cache, fn):
+    previous = render.overlays
+    render.overlays = character_selection.overlays = cache
+    try:
+        return fn()
+    finally:
+        render.overlays = character_selection.overlays = previous
+
+
+def main():
+    pygame.init()
+    print(f"{'resolution':>11} {'legacy ms':>10} {'rebaked ms':>11} {'baked ms':>9} {'idle ms':>8}")
+    for width, height in SettingsMenu(pygame.display.set_mode((800, 600))).resolutions:
+        config.SCREEN_WIDTH, config.SCREEN_HEIGHT = width, height
+        screen = pygame.display.set_mode((width, height))
+
+        def rebaked():
+            selection = CharacterSelection(screen, GameState.from_snapshot({"characters": CHARACTERS}), client=None)
+            selection.selected_slot = 0
+            return _cpu_ms(CharacterSelection.draw, selection, moving=True)
+        rebaked_ms = _with_overlays(render.OverlayCache(0), rebaked)
+
+        selection = CharacterSelection(screen, GameState.from_snapshot({"characters": CHARACTERS}), client=None)
+        selection.selected_slot = 0
+        legacy_ms = _cpu_ms(_legacy_draw, selection, moving=True)
+        selection.renderer.invalidate()
+        baked_ms = _cpu_ms(CharacterSelection.draw, selection, moving=True)
+        idle_ms = _cpu_ms(CharacterSelection.draw, selection, moving=False)
+        print(f"{width:>5}x{height:<5} {legacy_ms:>10.3f} {rebaked_ms:>11.3f} {baked_ms:>9.3f} {idle_ms:>8.3f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_render.py
+"""CPU time per idle frame: full redraw vs the retained renderer.
+
+The "full" columns repeat what Menu.draw and SettingsMenu.draw did every
+frame before dirty rectangles: blit the background, re-render every
+label and flip. "retained" calls the screens' draw() with nothing
+changing, then with the selection moving every frame.
+
+Run from the repository root:  python -m benchmarks.bench_render
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import config
+from client.ui.menu import Menu
+from client.ui.setting_menu import SettingsMenu
+
+FRAMES = 200
+
+
+def _full_menu_draw(menu):
+    menu.screen.blit(menu.bg_img, (0, 0))
+    for i, option in enumerate(menu.options):
+        color = (50, 150, 255) if i == menu.selected else (255, 255, 255)
+        surface = menu.font.render(option, True, color)
+        menu.screen.blit(surface, surface.get_rect(center=(config.SCREEN_WIDTH // 2,
+                                                           config.SCREEN_HEIGHT // 2 + i * 60)))
+    pygame.display.flip()
+
+
+def _full_settings_draw(settings):
+    settings.screen.blit(settings.bg_img, (0, 0))
+    panel = pygame.Surface((int(config.SCREEN_WIDTH * 0.6), 600), pygame.SRCALPHA)
+    pygame.draw.rect(panel, (0, 0, 0, 100), panel.get_rect(), border_radius=20)
+    settings.screen.blit(panel, (int(config.SCREEN_WIDTH * 0.2), int(config.SCREEN_HEIGHT * 0.2)))
+    for i, option in enumerate(settings.options + ["1920x1080", "Window"]):
+        settings.screen.blit(settings.font.render(option, True, (255, 255, 255)), (100, 100 + i * 60))
+    pygame.display.flip()
+
+
+def _cpu_ms(fn, screen_obj, step=None):
+    start = time.process_time()
+    for frame in range(FRAMES):
+        if step:
+            step(screen_obj, frame)
+        fn(screen_obj)
+    return (time.process_time() - start) * 1e3 / FRAMES
+
+
+def _move_menu(menu, frame):
+    menu.selected = frame % len(menu.options)
+
+
+def _move_settings(settings, frame):
+    settings.selected_index = frame % len(settings.options)
+
+
+def main():
+    pygame.init()
+    print(f"{'screen':>9} {'resolution':>11} {'full ms':>8} {'idle ms':>8} {'moving ms':>10}")
+    for width, height in SettingsMenu(pygame.display.set_mode((800, 600))).resolutions:
+        config.SCREEN_WIDTH, config.SCREEN_HEIGHT = width, height
+        screen = pygame.display.set_mode((width, height))
+        for name, cls, full, step in (("menu", Menu, _full_menu_draw, _move_menu),
+                                      ("settings", SettingsMenu, _full_settings_draw, _move_settings)):
+            widget = cls(screen)
+            full_ms = _cpu_ms(full, widget)
+            widget.draw()
+            idle_ms = _cpu_ms(cls.draw, widget)
+            moving_ms = _cpu_ms(cls.draw, widget, step)
+            print(f"{name:>9} {width:>5}x{height:<5} {full_ms:>8.3f} {idle_ms:>8.3f} {moving_ms:>10.3f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_resize.py
+"""Settings frames and resolution changes.
+
+"per-frame scale" is what SettingsMenu.draw paid before assets were
+cached: ``pygame.transform.scale`` of the original background to the
+screen size on every frame. "frame" is the current draw with the
+selection moving, which does no resampling. "change" is the wall time
+of ``change_resolution`` with the menu, settings and character
+selection screens listening, with an empty and with a warm disk cache.
+
+Run from the repository root:  python -m benchmarks.bench_resize
+"""
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import cache, config
+from client.assets import assets
+from client.ui import display
+from client.ui.character_selection import CharacterSelection
+from client.ui.menu import Menu
+from client.ui.setting_menu import SettingsMenu
+from core.game_state import GameState
+
+FRAMES = 100
+
+
+def _ms_per_frame(fn):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        fn(frame)
+    return (time.perf_counter() - start) * 1e3 / FRAMES
+
+
+def _change_ms(size, disk):
+    """Open every screen at 800x600, then time the switch to ``size``."""
+    cache.ui_cache = disk
+    assets.clear()
+    screen = display.set_mode((800, 600), "Window")
+    screens = [Menu(screen), SettingsMenu(screen), CharacterSelection(screen, GameState(), client=None)]
+    start = time.perf_counter()
+    display.change_resolution(size, "Window")
+    elapsed = (time.perf_counter() - start) * 1e3
+    del screens
+    return elapsed
+
+
+def main():
+    pygame.init()
+    print(f"{'resolution':>11} {'per-frame scale ms':>19} {'frame ms':>9} {'cold change ms':>15} {'warm change ms':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for width, height in SettingsMenu(pygame.display.set_mode((800, 600))).resolutions[1:]:
+            config.SCREEN_WIDTH, config.SCREEN_HEIGHT = width, height
+            settings = SettingsMenu(pygame.display.set_mode((width, height)))
+            original = pygame.image.load(settings.bg_path).convert()
+            scale_ms = _ms_per_frame(lambda frame: pygame.transform.scale(original, (width, height)))
+
+            def draw(frame):
+                settings.selected_index = frame % len(settings.options)
+                settings.draw()
+            frame_ms = _ms_per_frame(draw)
+
+            disk = cache.DiskCache(os.path.join(directory, str(width)), 1 << 30)
+            cold_ms = _change_ms((width, height), disk)
+            warm_ms = _change_ms((width, height), disk)
+            print(f"{width:>5}x{height:<5} {scale_ms:>19.3f} {frame_ms:>9.3f} {cold_ms:>15.1f} {warm_ms:>15.1f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
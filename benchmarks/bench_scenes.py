@@ -0,0 +1,72 @@
+# benchmarks/bench_scenes.py
+"""Cost of switching screens: rebuilt per visit vs cached scenes.
+
+"rebuilt" is what app.py did before the SceneManager: construct the
+screen (scaled background, font, masks, overlays) and draw its first
+frame on every visit. "cached" is a SceneManager push of a scene that was
+built on an earlier visit plus its first frame. Both use a warm disk and
+asset cache, so "rebuilt" is already the cheapest it could be.
+
+Run from the repository root:  python -m benchmarks.bench_scenes
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client.ui.character_selection import CharacterSelection
+from client.ui.display import set_mode
+from client.ui.menu import Menu
+from client.ui.scenes import SceneManager
+from client.ui.setting_menu import SettingsMenu
+from core.game_state import GameState
+
+VISITS = 20
+CHARACTERS = [{"id": 1, "name": "Hero", "stats": {"Level": 12}}]
+FACTORIES = {
+    "menu": Menu,
+    "settings": SettingsMenu,
+    "character_selection": lambda screen: CharacterSelection(screen, GameState.from_snapshot({"characters": CHARACTERS}), client=None),
+}
+
+
+def _rebuilt_ms(name, screen):
+    start = time.perf_counter()
+    for _ in range(VISITS):
+        scene = FACTORIES[name](screen)
+        scene.draw()
+    return (time.perf_counter() - start) * 1e3 / VISITS
+
+
+def _cached_ms(name, screen):
+    manager = SceneManager(screen)
+    for key, factory in FACTORIES.items():
+        manager.register(key, factory)
+    manager.push("menu")
+    manager.push(name)  # first visit builds it
+    manager.pop()
+    start = time.perf_counter()
+    for _ in range(VISITS):
+        manager.push(name)
+        manager.top.draw()
+        manager.pop()
+    return (time.perf_counter() - start) * 1e3 / VISITS
+
+
+def main():
+    pygame.init()
+    print(f"{'resolution':>11} {'scene':>20} {'rebuilt ms':>11} {'cached ms':>10}")
+    for width, height in SettingsMenu(pygame.display.set_mode((800, 600))).resolutions:
+        screen = set_mode((width, height), "Window")
+        for name in ("settings", "character_selection"):
+            FACTORIES[name](screen)  # warm the disk and asset caches
+            rebuilt = _rebuilt_ms(name, screen)
+            cached = _cached_ms(name, screen)
+            print(f"{width:>5}x{height:<5} {name:>20} {rebuilt:>11.2f} {cached:>10.2f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_snapshots.py
+"""Bytes per second of entity updates, and how smooth they look at config.FPS.
+
+A simulated server runs ENTITIES entities for SECONDS at the snapshot
+rate: a quarter of them walk, one in ten also loses or regains hp, and
+one entity leaves and another arrives per second. Every tick, each
+encoding sends the whole world:
+
+- "json full": every entity as JSON, what resending full objects costs
+- "msgpack full": the same through the msgpack codec
+- "snapshot full": quantized binary snapshots, no acks
+- "snapshot delta": the client acks every snapshot, the acks arrive
+  RTT later, and only fields changed since the acked baseline are sent
+
+Then the walking entities are played back at config.FPS with up to
+JITTER seconds of random extra delay per snapshot: "latest" draws the
+newest snapshot received, "interpolated" samples the SnapshotBuffer.
+"jerk" is the mean deviation of the per-frame movement from a steady
+walk (0 is perfectly smooth).
+
+Run from the repository root:  python -m benchmarks.bench_snapshots
+"""
+import json
+import random
+
+from client import config
+from network.interpolation import SnapshotBuffer
+from network.protocol import MsgpackCodec, SnapshotDecoder, SnapshotEncoder
+
+SECONDS = 10
+RTT = 0.1
+JITTER = 0.04
+SPEED = 3.0  # world units per second
+
+
+def _simulate(count, rate, seed=1):
+    """Per tick, {entity id: state} for ``count`` entities."""
+    rng = random.Random(seed)
+    entities = {i: {"x": rng.uniform(0, 1000), "y": rng.uniform(0, 1000), "facing": rng.randrange(360),
+                    "hp": 100, "mp": 50, "anim": 0} for i in range(1, count + 1)}
+    next_id = count + 1
+    ticks = []
+    for tick in range(1, SECONDS * rate + 1):
+        for entity_id, state in entities.items():
+            if entity_id % 4 == 0:
+                state["x"] += SPEED / rate
+                state["anim"] = 1
+            if entity_id % 10 == 0 and rng.random() < 0.2:
+                state["hp"] = max(0, state["hp"] + rng.choice((-5, 5)))
+        if tick % rate == 0:
+            del entities[next(iter(entities))]
+            entities[next_id] = {"x": 0.0, "y": 0.0, "facing": 0, "hp": 100, "mp": 50, "anim": 0}
+            next_id += 1
+        ticks.append({entity_id: dict(state) for entity_id, state in entities.items()})
+    return ticks
+
+
+def _bytes_per_second(ticks, rate):
+    codec = MsgpackCodec()
+    json_bytes = sum(len(json.dumps({"action": "world", "entities": world})) for world in ticks)
+    msgpack_bytes = sum(len(codec.encode({"action": "world", "entities": list(world.values())}))
+                        for world in ticks)
+    full = SnapshotEncoder()
+    full_bytes = sum(len(codec.encode_snapshot(full.encode(tick, world)))
+                     for tick, world in enumerate(ticks, 1))
+
+    delta, decoder = SnapshotEncoder(), SnapshotDecoder()
+    lag = max(1, round(RTT * rate))
+    delta_bytes = 0
+    for tick, world in enumerate(ticks, 1):
+        if tick > lag:
+            delta.ack(tick - lag)
+        body = delta.encode(tick, world)
+        decoder.decode(body)
+        delta_bytes += len(codec.encode_snapshot(body))
+    return [b / SECONDS for b in (json_bytes, msgpack_bytes, full_bytes, delta_bytes)]
+
+
+def _jerk(ticks, rate, interpolate, seed=2):
+    rng = random.Random(seed)
+    arrivals = sorted((tick / rate + RTT / 2 + rng.uniform(0, JITTER), tick) for tick in range(1, len(ticks) + 1))
+    buffer = SnapshotBuffer(rate, delay=1 / rate + JITTER)
+    walker = 4
+    latest, drawn = None, []
+    frame, now = 1 / config.FPS, 0.0
+    for received_at, tick in arrivals:
+        while now < received_at:
+            if interpolate:
+                state = buffer.sample(now).get(walker)
+            else:
+                state = latest
+            if state is not None and now > 1:
+                drawn.append(state["x"])
+            now += frame
+        world = ticks[tick - 1]
+        buffer.push(tick, world, received_at)
+        latest = world.get(walker)
+    steady = SPEED * frame
+    steps = [b - a for a, b in zip(drawn, drawn[1:])]
+    return sum(abs(step - steady) for step in steps) / len(steps)
+
+
+def main():
+    rate = config.SNAPSHOT_RATE
+    print(f"{rate} snapshots/s for {SECONDS} s, RTT {RTT * 1000:.0f} ms")
+    print(f"{'entities':>8} {'json full':>11} {'msgpack full':>13} {'snapshot full':>14} {'snapshot delta':>15}  (bytes/s)")
+    for count in (10, 100, 1000):
+        ticks = _simulate(count, rate)
+        rates = _bytes_per_second(ticks, rate)
+        print(f"{count:>8} " + " ".join(f"{r:>{w}.0f}" for r, w in zip(rates, (11, 13, 14, 15))))
+
+    ticks = _simulate(10, rate)
+    print(f"\nWalking at {config.FPS} FPS with up to {JITTER * 1000:.0f} ms jitter")
+    print(f"{'latest':>14}: jerk {_jerk(ticks, rate, False):.4f} units/frame")
+    print(f"{'interpolated':>14}: jerk {_jerk(ticks, rate, True):.4f} units/frame")
+
+
+if __name__ == "__main__":
+    main()
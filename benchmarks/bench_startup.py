@@ -0,0 +1,68 @@
+# benchmarks/bench_startup.py
+"""Time to first frame and to an interactive menu, with and without the preloader.
+
+"sync" loads the menu's assets on the main thread before drawing anything,
+like app.py did before the splash. "preload" draws the splash first and
+waits only for the menu's assets while the rest keep loading. Each runs
+with an empty and a warm disk cache.
+
+Run from the repository root:  python -m benchmarks.bench_startup
+"""
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client import cache, config
+from client.app import startup_assets
+from client.assets import assets
+from client.ui.menu import Menu
+from client.ui.splash import Splash
+
+
+def _sync(screen):
+    for path, size, alpha in startup_assets()[0]:
+        if size:
+            assets.scaled(path, size, alpha)
+        else:
+            assets.image(path, alpha)
+    pygame.display.flip()
+    first_frame = time.perf_counter()
+    Menu(screen).draw()
+    return first_frame, None
+
+
+def _preload(screen):
+    images, fonts = startup_assets()
+    preloader = assets.preload(images, fonts, workers=config.PRELOAD_WORKERS)
+    splash = Splash(screen, preloader, images=images[:1], fonts=fonts[:1])
+    splash.run()
+    Menu(screen).draw()
+    return splash.first_frame_at, preloader
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+    print(f"{config.SCREEN_WIDTH}x{config.SCREEN_HEIGHT}")
+    print(f"{'mode':>8} {'disk cache':>10} {'first frame ms':>15} {'interactive ms':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode, run in (("sync", _sync), ("preload", _preload)):
+            cache.ui_cache = cache.DiskCache(os.path.join(directory, mode), 1 << 30)
+            for state in ("cold", "warm"):
+                assets.clear()
+                started = time.perf_counter()
+                first_frame, preloader = run(screen)
+                interactive = time.perf_counter()
+                if preloader:
+                    preloader.wait()  # finish filling the disk cache before the warm run
+                print(f"{mode:>8} {state:>10} {(first_frame - started) * 1e3:>15.1f} "
+                      f"{(interactive - started) * 1e3:>15.1f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
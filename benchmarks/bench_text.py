@@ -0,0 +1,74 @@
+# benchmarks/bench_text.py
+"""font.render vs the text cache.
+
+Labels: every label of the menu, settings and selection screens, the way
+their draw() used to render them each frame. Input: typing a 12
+character password, deleting it and typing it again, one render per
+keystroke.
+
+Run from the repository root:  python -m benchmarks.bench_text
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from client.ui.text import TextCache
+
+LABELS = ["Start", "Settings", "Exit", "Screen Mode", "Resolution", "Music", "Sound",
+          "Return to Title", "Apply Changes", "1920x1080", "Window"] + \
+         [f"Hero{i} (Lv {i * 7})" for i in range(4)] + ["Empty Slot"] * 2
+FRAMES = 300
+
+
+def _keystrokes(word="correcthorse"):
+    typed = [word[:i] for i in range(1, len(word) + 1)]
+    return typed + typed[-2::-1] + [""] + typed
+
+
+def _us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+    font = pygame.font.Font(None, 43)
+    cache = TextCache(max_entries=512)
+    white = (255, 255, 255)
+
+    def direct_labels():
+        for label in LABELS:
+            font.render(label, True, white)
+
+    def cached_labels():
+        for label in LABELS:
+            cache.render(font, label, True, white)
+
+    strokes = _keystrokes()
+
+    def direct_input():
+        for text in strokes:
+            font.render(text, True, white)
+
+    def cached_input():
+        cache.clear()  # one fresh editing session per repeat
+        for text in strokes:
+            cache.render_input("password", font, text, white)
+
+    print(f"labels per frame ({len(LABELS)}):  font.render {_us(direct_labels, FRAMES):8.1f} us"
+          f"   cached {_us(cached_labels, FRAMES):8.1f} us")
+    per_key = len(strokes)
+    print(f"input per keystroke:     font.render {_us(direct_input, 50) / per_key:8.1f} us"
+          f"   cached {_us(cached_input, 50) / per_key:8.1f} us")
+    print(f"cache: {cache.hits} hits, {cache.misses} misses, hit rate {cache.hit_rate:.1%}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
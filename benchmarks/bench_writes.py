@@ -0,0 +1,72 @@
+# benchmarks/bench_writes.py
+"""send syscalls per 1000 messages: one sendall per message vs the coalescing writer.
+
+Run from the repository root:  python -m benchmarks.bench_writes
+"""
+import socket
+import threading
+import time
+
+from network.client import GameClient
+
+MESSAGE = {"action": "move", "data": {"x": 1024.5, "y": 377.25}}
+
+
+class _Sink:
+    """Accepts one connection and discards everything it receives."""
+
+    def __init__(self):
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self.received = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        conn, _ = self.sock.accept()
+        while True:
+            data = conn.recv(1 << 16)
+            if not data:
+                return
+            self.received += len(data)
+
+
+def _direct(n, payload):
+    """The previous GameClient.send: one sendall per message."""
+    sink = _Sink()
+    sock = socket.create_connection(("127.0.0.1", sink.port))
+    start = time.perf_counter()
+    for _ in range(n):
+        sock.sendall(payload)
+    elapsed = time.perf_counter() - start
+    sock.close()
+    return n, elapsed
+
+
+def _coalesced(n, flush_interval):
+    sink = _Sink()
+    client = GameClient("127.0.0.1", sink.port, flush_interval=flush_interval, max_queued_writes=n)
+    client.connect()
+    start = time.perf_counter()
+    for _ in range(n):
+        client.send_json(MESSAGE)
+    while client.write_stats.messages < n:
+        time.sleep(0.0005)
+    elapsed = time.perf_counter() - start
+    flushes = client.write_stats.flushes
+    client.close()
+    return flushes, elapsed
+
+
+def main(n=1000):
+    payload = GameClient().codec.encode(MESSAGE)
+    print(f"{'mode':<28} {'sendall calls':>13} {'ms total':>9}")
+    calls, elapsed = _direct(n, payload)
+    print(f"{'per-message sendall':<28} {calls:>13} {elapsed * 1e3:>9.2f}")
+    for interval in (0.0, 0.001, 0.004):
+        calls, elapsed = _coalesced(n, interval)
+        label = f"coalesced (tick {interval * 1e3:g} ms)"
+        print(f"{label:<28} {calls:>13} {elapsed * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
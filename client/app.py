@@ -1,83 +1,79 @@
 # app.py
+import time
 import pygame
 from client import config
+from client.assets import assets
 from client.ui.menu import Menu
 from client.ui.login import Login
 from client.ui.setting_menu import SettingsMenu
+from client.ui.character_creation import CharacterCreation
 from client.ui.character_selection import CharacterSelection
+from client.ui.scenes import SceneManager
+from client.ui.scheduler import post_network_event
+from client.ui.splash import Splash
+from core.utils import setup_logging
 from network.client import GameClient
+from network.connect import addresses
+
+def startup_assets():
+    """Images (path, size, alpha) and fonts the first screens need at the current resolution.
+
+    The menu's background and font come first.
+    """
+    screen_size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
+    images = [
+        ("client/data/assets/images/menu_bg.png", screen_size, True),
+        ("client/data/assets/images/login_window.png", None, True),
+        ("client/data/assets/images/settings_bg.png", screen_size, False),
+        ("client/data/assets/images/character_selection.png", screen_size, True),
+    ]
+    fonts = [config.FONT_NAME, "client/data/assets/fonts/cinzel.decorative-black.ttf"]
+    return images, fonts
+
 
 def main():
+    started = time.perf_counter()
+    setup_logging(config.LOG_LEVELS)
     pygame.init()
 
-    # --- CREATE ONE PERSISTENT CLIENT ---
-    client = GameClient()
-    client.connect()  # connect once at startup
-
     flags = 0
     if config.SCREEN_MODE == "Full Screen":
         flags = pygame.FULLSCREEN
     screen = pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT), flags)
     pygame.display.set_caption("Game Client")
 
-    # Pass the persistent client to Login
-    login_screen = Login(screen, client)
-
-    running = True
-    while running:
-        menu = Menu(screen)
-        choice = menu.run()  # returns "start", "settings", "exit"
-
-        if choice in ("exit", None):
-            running = False
-            break
-
-        elif choice == "settings":
-            old_size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
+    # Decode assets in the background; the splash only waits for the menu's
+    images, fonts = startup_assets()
+    preloader = assets.preload(images, fonts, workers=config.PRELOAD_WORKERS)
+    splash = Splash(screen, preloader, images=images[:1], fonts=fonts[:1])
+    splash.run()
 
-            settings = SettingsMenu(screen)
-            settings.run()
-
-            new_size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
-            if new_size != old_size:
-                flags = 0
-                if config.SCREEN_MODE == "Full Screen":
-                    flags = pygame.FULLSCREEN
-                screen = pygame.display.set_mode(new_size, flags)
-
-                # Update login screen’s reference + rescale UI
-                login_screen.screen = screen
-                login_screen.rescale_ui()
-
-        elif choice == "start":
-            # If already logged in with characters, go straight to character selection
-            if login_screen.logged_in and login_screen.characters:
-                selected = CharacterSelection(screen, login_screen.characters, client).run()
-                if selected in ("cancel", "menu", None):
-                    continue
-
-                if isinstance(selected, dict):
-                    print("Player picked:", selected)
-                    running = False
-                    break
-                else:
-                    continue
-
-            # Otherwise, show login screen
-            result = login_screen.run()
-
-            if login_screen.logged_in:
-                print("User is logged in.")
-            elif result is None:
-                print("User cancelled or closed the login screen.")
-                continue
-
-            # Check if character was selected
-            if result and isinstance(result, dict) and result.get("selected_character"):
-                selected = result["selected_character"]
-                print("Player picked:", selected)
-                running = False
-                break
+    # --- CREATE ONE PERSISTENT CLIENT ---
+    client = GameClient(config.SERVER_IP, config.SERVER_PORT, codecs=config.WIRE_CODECS,
+                        compression=config.WIRE_COMPRESSION, compress_threshold=config.WIRE_COMPRESS_THRESHOLD,
+                        inbox_size=config.NETWORK_INBOX_SIZE, snapshot_rate=config.SNAPSHOT_RATE,
+                        interpolation_delay=config.INTERPOLATION_DELAY, connect_timeout=config.CONNECT_TIMEOUT,
+                        read_timeout=config.READ_TIMEOUT, connect_attempt_delay=config.CONNECT_ATTEMPT_DELAY)
+    client.on_wakeup = post_network_event  # wake idle screens when messages arrive
+    addresses.ttl = config.DNS_CACHE_TTL
+    client.connect_async()  # connect once at startup, while the menu is already up
+
+    # Every screen is built on first use and kept for the session
+    scenes = SceneManager(screen, dispatcher=client.dispatcher)
+    scenes.register("menu", Menu)
+    scenes.register("settings", SettingsMenu)
+    scenes.register("login", lambda screen: Login(screen, client))
+    scenes.register("character_selection", lambda screen: CharacterSelection(screen, client.state, client))
+    scenes.register("character_creation", lambda screen: CharacterCreation(screen, client))
+    scenes.scene("login")  # subscribes to the login replies up front
+
+    if config.STARTUP_TIMINGS:
+        print(f"Time to first frame: {(splash.first_frame_at - started) * 1000:.0f} ms")
+        print(f"Time to interactive: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    result = scenes.run("menu")
+    if isinstance(result, dict) and result.get("selected_character"):
+        print("Player picked:", result["selected_character"])
 
     pygame.quit()
 
@@ -0,0 +1,222 @@
+# client/assets.py
+"""Images and fonts shared by every screen.
+
+Each file is decoded and each font opened once per process. Scaled
+variants are kept per (path, size, alpha) and filled from the on-disk
+cache in ``client.cache``. Images are evicted least-recently-used once
+they exceed ``config.ASSET_CACHE_MB``; fonts are small and kept for
+the whole session.
+
+``preload`` starts decoding on worker threads before the screens ask for
+anything; a screen that needs a preloaded asset waits for that one only.
+"""
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from client import config
+from client.cache import load_scaled
+from core.utils import get_logger
+
+log = get_logger("assets")
+
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def _convert(surface, alpha):
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+def _resolve_font(name):
+    """Path of the font file behind ``name``; None selects pygame's default font."""
+    if name is None or os.path.isfile(name):
+        return name
+    try:
+        return pygame.font.match_font(name)
+    except Exception as e:
+        log.warning("Could not look up font %r: %s", name, e)
+        return None
+
+
+class AssetManager:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._images = OrderedDict()  # (path, size, alpha) -> Surface, oldest first
+        self._fonts = {}
+        self._font_paths = {}
+        self._pending = {}  # (path, size, alpha) -> Future of an unconverted Surface
+        self._pending_fonts = {}  # name -> Future of a font path
+
+    # ---------------- Images ----------------
+    def image(self, path, alpha=True):
+        """The image at ``path`` at its native size, converted for the display."""
+        return self._get((path, None, alpha), lambda: self._load(path, alpha))
+
+    def scaled(self, path, size, alpha=True):
+        """The image at ``path`` scaled to ``size``."""
+        size = (int(size[0]), int(size[1]))
+        return self._get(
+            (path, size, alpha),
+            lambda: load_scaled(path, size, alpha, load=lambda: self.image(path, alpha)),
+        )
+
+    def _load(self, path, alpha):
+        log.debug("Loading image %s", path)
+        return _convert(pygame.image.load(path), alpha)
+
+    def _get(self, key, build):
+        surface = self._images.get(key)
+        if surface is not None:
+            self._images.move_to_end(key)
+            return surface
+        surface = self._take_preloaded(key)
+        if surface is None:
+            surface = build()
+        self._images[key] = surface
+        self.used_bytes += surface_bytes(surface)
+        self._evict(keep=key)
+        return surface
+
+    def _take_preloaded(self, key):
+        """Wait for a preload of ``key`` and convert it on this (the main) thread."""
+        future = self._pending.pop(key, None)
+        if future is None:
+            return None
+        try:
+            return _convert(future.result(), key[2])
+        except Exception as e:
+            log.warning("Preloading %s failed: %s", key[0], e)
+            return None
+
+    def _evict(self, keep):
+        for key in list(self._images):
+            if self.used_bytes <= self.budget_bytes:
+                break
+            if key != keep:
+                self.used_bytes -= surface_bytes(self._images.pop(key))
+
+    # ---------------- Fonts ----------------
+    def font(self, name, size):
+        """A font file path, a system font name, or None for pygame's default font."""
+        key = (name, int(size))
+        font = self._fonts.get(key)
+        if font is None:
+            future = self._pending_fonts.pop(name, None)
+            if future is not None:
+                self._font_paths[name] = future.result()
+            if name in self._font_paths:
+                font = pygame.font.Font(self._font_paths[name], int(size))
+            elif name is not None and os.path.isfile(name):
+                font = pygame.font.Font(name, int(size))
+            else:
+                font = pygame.font.SysFont(name, int(size))
+            self._fonts[key] = font
+        return font
+
+    # ---------------- Preloading ----------------
+    def preload(self, images=(), fonts=(), workers=4):
+        """Start loading ``images`` ((path, size, alpha) tuples, size None for
+        the native size) and resolving ``fonts`` (names or paths) in the background.
+        """
+        return Preloader(self, images, fonts, workers)
+
+    def clear(self):
+        self._images.clear()
+        self._fonts.clear()
+        self._font_paths.clear()
+        self._pending.clear()
+        self._pending_fonts.clear()
+        self.used_bytes = 0
+
+
+class Preloader:
+    """Handle on a background preload; ``poll`` it once per splash frame.
+
+    Workers only decode, scale and read the disk cache. Converting to the
+    display format happens on the main thread, in ``poll`` or when a
+    screen asks the AssetManager for the asset first.
+    """
+
+    def __init__(self, manager, images, fonts, workers):
+        self.manager = manager
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preload")
+        self._images = []
+        self._fonts = []
+        for path, size, alpha in images:
+            key = (path, tuple(size) if size else None, alpha)
+            if key in manager._images or key in manager._pending:
+                continue
+            if size:
+                future = self._executor.submit(load_scaled, path, key[1], alpha, convert=False)
+            else:
+                future = self._executor.submit(pygame.image.load, path)
+            manager._pending[key] = future
+            self._images.append(key)
+        for name in fonts:
+            if name in manager._font_paths or name in manager._pending_fonts:
+                continue
+            manager._pending_fonts[name] = self._executor.submit(_resolve_font, name)
+            self._fonts.append(name)
+        self.total = len(self._images) + len(self._fonts)
+        self.finished = 0
+        self._executor.shutdown(wait=False)
+
+    @property
+    def progress(self):
+        return self.finished / self.total if self.total else 1.0
+
+    @property
+    def done(self):
+        return self.finished == self.total
+
+    def poll(self):
+        """Hand every finished job to the AssetManager; returns ``progress``."""
+        manager = self.manager
+        remaining = []
+        for key in self._images:
+            future = manager._pending.get(key)
+            if future is None:
+                self.finished += 1  # already taken by a screen
+            elif future.done():
+                if future.exception() is None:
+                    manager._get(key, lambda: None)
+                else:
+                    manager._pending.pop(key)
+                    log.warning("Preloading %s failed: %s", key[0], future.exception())
+                self.finished += 1
+            else:
+                remaining.append(key)
+        self._images = remaining
+        remaining = []
+        for name in self._fonts:
+            future = manager._pending_fonts.get(name)
+            if future is None or future.done():
+                if future is not None:
+                    manager._pending_fonts.pop(name)
+                    manager._font_paths[name] = future.result()
+                self.finished += 1
+            else:
+                remaining.append(name)
+        self._fonts = remaining
+        return self.progress
+
+    def ready(self, images=(), fonts=()):
+        """True once the given image keys and font names are no longer in flight (after ``poll``)."""
+        return not any(key in self._images for key in images) and not any(name in self._fonts for name in fonts)
+
+    def wait(self):
+        """Block until every job has finished and been handed over."""
+        for future in list(self.manager._pending.values()) + list(self.manager._pending_fonts.values()):
+            try:
+                future.result()
+            except Exception:
+                pass
+        self.poll()
+
+
+assets = AssetManager(config.ASSET_CACHE_MB * 1024 * 1024)
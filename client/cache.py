@@ -0,0 +1,319 @@
+# client/cache.py
+"""Persistent cache for data derived from UI assets.
+
+Scaled backgrounds, hit-region rects and slot masks only change when the
+source PNG or the target resolution changes, so they are stored under
+``config.CACHE_DIR`` keyed by the asset's content hash plus the target size.
+A warm start loads them back without decoding, rescaling or scanning any
+image. Entries are evicted least-recently-used once the directory grows
+past ``config.CACHE_MAX_MB``.
+
+The directory is writable by the user, so entries are never unpickled: a
+file is a fixed header, JSON describing the value and the raw bytes it
+refers to. Anything else is discarded as unreadable.
+"""
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+import pygame
+
+from client import config
+from client.ui.masks import find_color_bounds, label_regions
+from core.utils import get_logger
+
+log = get_logger("assets")
+
+# Bump when the layout of cached entries changes
+CACHE_VERSION = 2
+
+# magic, version, length of the JSON that follows
+_HEADER = struct.Struct(">4sHI")
+_MAGIC = b"UICE"
+
+
+# ---------------- Entry format ----------------
+def _describe(value, blobs):
+    """JSON-safe form of ``value``; bytes are appended to ``blobs`` and referenced by index."""
+    if isinstance(value, (bytes, bytearray)):
+        blobs.append(bytes(value))
+        return {"b": len(blobs) - 1}
+    if isinstance(value, tuple):
+        return {"t": [_describe(v, blobs) for v in value]}
+    if isinstance(value, list):
+        return [_describe(v, blobs) for v in value]
+    if isinstance(value, dict):
+        return {"d": [[_describe(k, blobs), _describe(v, blobs)] for k, v in value.items()]}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"cannot cache {type(value).__name__}")
+
+
+def _rebuild(desc, blobs):
+    if isinstance(desc, list):
+        return [_rebuild(v, blobs) for v in desc]
+    if not isinstance(desc, dict):
+        return desc
+    (tag, body), = desc.items()
+    if tag == "b":
+        return blobs[body]
+    if tag == "t":
+        return tuple(_rebuild(v, blobs) for v in body)
+    if tag == "d":
+        return {_rebuild(k, blobs): _rebuild(v, blobs) for k, v in body}
+    raise ValueError(f"unknown tag {tag!r}")
+
+
+def encode_entry(value):
+    """Serialize ``value``: None, bool, int, float, str, bytes, and tuples, lists and dicts of them."""
+    blobs = []
+    meta = json.dumps({"value": _describe(value, blobs),
+                       "blobs": [len(b) for b in blobs]}).encode("utf-8")
+    return b"".join([_HEADER.pack(_MAGIC, CACHE_VERSION, len(meta)), meta, *blobs])
+
+
+def decode_entry(data):
+    """Inverse of ``encode_entry``; returns ``(version, value)``. Raises ValueError on bad data."""
+    if len(data) < _HEADER.size:
+        raise ValueError("truncated header")
+    magic, version, meta_len = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("not a cache entry")
+    if version != CACHE_VERSION:
+        return version, None
+    offset = _HEADER.size + meta_len
+    meta = json.loads(data[_HEADER.size:offset])
+    blobs = []
+    for length in meta["blobs"]:
+        blobs.append(data[offset:offset + length])
+        offset += length
+    if offset != len(data):
+        raise ValueError("entry length does not match its description")
+    return version, _rebuild(meta["value"], blobs)
+
+
+class DiskCache:
+    """Directory of entries with size-bounded LRU eviction.
+
+    Recency is tracked through file modification times, which ``get``
+    refreshes, so no separate index has to be kept consistent.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def get(self, key, decode=None):
+        """The value stored under ``key``, or None.
+
+        ``decode`` is applied to the stored value; an entry it rejects
+        with an exception is discarded like an unreadable file.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                version, value = decode_entry(f.read())
+            if version == CACHE_VERSION and decode is not None:
+                value = decode(value)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            log.warning("Discarding unreadable cache entry %s: %s", key, e)
+            self._remove(path)
+            self.misses += 1
+            return None
+        if version != CACHE_VERSION:
+            self._remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        data = encode_entry(value)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            log.warning("Could not write cache entry %s: %s", key, e)
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits in ``max_bytes``."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".bin")]
+        except FileNotFoundError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory) if os.path.isdir(self.directory) else ():
+            self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+ui_cache = DiskCache(config.CACHE_DIR, config.CACHE_MAX_MB * 1024 * 1024)
+
+# ---------------- Keys ----------------
+_digests = {}
+
+
+def file_digest(path):
+    """Content hash of an asset file, memoized per (path, mtime, size) for this process."""
+    st = os.stat(path)
+    memo_key = (path, st.st_mtime_ns, st.st_size)
+    digest = _digests.get(memo_key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        _digests[memo_key] = digest
+    return digest
+
+
+def cache_key(kind, path, *params):
+    parts = [kind, file_digest(path), pygame.version.ver] + [repr(p) for p in params]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+# ---------------- Packing ----------------
+def pack_mask(mask):
+    """Serialize a Mask as its bounding rect plus the pixels inside it.
+
+    One byte per pixel (0 or 255), zlib-compressed: masks are mostly runs,
+    and both directions stay in C instead of looping over bits in Python.
+    """
+    rects = mask.get_bounding_rects()
+    if not rects:
+        return mask.get_size(), None, b""
+    rect = rects[0].unionall(rects[1:])
+    cropped = pygame.Mask(rect.size)
+    cropped.draw(mask, (-rect.x, -rect.y))
+    surface = cropped.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 255))
+    pixels = pygame.image.tobytes(surface, "RGBA")[::4]
+    return mask.get_size(), tuple(rect), zlib.compress(pixels)
+
+
+def unpack_mask(packed_mask):
+    size, rect, packed = packed_mask
+    mask = pygame.Mask(size)
+    if rect is None:
+        return mask
+    rect = pygame.Rect(rect)
+    inflate = zlib.decompressobj()
+    pixels = inflate.decompress(packed, rect.w * rect.h)
+    if len(pixels) != rect.w * rect.h or inflate.unconsumed_tail:
+        raise ValueError(f"mask data does not hold {rect.w * rect.h} pixels")
+    surface = pygame.image.frombytes(pixels, rect.size, "P")
+    surface.set_colorkey(0)
+    mask.draw(pygame.mask.from_surface(surface), rect.topleft)
+    return mask
+
+
+def pack_surface(surface, alpha):
+    fmt = "RGBA" if alpha else "RGB"
+    return surface.get_size(), fmt, pygame.image.tobytes(surface, fmt)
+
+
+def unpack_surface(packed_surface, convert=True):
+    size, fmt, data = packed_surface
+    surface = pygame.image.frombytes(data, size, fmt)
+    if not convert:
+        return surface
+    return surface.convert_alpha() if fmt == "RGBA" else surface.convert()
+
+
+# ---------------- Cached derivations ----------------
+def _resample(image, size, smooth):
+    # smoothscale only takes 24/32-bit surfaces; palette images fall back to scale
+    if smooth and image.get_bytesize() in (3, 4):
+        return pygame.transform.smoothscale(image, size)
+    return pygame.transform.scale(image, size)
+
+
+def load_scaled(path, size, alpha=True, load=None, convert=True, smooth=None):
+    """``path`` loaded and scaled to ``size``, from the cache when possible.
+
+    ``load`` returns the unscaled, converted image on a miss; by default
+    the file is decoded again. With ``convert=False`` nothing touches the
+    display, so this can run on a worker thread; the caller converts.
+    ``smooth`` defaults to ``config.SMOOTH_SCALING``.
+    """
+    if smooth is None:
+        smooth = config.SMOOTH_SCALING
+    key = cache_key("smooth" if smooth else "scaled", path, tuple(size), alpha)
+    surface = ui_cache.get(key, lambda packed: unpack_surface(packed, convert))
+    if surface is not None:
+        return surface
+    if load is not None:
+        image = load()
+    else:
+        image = pygame.image.load(path)
+        if convert:
+            image = image.convert_alpha() if alpha else image.convert()
+    surface = _resample(image, size, smooth)
+    ui_cache.put(key, pack_surface(surface, alpha))
+    return surface
+
+
+def _scaled_mask_image(path, size):
+    return pygame.transform.scale(pygame.image.load(path).convert(), size)
+
+
+def _unpack_bounds(rects):
+    return {color: pygame.Rect(rect) if rect else None for color, rect in rects.items()}
+
+
+def cached_color_bounds(mask_path, size, colors):
+    """``find_color_bounds`` on the mask image scaled to ``size``, cached per resolution."""
+    key = cache_key("bounds", mask_path, tuple(size), list(colors))
+    bounds = ui_cache.get(key, _unpack_bounds)
+    if bounds is None:
+        bounds = find_color_bounds(_scaled_mask_image(mask_path, size), colors)
+        ui_cache.put(key, {color: tuple(rect) if rect else None for color, rect in bounds.items()})
+    return bounds
+
+
+def cached_regions(mask_path, size, color_map, split=()):
+    """``label_regions`` on the mask image scaled to ``size``, cached per resolution."""
+    split = tuple(split)
+    key = cache_key("regions", mask_path, tuple(size), sorted(color_map.items()), split)
+
+    def unpack(packed):
+        return {
+            name: [unpack_mask(m) for m in value] if name in split else unpack_mask(value)
+            for name, value in packed.items()
+        }
+
+    regions = ui_cache.get(key, unpack)
+    if regions is None:
+        regions = label_regions(_scaled_mask_image(mask_path, size), color_map, split)
+        ui_cache.put(key, {
+            name: [pack_mask(m) for m in value] if name in split else pack_mask(value)
+            for name, value in regions.items()
+        })
+    return regions
@@ -10,6 +10,47 @@ FONT_SIZE = 40
 
 SERVER_IP = "127.0.0.1"
 SERVER_PORT = 5000
+# Seconds to reach the server, all of its addresses included, before a connect fails
+CONNECT_TIMEOUT = 5.0
+# Seconds without data from the server before the connection counts as lost (None waits forever)
+READ_TIMEOUT = None
+# Head start of each server address over the next when racing IPv6 and IPv4 (s)
+CONNECT_ATTEMPT_DELAY = 0.25
+# Seconds a resolved server address is reused before looking it up again
+DNS_CACHE_TTL = 300
+# Wire codecs offered to the server, most preferred first ("msgpack", "json")
+WIRE_CODECS = ["json"]
+# Stream compression offered to the server, most preferred first ("zstd" needs zstandard, "zlib");
+# offering any makes the client send the codec handshake even for JSON lines.
+# Batches shorter than WIRE_COMPRESS_THRESHOLD bytes are sent uncompressed
+WIRE_COMPRESSION = []
+WIRE_COMPRESS_THRESHOLD = 32
+# Server messages waiting for the UI thread; the oldest are dropped past this
+NETWORK_INBOX_SIZE = 1024
+# Server messages handed to the screens per frame; the rest wait for the next one
+NETWORK_MESSAGES_PER_FRAME = 64
+# Entity snapshots per second sent by the server, and how far behind them frames are drawn (s)
+SNAPSHOT_RATE = 20
+INTERPOLATION_DELAY = 0.1
+
+# Log level per subsystem; DEBUG on "network" logs every server message
+LOG_LEVELS = {"network": "INFO", "ui": "INFO", "assets": "WARNING"}
+
+# Scaled images and hit regions derived from the assets, reused across runs
+CACHE_DIR = "client/data/cache"
+CACHE_MAX_MB = 256
+# In-memory budget for loaded and scaled images shared between screens
+ASSET_CACHE_MB = 192
+# Rendered text surfaces kept by client.ui.text.text_cache
+TEXT_CACHE_ENTRIES = 512
+# Baked highlight/panel overlay surfaces kept by client.ui.render.overlays
+OVERLAY_CACHE_ENTRIES = 64
+# Threads decoding assets behind the startup splash (and after a resolution change)
+PRELOAD_WORKERS = 4
+# Resample backgrounds with smoothscale (slower, done once per resolution) instead of scale
+SMOOTH_SCALING = False
+# Print time to first frame / time to interactive at startup
+STARTUP_TIMINGS = False
 
 # Defaults
 DEFAULT_SCREEN_WIDTH = 800
@@ -1,4 +1,5 @@
 import pygame
+from client.ui.text import text_cache
 
 class Button:
     def __init__(self, rect, text, font, color=(255,255,255), hover_color=(50,150,255)):
@@ -12,7 +13,7 @@ class Button:
         mouse_pos = pygame.mouse.get_pos()
         color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.color
         pygame.draw.rect(screen, color, self.rect)
-        text_surf = self.font.render(self.text, True, (0,0,0))
+        text_surf = text_cache.render(self.font, self.text, True, (0,0,0))
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
 
@@ -1,29 +1,37 @@
 import pygame
 import re
 import time
-from client import config
+from client.assets import assets
+from client.ui.display import on_resolution_change
+from client.ui.scenes import Scene
+from client.ui.scheduler import blink_wake_in
+from client.ui.text import text_cache
 
-class CharacterCreation:
+class CharacterCreation(Scene):
     NAME_REGEX = re.compile(r'^[A-Za-z0-9]{1,12}$')  # letters & numbers only, max 12
 
     def __init__(self, screen, client):
         self.screen = screen
         self.client = client
-        self.font = pygame.font.SysFont(None, 32)
+        self.font = assets.font(None, 32)
         self.name_text = ""
         self.cursor_visible = True
         self.last_blink = time.time()
-        self.created_character = None
+        self.client.dispatcher.subscribe("character_created", self._on_character_created)
+        on_resolution_change(self.on_resolution_change)
+
+    def on_resolution_change(self, screen):
+        self.screen = screen
 
     def draw(self):
         self.screen.fill((0,0,0))
         # Title
-        title_surf = self.font.render("Enter Character Name:", True, (255,255,255))
+        title_surf = text_cache.render(self.font, "Enter Character Name:", True, (255,255,255))
         self.screen.blit(title_surf, (50, 100))
 
         # Input box
         pygame.draw.rect(self.screen, (255,255,255), (50, 150, 400, 40), 2)
-        text_surf = self.font.render(self.name_text, True, (255,255,255))
+        text_surf = text_cache.render_input("character_name", self.font, self.name_text, (255,255,255))
         self.screen.blit(text_surf, (55, 155))
 
         # Cursor blink
@@ -36,54 +44,45 @@ class CharacterCreation:
     def validate_name(self, name):
         return self.NAME_REGEX.match(name) is not None
 
-    def run(self):
-        clock = pygame.time.Clock()
-        running = True
-
-        # Register callback for server messages
-        original_callback = self.client.on_message
-        def temp_callback(message):
-            if message.get("action") == "character_created":
-                self.created_character = message["character"]
-            else:
-                if original_callback:
-                    original_callback(message)
-        self.client.on_message = temp_callback
-
-        while running:
-            self.draw()
-
-            # Cursor blink
-            if time.time() - self.last_blink > 0.5:
-                self.cursor_visible = not self.cursor_visible
-                self.last_blink = time.time()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        if self.validate_name(self.name_text):
-                            # Send create_character request to server
-                            self.client.send_json({
-                                "action": "create_character",
-                                "data": {"name": self.name_text}
-                            })
-                        else:
-                            print("Invalid name! Only letters and numbers, max 12 characters.")
-                    elif event.key == pygame.K_BACKSPACE:
-                        self.name_text = self.name_text[:-1]
-                    else:
-                        char = event.unicode
-                        if char.isalnum() and len(self.name_text) < 12:
-                            self.name_text += char
-
-            # If character created, return it
-            if self.created_character:
-                self.client.on_message = original_callback  # restore original callback
-                return self.created_character
-
-            clock.tick(config.FPS)
-
-        self.client.on_message = original_callback
-        return None
+    # ---------------- Scene ----------------
+    def enter(self, **params):
+        self.name_text = ""
+
+    def _on_character_created(self, message):
+        # Return the new character to whoever opened this screen
+        if self.manager is not None and self.manager.top is self:
+            self.manager.pop(message["character"])
+
+    def update(self):
+        # Cursor blink
+        if time.time() - self.last_blink > 0.5:
+            self.cursor_visible = not self.cursor_visible
+            self.last_blink = time.time()
+
+    def wake_in(self):
+        return blink_wake_in(self.last_blink)
+
+    # ---------------- Input ----------------
+    keys = {pygame.K_RETURN: "submit", pygame.K_BACKSPACE: "backspace"}
+
+    def submit(self):
+        if self.validate_name(self.name_text):
+            # Send create_character request to server
+            self.client.send_json({
+                "action": "create_character",
+                "data": {"name": self.name_text}
+            })
+        else:
+            print("Invalid name! Only letters and numbers, max 12 characters.")
+
+    def backspace(self):
+        self.name_text = self.name_text[:-1]
+
+    def key(self, event):
+        char = event.unicode
+        if char.isalnum() and len(self.name_text) < 12:
+            self.name_text += char
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.manager.pop(None)
@@ -1,25 +1,29 @@
 import pygame
 import json
 from client import config
-from client.ui.character_creation import CharacterCreation
+from client.assets import assets
+from client.cache import cached_regions
+from client.ui.display import on_resolution_change
+from client.ui.hittest import HitGrid
+from client.ui.render import RetainedRenderer, overlays
+from client.ui.scenes import Scene
+from client.ui.text import text_cache
 
-class CharacterSelection:
-    def __init__(self, screen, characters, client):
+class CharacterSelection(Scene):
+    HIGHLIGHT_COLOR = (255, 215, 0, 100)
+    SELECTED_COLOR = (0, 200, 255, 120)
+
+    def __init__(self, screen, state, client):
         self.screen = screen
-        self.characters = characters  # list of dicts (max 6)
+        self.state = state  # core.game_state.GameState
+        self.characters = state.character_list()  # Character records, one per slot (max 6)
+        self.labels = {character.id: self._label(character) for character in self.characters}
+        state.subscribe(self.on_state_change)
         self.client = client
         self.selected_slot = None  # index of chosen slot
 
-        # Load images
-        self.bg_img = pygame.image.load("client/data/assets/images/character_selection.png").convert_alpha()
-        self.mask_img = pygame.image.load("client/data/assets/images/character_selection_mask.png").convert()
-
-        # Scale images to screen size
-        self.bg_img = pygame.transform.scale(self.bg_img, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-        self.mask_img = pygame.transform.scale(self.mask_img, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-
-        # Font proportional to screen height
-        self.font = pygame.font.SysFont(config.FONT_NAME, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+        self.bg_path = "client/data/assets/images/character_selection.png"
+        self.mask_path = "client/data/assets/images/character_selection_mask.png"
 
         # Map overlay colors -> field names
         self.color_map = {
@@ -29,209 +33,265 @@ class CharacterSelection:
             (0, 0, 255): "delete_btn",
         }
 
-        # Build masks for clickable/highlightable regions
-        self.masks = self._build_masks()
+        # Background, font, masks and overlays for the current resolution
+        self.renderer = RetainedRenderer()
+        self.on_resolution_change(screen)
+        on_resolution_change(self.on_resolution_change)
 
         # Focus order
         self.focus_order = [f"slot{i}" for i in range(len(self.masks['slots']))] + ["start_btn", "delete_btn", "return_btn"]
         self.active_field = self.focus_order[0]
+        self.prompt = ConfirmPrompt(screen)
+        self._pending = None
+        self._delete_target = None  # character the open delete prompt asks about
+        self._deletion = None  # (Future of the server's reply, character) while a delete is in flight
+
+    def on_resolution_change(self, screen):
+        """Load everything sized to the screen; the mask image is only read on a cache miss."""
+        self.screen = screen
+        self.bg_img = assets.scaled(self.bg_path, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        self.font = assets.font(config.FONT_NAME, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+
+        # Build masks for clickable/highlightable regions
+        self.masks = self._build_masks()
+        self._bake_overlays()
+        self.renderer.invalidate()
 
     def _build_masks(self):
-        """Scan mask image and create pygame.Mask for each field."""
-        masks = {}
-        slot_masks = []
-        width, height = self.mask_img.get_size()
-
-        # Initialize masks for buttons
-        for color, name in self.color_map.items():
-            if name != "slot":
-                masks[name] = pygame.Mask((width, height))
-
-        visited = pygame.Mask((width, height))
-
-        for x in range(width):
-            for y in range(height):
-                color = self.mask_img.get_at((x, y))[:3]
-                if color not in self.color_map:
-                    continue
-                field_name = self.color_map[color]
-
-                if field_name == "slot" and not visited.get_at((x, y)):
-                    # Flood-fill a new slot mask
-                    slot_mask = pygame.Mask((width, height))
-                    to_check = [(x, y)]
-                    while to_check:
-                        cx, cy = to_check.pop()
-                        if 0 <= cx < width and 0 <= cy < height:
-                            if not visited.get_at((cx, cy)) and self.mask_img.get_at((cx, cy))[:3] == color:
-                                visited.set_at((cx, cy), 1)
-                                slot_mask.set_at((cx, cy), 1)
-                                to_check.extend([(cx+1, cy), (cx-1, cy), (cx, cy+1), (cx, cy-1)])
-                    slot_masks.append(slot_mask)
-
-                elif field_name != "slot":
-                    masks[field_name].set_at((x, y), 1)
-
-        # Sort slots roughly top→bottom
-        slot_masks.sort(key=lambda m: m.get_bounding_rects()[0].y if m.get_bounding_rects() else 9999)
-        masks["slots"] = slot_masks[:6]
+        """Label the mask image into per-button masks and the ordered slot masks."""
+        size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
+        regions = cached_regions(self.mask_path, size, self.color_map, split=("slot",))
+        masks = {name: mask for name, mask in regions.items() if name != "slot"}
+        masks["slots"] = regions.get("slot", [])[:6]
         return masks
 
+    def _bake_overlays(self):
+        """Bake every region's highlight (and each slot's selected state) at its bounding rect,
+        and index the regions for hit-testing by those rects.
+        """
+        self.hits = HitGrid()
+        self.slot_rects = []  # bounding rect per slot, for the slot labels
+        for i, mask in enumerate(self.masks["slots"]):
+            bounds = overlays.mask(mask, self.HIGHLIGHT_COLOR)[1]
+            overlays.mask(mask, self.SELECTED_COLOR)
+            self.slot_rects.append(bounds)
+            self.hits.add(f"slot{i}", mask, bounds)
+        for name in ("start_btn", "delete_btn", "return_btn"):
+            if name in self.masks:
+                self.hits.add(name, self.masks[name], overlays.mask(self.masks[name], self.HIGHLIGHT_COLOR)[1])
+
     def draw_highlight(self, field):
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
+        mask = None
         if field.startswith("slot"):
             index = int(field.replace("slot", ""))
             if index < len(self.masks["slots"]):
-                self.masks["slots"][index].to_surface(overlay, setcolor=(255, 215, 0, 100), unsetcolor=(0, 0, 0, 0))
+                mask = self.masks["slots"][index]
         else:
             mask = self.masks.get(field)
-            if mask:
-                mask.to_surface(overlay, setcolor=(255, 215, 0, 100), unsetcolor=(0, 0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        if mask:
+            self.renderer.mask("highlight", mask, self.HIGHLIGHT_COLOR)
 
     def draw_selected_slot(self):
         if self.selected_slot is not None and self.selected_slot < len(self.masks["slots"]):
-            overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-            self.masks["slots"][self.selected_slot].to_surface(
-                overlay, setcolor=(0, 200, 255, 120), unsetcolor=(0, 0, 0, 0)
-            )
-            self.screen.blit(overlay, (0, 0))
+            self.renderer.mask("selected", self.masks["slots"][self.selected_slot], self.SELECTED_COLOR)
 
     def draw(self):
-        self.screen.blit(self.bg_img, (0, 0))
+        self.renderer.begin(self.screen, self.bg_img)
         self.draw_selected_slot()
         self.draw_highlight(self.active_field)
 
         # Draw characters inside slots
-        for i, mask in enumerate(self.masks["slots"]):
-            if not mask:
-                continue
-            rects = mask.get_bounding_rects()
-            if not rects:
+        for i, rect in enumerate(self.slot_rects):
+            if not rect:
                 continue
-            rect = rects[0]
             if i < len(self.characters):
-                char = self.characters[i]
-                text = f"{char['name']} (Lv {char['stats'].get('Level', 0)})"
+                text = self.labels[self.characters[i].id]
             else:
                 text = "Empty Slot"
-            surf = self.font.render(text, True, (255, 255, 255))
-            self.screen.blit(surf, (rect.centerx - surf.get_width() // 2, rect.centery - surf.get_height() // 2))
+            self.renderer.text(("slot", i), self.font, text, (255, 255, 255), center=rect.center)
 
-        pygame.display.flip()
+        self.renderer.present()
+
+    @staticmethod
+    def _label(character):
+        return f"{character.name} (Lv {character.stats.get('Level', 0)})"
+
+    def on_state_change(self, change):
+        """Relabel only the characters whose name or level changed."""
+        self.characters = self.state.character_list()
+        for char_id in change.removed:
+            self.labels.pop(char_id, None)
+        for char_id in change.added:
+            self.labels[char_id] = self._label(self.state.characters[char_id])
+        for char_id, fields in change.updated.items():
+            if "name" in fields or "level" in fields:
+                self.labels[char_id] = self._label(self.state.characters[char_id])
+        if self.selected_slot is not None and self.selected_slot >= len(self.characters):
+            self.selected_slot = None
 
     def _get_field_at_pos(self, pos):
-        x, y = pos
-        for i, mask in enumerate(self.masks["slots"]):
-            if mask.get_at((x, y)):
-                return f"slot{i}"
-        for name in ("start_btn", "delete_btn", "return_btn"):
-            mask = self.masks.get(name)
-            if mask.get_at((x, y)):
-                return name
-        return None
-    
-    def _confirm_delete(self, name):
-        font = pygame.font.SysFont(config.FONT_NAME, 24)
-        text = font.render(f"Delete {name}? Y/N", True, (255, 0, 0))
-        self.screen.blit(text, (config.SCREEN_WIDTH//2 - text.get_width()//2,
-                                config.SCREEN_HEIGHT//2 - text.get_height()//2))
-        pygame.display.flip()
+        return self.hits.at(pos)
+
+    # ---------------- Scene ----------------
+    def enter(self, **params):
+        super().enter(**params)
+        self.selected_slot = None
+        self.active_field = self.focus_order[0]
+        self._pending = None  # what the scene pushed on top of this one is for
 
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_y:
-                        return True
-                    elif event.key == pygame.K_n:
-                        return False
+    def resume(self, result):
+        super().resume(result)
+        pending, self._pending = self._pending, None
+        # A created character is already in the state (and in its slot)
+        if pending == "create_and_start" and result:
+            character = self.state.characters.get(result["id"])
+            if character is not None:
+                self.selected_slot = self.characters.index(character)
+                self._start(character)
+        elif pending == "delete":
+            char, self._delete_target = self._delete_target, None
+            # The slots may have changed under the prompt; delete the character it named
+            if result and char is not None and self.state.characters.get(char.id) is char:
+                self._delete(char)
 
-    def _activate_field(self, field):
-        if field.startswith("slot"):
-            index = int(field.replace("slot", ""))
-            self.selected_slot = index
-            # If empty slot → open character creation
-            if index >= len(self.characters):  
-                creator = CharacterCreation(self.screen, self.client)
-                new_char = creator.run()
-                if new_char:  
-                    # Append new character to list
-                    self.characters.append(new_char)
-                    self.selected_slot = index
-            return None
-        elif field == "start_btn":
-            if self.selected_slot is not None:
-                if self.selected_slot < len(self.characters):
-                    # Valid character
-                    return self.characters[self.selected_slot]
-                else:
-                    # Empty slot → open character creation
-                    creator = CharacterCreation(self.screen, self.client)
-                    new_char = creator.run()
-                    if new_char:
-                        self.characters.append(new_char)
-                        self.selected_slot = len(self.characters) - 1
-                        return new_char
-            print("No character selected!")
-            return None
-
-        elif field == "return_btn":
-            return "menu"
-        
-        elif field == "delete_btn":
+    def update(self):
+        # The reply completes the Future on the receive thread, which also wakes this loop
+        if self._deletion is None or not self._deletion[0].done():
+            return
+        (future, char), self._deletion = self._deletion, None
+        if future.cancelled() or future.exception() is not None or not future.result():
+            print(f"Deleting {char.name} failed")
+            return
+        print(f"Deleted {char.name} confirmed by server")
+        self.state.remove_character(char.id)
+        self.selected_slot = None
+
+    def _delete(self, char):
+        """Ask the server to delete ``char``; ``update`` applies its answer."""
+        if self._deletion is not None:
+            return  # one delete at a time
+        future = self.client.delete_character_async(char.id)
+        if future is not None:
+            self._deletion = (future, char)
+
+    def _start(self, character):
+        self.manager.quit({"selected_character": character})
+
+    def _create_character(self, pending):
+        self._pending = pending
+        self.manager.push("character_creation")
+
+    # ---------------- Input ----------------
+    keys = {
+        pygame.K_DELETE: "delete_selected",
+        pygame.K_DOWN: "focus_next",
+        pygame.K_TAB: "focus_next",
+        pygame.K_UP: "focus_previous",
+        pygame.K_RETURN: "press_focused",
+    }
+    actions = {"start_btn": "start_selected", "return_btn": "return_to_menu", "delete_btn": "confirm_delete"}
+
+    def focus_next(self):
+        idx = self.focus_order.index(self.active_field)
+        self.active_field = self.focus_order[(idx + 1) % len(self.focus_order)]
+
+    def focus_previous(self):
+        idx = self.focus_order.index(self.active_field)
+        self.active_field = self.focus_order[(idx - 1) % len(self.focus_order)]
+
+    def press_focused(self):
+        if self.active_field.startswith("slot"):
+            self.selected_slot = int(self.active_field.replace("slot", ""))
+        elif self.active_field == "start_btn":
             if self.selected_slot is not None and self.selected_slot < len(self.characters):
-                char = self.characters[self.selected_slot]
-                confirm = self._confirm_delete(char["name"])
-                if confirm:
-                    response = self.client.delete_character(char["id"])
-                    if response:
-                        print(f"Deleted {char['name']} confirmed by server")
-                        self.characters.pop(self.selected_slot)
-                        self.selected_slot = None
-            return None
-
-
-    def run(self):
-        clock = pygame.time.Clock()
-        while True:
-            self.draw()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return None
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_DELETE and self.selected_slot is not None:
-                        if self.selected_slot < len(self.characters):
-                            char = self.characters[self.selected_slot]
-                            response = self.client.delete_character(char["id"])
-                            if response:
-                                print(f"Deleted character {char['name']} confirmed by server")
-                                del self.characters[self.selected_slot]
-                                self.selected_slot = None
-                    if event.key in (pygame.K_DOWN, pygame.K_TAB):
-                        idx = self.focus_order.index(self.active_field)
-                        self.active_field = self.focus_order[(idx + 1) % len(self.focus_order)]
-                    elif event.key == pygame.K_UP:
-                        idx = self.focus_order.index(self.active_field)
-                        self.active_field = self.focus_order[(idx - 1) % len(self.focus_order)]
-                    elif event.key == pygame.K_RETURN:
-                        if self.active_field.startswith("slot"):
-                            self.selected_slot = int(self.active_field.replace("slot", ""))
-                        elif self.active_field == "start_btn":
-                            if self.selected_slot is not None:
-                                return self.characters[self.selected_slot]
-                        elif self.active_field == "return_btn":
-                            return "menu"
-
-                elif event.type == pygame.MOUSEMOTION:
-                    field = self._get_field_at_pos(event.pos)
-                    if field:
-                        self.active_field = field
-
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    field = self._get_field_at_pos(event.pos)
-                    if field:
-                        result = self._activate_field(field)
-                        if result is not None:
-                            return result
-
-            clock.tick(config.FPS)
+                self._start(self.characters[self.selected_slot])
+        elif self.active_field == "return_btn":
+            self.return_to_menu()
+
+    def delete_selected(self):
+        # The Delete key skips the confirmation prompt
+        if self.selected_slot is not None and self.selected_slot < len(self.characters):
+            self._delete(self.characters[self.selected_slot])
+
+    def select_slot(self, index):
+        self.selected_slot = index
+        # If empty slot → open character creation
+        if index >= len(self.characters):
+            self._create_character("create_in_slot")
+
+    def start_selected(self):
+        if self.selected_slot is not None:
+            if self.selected_slot < len(self.characters):
+                # Valid character
+                self._start(self.characters[self.selected_slot])
+            else:
+                # Empty slot → open character creation
+                self._create_character("create_and_start")
+            return
+        print("No character selected!")
+
+    def return_to_menu(self):
+        self.manager.pop("menu")
+
+    def confirm_delete(self):
+        if self.selected_slot is not None and self.selected_slot < len(self.characters):
+            char = self._delete_target = self.characters[self.selected_slot]
+            self._pending = "delete"
+            self.manager.push(self.prompt, text=f"Delete {char.name}? Y/N")
+
+    def hit_test(self, pos):
+        return self._get_field_at_pos(pos)
+
+    def hover(self, field):
+        if field:
+            self.active_field = field
+
+    def click(self, field, event):
+        if event.button != 1 or not field:
+            return
+        if field.startswith("slot"):
+            self.select_slot(int(field.replace("slot", "")))
+        else:
+            self.activate(field)
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.manager.pop(None)
+
+
+class ConfirmPrompt(Scene):
+    """Y/N question drawn over the scene below; pops True or False."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.text = None
+        self._drawn = False
+        on_resolution_change(self.on_resolution_change)
+
+    def on_resolution_change(self, screen):
+        self.screen = screen
+
+    def enter(self, text="", **params):
+        font = assets.font(config.FONT_NAME, 24)
+        self.text = text_cache.render(font, text, True, (255, 0, 0))
+        self._drawn = False
+
+    def draw(self):
+        if self._drawn:
+            return
+        self.screen.blit(self.text, (config.SCREEN_WIDTH//2 - self.text.get_width()//2,
+                                     config.SCREEN_HEIGHT//2 - self.text.get_height()//2))
+        pygame.display.flip()
+        self._drawn = True
+
+    keys = {pygame.K_y: "confirm", pygame.K_n: "decline"}
+
+    def confirm(self):
+        self.manager.pop(True)
+
+    def decline(self):
+        self.manager.pop(False)
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.decline()
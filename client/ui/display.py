@@ -0,0 +1,54 @@
+# client/ui/display.py
+"""The display mode, and telling the screens when it changes.
+
+``SettingsMenu.apply_changes`` calls ``change_resolution``, which opens
+the new display and calls every listener registered with
+``on_resolution_change`` with the new screen surface, in registration
+order. Each screen rescales its assets (through the shared AssetManager,
+so once per asset and resolution) and relayouts once, instead of
+checking the size every frame.
+
+Bound methods are held weakly, so a screen that is dropped stops
+listening without unregistering.
+"""
+import os
+import weakref
+
+import pygame
+
+from client import config
+from core.utils import get_logger
+
+log = get_logger("ui")
+
+_listeners = []  # callables returning the listener, or None once it is gone
+
+
+def on_resolution_change(callback):
+    """Call ``callback(screen)`` after every resolution or screen mode change."""
+    if hasattr(callback, "__self__"):
+        _listeners.append(weakref.WeakMethod(callback))
+    else:
+        _listeners.append(lambda: callback)
+
+
+def set_mode(size, mode):
+    """Open a centred display of ``size`` in ``mode`` ("Window" or "Full Screen") and record both in config."""
+    os.environ['SDL_VIDEO_CENTERED'] = '1'
+    flags = pygame.FULLSCREEN if mode == "Full Screen" else 0
+    config.SCREEN_WIDTH, config.SCREEN_HEIGHT = size
+    config.SCREEN_MODE = mode
+    return pygame.display.set_mode(size, flags)
+
+
+def change_resolution(size, mode):
+    """``set_mode``, then notify the listeners; returns the new screen surface."""
+    screen = set_mode(size, mode)
+    log.info("Resolution changed to %dx%d (%s)", size[0], size[1], mode)
+    for ref in list(_listeners):
+        callback = ref()
+        if callback is None:
+            _listeners.remove(ref)
+        else:
+            callback(screen)
+    return screen
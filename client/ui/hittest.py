@@ -0,0 +1,63 @@
+# client/ui/hittest.py
+"""Which UI region is under a point, without scanning every region.
+
+HitGrid buckets regions by the 16x16 pixel cells their bounding rects
+cover. A query looks up the point's cell and tests only the regions
+there, usually one, against the exact rect or mask. Queries are O(1)
+however many regions a screen has, and full-screen masks are never
+scanned, so MOUSEMOTION can be answered on every event.
+"""
+from client.ui.masks import mask_bounds
+
+# Cell edge as a power of two (16 px)
+CELL_SHIFT = 4
+
+
+class HitGrid:
+    def __init__(self, cell_shift=CELL_SHIFT):
+        self.cell_shift = cell_shift
+        self._cells = {}  # (cx, cy) -> tuple of (region, bounds, mask or None), in add order
+        self._rects = None  # what ``set_rects`` last built from
+
+    def add(self, region, shape, bounds=None):
+        """Add ``region`` covering a Rect, or the set bits of a screen-sized Mask.
+
+        ``bounds`` skips measuring a mask that has already been measured.
+        Where regions overlap, the one added first wins.
+        """
+        if isinstance(shape, tuple) or hasattr(shape, "collidepoint"):
+            bounds, mask = shape, None
+        else:
+            bounds, mask = bounds or mask_bounds(shape), shape
+        if not bounds:
+            return
+        x, y, w, h = bounds
+        if w <= 0 or h <= 0:
+            return
+        entry = (region, bounds, mask)
+        shift = self.cell_shift
+        for cx in range(x >> shift, ((x + w - 1) >> shift) + 1):
+            for cy in range(y >> shift, ((y + h - 1) >> shift) + 1):
+                self._cells[cx, cy] = self._cells.get((cx, cy), ()) + (entry,)
+
+    def set_rects(self, regions):
+        """Rebuild from (region, rect) pairs, unless they are the same as last time."""
+        rects = [(region, tuple(rect)) for region, rect in regions]
+        if rects != self._rects:
+            self.clear()
+            for region, rect in rects:
+                self.add(region, rect)
+            self._rects = rects
+
+    def at(self, pos):
+        """The region under ``pos``, or None."""
+        x, y = pos
+        for region, bounds, mask in self._cells.get((x >> self.cell_shift, y >> self.cell_shift), ()):
+            bx, by, bw, bh = bounds
+            if bx <= x < bx + bw and by <= y < by + bh and (mask is None or mask.get_at((x, y))):
+                return region
+        return None
+
+    def clear(self):
+        self._cells.clear()
+        self._rects = None
@@ -0,0 +1,80 @@
+# client/ui/input.py
+"""Routing a frame's events to the top scene.
+
+The SceneManager hands each batch from the FrameScheduler to
+``InputDispatcher.dispatch``:
+
+- MOUSEMOTION is coalesced: only the last motion event of the batch is
+  hit-tested (``scene.hit_test``), and ``scene.hover(region)`` only runs
+  when the region under the pointer changes. A key press or click resets
+  that, so moving within a region after the keyboard moved the
+  selection takes the hover back.
+- KEYDOWN is looked up in the scene's ``keys`` table (key -> method
+  name); other keys go to ``scene.key(event)``, e.g. for text input.
+- MOUSEBUTTONDOWN goes to ``scene.click(region, event)`` with the region
+  under the click.
+- Everything else goes to ``scene.handle_event(event)``.
+
+Each event goes to whichever scene is on top when it is handled, so
+events after a push or pop reach the new scene. Time spent per frame is
+kept in the dispatcher's counters.
+"""
+import time
+
+import pygame
+
+
+class InputDispatcher:
+    def __init__(self):
+        self._hover = None  # (scene, region) last reported to scene.hover
+        self.frames = 0
+        self.events = 0
+        self.motion_dropped = 0
+        self.hover_changes = 0
+        self.last_ms = 0.0  # input handling time of the latest frame
+        self.total_ms = 0.0
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.frames if self.frames else 0.0
+
+    def dispatch(self, manager, events):
+        started = time.perf_counter()
+        last_motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                last_motion = event
+
+        for event in events:
+            scene = manager.top
+            if scene is None:
+                break
+            if event.type == pygame.MOUSEMOTION:
+                if event is not last_motion:
+                    self.motion_dropped += 1
+                    continue
+                self.hover(scene, event.pos)
+            elif event.type == pygame.KEYDOWN:
+                self._hover = None
+                name = scene.keys.get(event.key)
+                if name is not None:
+                    getattr(scene, name)()
+                else:
+                    scene.key(event)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self._hover = None
+                scene.click(scene.hit_test(event.pos), event)
+            else:
+                scene.handle_event(event)
+
+        self.last_ms = (time.perf_counter() - started) * 1000
+        self.total_ms += self.last_ms
+        self.frames += 1
+        self.events += len(events)
+
+    def hover(self, scene, pos):
+        region = scene.hit_test(pos)
+        if self._hover != (scene, region):
+            self._hover = (scene, region)
+            self.hover_changes += 1
+            scene.hover(region)
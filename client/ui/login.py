@@ -2,38 +2,45 @@
 import pygame
 from client import config
 import time
-import threading
 import os
+from core.utils import get_logger
 from network.client import GameClient
-from client.ui.character_selection import CharacterSelection
-from client.ui.character_creation import CharacterCreation
+from client.assets import assets
+from client.cache import cached_color_bounds
+from client.ui.display import on_resolution_change
+from client.ui.hittest import HitGrid
+from client.ui.render import RetainedRenderer, overlays
+from client.ui.scenes import Scene
+from client.ui.scheduler import blink_wake_in, post_network_event
+
+log = get_logger("ui")
+
+class Login(Scene):
+    HIGHLIGHT_COLOR = (255, 215, 0, 50)  # semi-transparent highlight
 
-class Login:
     def __init__(self, screen, client: GameClient):
         self.screen = screen
         self.client = client
-        self.client.connect()
+        self.client.connect_async()  # no-op when already connected or connecting
 
         self.logged_in = False
-        self.characters = []
         # Load server ip & port
         self.server_ip = config.SERVER_IP
         self.server_port = config.SERVER_PORT
 
-        # Load window & mask
-        self.base_img = pygame.image.load("client/data/assets/images/login_window.png").convert_alpha()
-        self.mask_img = pygame.image.load("client/data/assets/images/login_window_mask.png").convert()
+        # Load window; the mask is only read on a field-rect cache miss
+        self.window_path = "client/data/assets/images/login_window.png"
+        self.base_img = assets.image(self.window_path)
+        self.mask_path = "client/data/assets/images/login_window_mask.png"
 
-        # Load background and scale to screen size
-        self.bg_img = pygame.image.load("client/data/assets/images/menu_bg.png").convert_alpha()
-        self.bg_img = pygame.transform.scale(self.bg_img, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        # Load background scaled to screen size
+        self.bg_img = assets.scaled("client/data/assets/images/menu_bg.png", (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
 
         self.base_w, self.base_h = self.base_img.get_size()
         scale_ratio = config.SCREEN_HEIGHT * 0.7 / self.base_h
         self.scaled_w = int(self.base_w * scale_ratio)
         self.scaled_h = int(self.base_h * scale_ratio)
-        self.window_img = pygame.transform.scale(self.base_img, (self.scaled_w, self.scaled_h))
-        self.mask_img = pygame.transform.scale(self.mask_img, (self.scaled_w, self.scaled_h))
+        self.window_img = assets.scaled(self.window_path, (self.scaled_w, self.scaled_h))
         self.window_rect = self.window_img.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2))
 
         # Map colors to fields/buttons
@@ -45,13 +52,8 @@ class Login:
         }
 
         # Extract bounding boxes for all fields/buttons in screen space
-        self.last_mouse_pos = pygame.mouse.get_pos() # Track last mouse pos
-        self.option_rects = []
-        self.fields_rects = {}
-        for color, name in self.color_map.items():
-            rect = self._find_color_bounds(color)
-            if rect:
-                self.fields_rects[name] = rect.move(self.window_rect.topleft)
+        self.field_hits = HitGrid()  # field name by position
+        self.fields_rects = self._find_field_rects()
 
         # Focus order
         self.focus_order = ["username", "password", "login_btn", "signup_btn"]
@@ -60,24 +62,23 @@ class Login:
 
         # State
         self.logged_in = False
-        self.characters = []
+        self.state = client.state  # the user's characters, kept current by the client
         self.username_text = self._load_username_from_file()
         self.password_text = ""
-        self.font = pygame.font.SysFont(config.FONT_NAME, 24)
+        self.font = assets.font(config.FONT_NAME, 24)
+        self.status_font = assets.font(config.FONT_NAME, 20)
 
         # Cursor blink
         self.cursor_visible = True
         self.last_blink = time.time()
+        self.renderer = RetainedRenderer()
+        on_resolution_change(self.rescale_ui)
+        self._pending = None  # what the scene pushed on top of this one is for
 
-        # Networking client and synchronization primitives
-        self.client = GameClient(self.server_ip, int(self.server_port))
-        self.server_event = threading.Event()
-        self.server_action = None
-        self.server_payload = None
-
-        # assign callback
-        self.client.on_message = self._on_server_message
-        self.client.connect()
+        # Server replies are delivered on the UI thread by the SceneManager
+        self.client.on_wakeup = post_network_event
+        self.client.dispatcher.subscribe("character_list", self._on_character_list)
+        self.client.dispatcher.subscribe("login_failed", self._on_login_failed)
 
     # ---------------- Persistence Methods ----------------
     def _save_username_to_file(self, username):
@@ -96,33 +97,55 @@ class Login:
             return ""
 
     # ---------------- Network & UI Methods ----------------
-    def _on_server_message(self, message: dict):
-        """This runs on the client's network thread. Keep it minimal: set an event + payload."""
-        self.server_action = message.get("action")
-        self.server_payload = message
-        self.server_event.set()
-
-    def _find_color_bounds(self, color):
-        pixels = pygame.PixelArray(self.mask_img)
-        coords = [(x, y) for x in range(self.mask_img.get_width())
-                          for y in range(self.mask_img.get_height())
-                          if self.mask_img.get_at((x, y))[:3] == color]
-        pixels.close()
-        if not coords:
+    def _on_character_list(self, message: dict):
+        self.logged_in = True
+
+        # Save username to disk for future sessions
+        self._save_username_to_file(self.username_text.strip())
+
+        if self.manager is None or self.manager.top is not self:
+            return  # e.g. resent after a reconnect while another screen is shown
+        # If no characters, open creation screen; otherwise character selection
+        if not self.state.characters:
+            self._pending = "create"
+            self.manager.push("character_creation")
+        else:
+            self._select_character()
+
+    def _on_login_failed(self, message: dict):
+        print("Login failed:", message.get("reason", "Unknown"))
+
+    def _connection_status(self):
+        """Line shown under the login window until the client is connected, or None."""
+        client = self.client
+        if client.status == "connected":
             return None
-        xs, ys = zip(*coords)
-        return pygame.Rect(min(xs), min(ys), max(xs)-min(xs), max(ys)-min(ys))
+        if client.last_error is not None:
+            return f"Cannot reach server: {client.last_error}"
+        if client.status == "disconnected":
+            return "Connection lost, reconnecting..."
+        return f"Connecting to {client.host}:{client.port}..."
+
+    def _find_field_rects(self):
+        """Screen-space rect of every field/button painted on the scaled mask."""
+        bounds = cached_color_bounds(self.mask_path, (self.scaled_w, self.scaled_h), self.color_map)
+        rects = {
+            self.color_map[color]: rect.move(self.window_rect.topleft)
+            for color, rect in bounds.items() if rect
+        }
+        for rect in rects.values():
+            overlays.fill(rect.size, self.HIGHLIGHT_COLOR)  # bake the focus highlights up front
+        self.field_hits.set_rects(rects.items())
+        return rects
 
     def draw(self):
-        self.screen.blit(self.bg_img, (0, 0))
-        self.screen.blit(self.window_img, self.window_rect)
+        r = self.renderer
+        r.begin(self.screen, self.bg_img)
+        r.image("window", self.window_img, self.window_rect.topleft)
 
         # Draw highlight overlay for active field
         if self.active_field in self.fields_rects:
-            rect = self.fields_rects[self.active_field]
-            s = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA)
-            s.fill((255, 215, 0, 50))  # semi-transparent highlight
-            self.screen.blit(s, (rect.x, rect.y))
+            r.fill("highlight", self.fields_rects[self.active_field], self.HIGHLIGHT_COLOR)
 
         # Cursor blink toggle
         if time.time() - self.last_blink > 0.5:
@@ -134,17 +157,22 @@ class Login:
             if field in self.fields_rects:
                 rect = self.fields_rects[field]
                 text = self.username_text if field == "username" else "*" * len(self.password_text)
-                text_surface = self.font.render(text, True, (255, 255, 255))
-                self.screen.blit(text_surface, (rect.x + 5, rect.y + (rect.h - text_surface.get_height()) // 2))
+                text_rect = r.input_text(field, self.font, text, (255, 255, 255), midleft=(rect.x + 5, rect.centery))
 
                 # Draw cursor if active
                 if self.active_field == field and self.cursor_visible:
-                    cursor_h = int(text_surface.get_height() * 0.6)
-                    cursor_x = rect.x + 5 + text_surface.get_width() + 2
+                    cursor_h = int(self.font.get_height() * 0.6)
+                    cursor_x = rect.x + 5 + text_rect.w + 2
                     cursor_y = rect.y + (rect.h - cursor_h) // 2
-                    pygame.draw.line(self.screen, (255, 255, 255), (cursor_x, cursor_y), (cursor_x, cursor_y + cursor_h), 1)
+                    r.fill("cursor", (cursor_x, cursor_y, 1, cursor_h + 1), (255, 255, 255))
 
-        pygame.display.flip()
+        # Connection status; redrawn when the client wakes the loop on a change
+        status = self._connection_status()
+        if status:
+            r.text("status", self.status_font, status, (255, 200, 120),
+                   midtop=(self.window_rect.centerx, self.window_rect.bottom + 10))
+
+        r.present()
 
     def attempt_login(self):
         if not self.username_text.strip():
@@ -156,31 +184,32 @@ class Login:
         elif len(self.password_text.strip()) < 6:
             print("Password must be at least 6 characters")
         else:
-            print("Login clicked:", self.username_text, self.password_text)
-            self.client.login(self.username_text.strip(), self.password_text.strip())
+            log.info("Login clicked: %s", self.username_text)
+            # Answered through the dispatcher (_on_character_list / _on_login_failed)
+            self.client.login_async(self.username_text.strip(), self.password_text.strip())
+
+    def rescale_ui(self, screen=None):
+        """Relayout for the current resolution; registered for resolution changes."""
+        if screen is not None:
+            self.screen = screen
+        self.renderer.invalidate()
 
-    def rescale_ui(self):
         # Rescale background
-        self.bg_img = pygame.image.load("client/data/assets/images/menu_bg.png").convert_alpha()
-        self.bg_img = pygame.transform.scale(self.bg_img, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        self.bg_img = assets.scaled("client/data/assets/images/menu_bg.png", (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
 
         # Recalculate scaling for window and mask
         scale_ratio = config.SCREEN_HEIGHT * 0.7 / self.base_h
         self.scaled_w = int(self.base_w * scale_ratio)
         self.scaled_h = int(self.base_h * scale_ratio)
-        self.window_img = pygame.transform.scale(self.base_img, (self.scaled_w, self.scaled_h))
-        self.mask_img = pygame.transform.scale(self.mask_img, (self.scaled_w, self.scaled_h))
+        self.window_img = assets.scaled(self.window_path, (self.scaled_w, self.scaled_h))
         self.window_rect = self.window_img.get_rect(center=(config.SCREEN_WIDTH // 2, config.SCREEN_HEIGHT // 2))
 
         # Recalculate field rects
-        self.fields_rects.clear()
-        for color, name in self.color_map.items():
-            rect = self._find_color_bounds(color)
-            if rect:
-                self.fields_rects[name] = rect.move(self.window_rect.topleft)
+        self.fields_rects = self._find_field_rects()
 
         # Update font
-        self.font = pygame.font.SysFont(config.FONT_NAME, 24)
+        self.font = assets.font(config.FONT_NAME, 24)
+        self.status_font = assets.font(config.FONT_NAME, 20)
 
     def login(self, username, password):
         """Send login request and wait for server response."""
@@ -189,7 +218,11 @@ class Login:
             return False
 
         if not self.client.connected:
-            self.client.connect()
+            try:
+                self.client.connect()  # bounded by the client's connect_timeout
+            except OSError as e:
+                print(f"[!] Cannot reach server: {e}")
+                return False
 
         resp = self.client.request(
             {"action": "login", "data": {"username": username, "password": password}},
@@ -204,11 +237,10 @@ class Login:
         if resp.get("action") == "character_list" and "user" in resp:
             self.logged_in = True
             self.username_text = username
-            self.characters = resp.get("characters", [])
 
             # Save username for next session
             self._save_username_to_file(username)
-            print(f"[+] Logged in as {username}, {len(self.characters)} characters loaded")
+            print(f"[+] Logged in as {username}, {len(resp.get('characters', []))} characters loaded")
             return True
         else:
             reason = resp.get("reason", "Unknown error")
@@ -216,104 +248,91 @@ class Login:
             self.logged_in = False
             return False
 
-    # ---------------- Main Loop ----------------
-    def run(self):
-        clock = pygame.time.Clock()
-        running = True
-
-        while running:
-            self.draw()
-
-            # Check mouse position for hover selection
-            mouse_pos = pygame.mouse.get_pos()
-            if mouse_pos != self.last_mouse_pos:
-                for i, (_, rect) in enumerate(self.option_rects):
-                    if rect.collidepoint(mouse_pos):
-                        self.selected_index = i
-                        break
-                self.last_mouse_pos = mouse_pos
-
-            # Handle server responses
-            if self.server_event.is_set():
-                action = self.server_action
-                payload = self.server_payload or {}
-                self.server_event.clear()
-                self.server_action = None
-                self.server_payload = None
-
-                if action == "login_failed":
-                    reason = payload.get("reason", "Unknown")
-                    print("Login failed:", reason)
-                elif action == "character_list":
-                    self.characters = payload.get("characters", [])
-                    self.logged_in = True
-
-                    # Save username to disk for future sessions
-                    self._save_username_to_file(self.username_text.strip())
-
-                    # If no characters, open creation screen
-                    if not self.characters:
-                        created = CharacterCreation(self.screen, self.client).run()
-                        if created:
-                            self.characters = [created]
-                        else:
-                            continue
-
-                    # Open character selection
-                    selected = CharacterSelection(self.screen, self.characters, self.client).run()
-                    if selected == "menu":
-                        return "menu"
-                    elif selected:
-                        return {"selected_character": selected}
-                    else:
-                        continue
-
-            # Handle input events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return None
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        return None
-                    elif event.key == pygame.K_TAB:
-                        if self.active_field in ["username", "password"]:
-                            self.focus_index = (self.focus_index + 1) % 2
-                            self.active_field = self.focus_order[self.focus_index]
-                    elif event.key == pygame.K_DOWN:
-                        self.focus_index = (self.focus_index + 1) % len(self.focus_order)
-                        self.active_field = self.focus_order[self.focus_index]
-                    elif event.key == pygame.K_UP:
-                        self.focus_index = (self.focus_index - 1) % len(self.focus_order)
-                        self.active_field = self.focus_order[self.focus_index]
-                    elif event.key == pygame.K_BACKSPACE:
-                        if self.active_field == "username":
-                            self.username_text = self.username_text[:-1]
-                        elif self.active_field == "password":
-                            self.password_text = self.password_text[:-1]
-                    elif event.key == pygame.K_RETURN:
-                        if self.active_field in ["username", "password", "login_btn"]:
-                            self.attempt_login()
-                        elif self.active_field == "signup_btn":
-                            print("Sign Up clicked")
-
-                    else:
-                        char = event.unicode
-                        if char.isprintable():
-                            if self.active_field == "username" and len(self.username_text) < 10:
-                                self.username_text += char
-                            elif self.active_field == "password" and len(self.password_text) < 22:
-                                self.password_text += char
-                                
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    mouse_pos = event.pos
-                    for name, rect in self.fields_rects.items():
-                        if rect.collidepoint(mouse_pos):
-                            self.active_field = name
-                            if name == "login_btn":
-                                self.attempt_login()
-                            elif name == "signup_btn":
-                                print("Sign Up clicked")
-
-            clock.tick(config.FPS)
-
-        return None
+    # ---------------- Scene ----------------
+    def enter(self, **params):
+        super().enter(**params)
+        # Already logged in with characters: go straight to character selection
+        if self.logged_in and self.state.characters:
+            self.manager.replace("character_selection")
+
+    def resume(self, result):
+        super().resume(result)
+        pending, self._pending = self._pending, None
+        if pending == "create" and result:
+            # Back from creating the first character (already in the state)
+            self._select_character()
+        elif pending == "select" and result == "menu":
+            self.manager.pop("menu")
+
+    def _select_character(self):
+        self._pending = "select"
+        self.manager.push("character_selection")
+
+    def wake_in(self):
+        return blink_wake_in(self.last_blink)
+
+    # ---------------- Input ----------------
+    keys = {
+        pygame.K_ESCAPE: "cancel",
+        pygame.K_TAB: "next_text_field",
+        pygame.K_DOWN: "focus_next",
+        pygame.K_UP: "focus_previous",
+        pygame.K_BACKSPACE: "backspace",
+        pygame.K_RETURN: "activate_focused",
+    }
+    actions = {
+        "username": "attempt_login",
+        "password": "attempt_login",
+        "login_btn": "attempt_login",
+        "signup_btn": "sign_up",
+    }
+
+    def cancel(self):
+        self.manager.pop(None)
+
+    def next_text_field(self):
+        if self.active_field in ["username", "password"]:
+            self.focus_index = (self.focus_index + 1) % 2
+            self.active_field = self.focus_order[self.focus_index]
+
+    def focus_next(self):
+        self.focus_index = (self.focus_index + 1) % len(self.focus_order)
+        self.active_field = self.focus_order[self.focus_index]
+
+    def focus_previous(self):
+        self.focus_index = (self.focus_index - 1) % len(self.focus_order)
+        self.active_field = self.focus_order[self.focus_index]
+
+    def backspace(self):
+        if self.active_field == "username":
+            self.username_text = self.username_text[:-1]
+        elif self.active_field == "password":
+            self.password_text = self.password_text[:-1]
+
+    def activate_focused(self):
+        self.activate(self.active_field)
+
+    def sign_up(self):
+        print("Sign Up clicked")
+
+    def key(self, event):
+        # Typing goes to the focused text field
+        char = event.unicode
+        if char.isprintable():
+            if self.active_field == "username" and len(self.username_text) < 10:
+                self.username_text += char
+            elif self.active_field == "password" and len(self.password_text) < 22:
+                self.password_text += char
+
+    def hit_test(self, pos):
+        return self.field_hits.at(pos)
+
+    def click(self, name, event):
+        if event.button == 1 and name is not None:
+            self.active_field = name
+            if name in ("login_btn", "signup_btn"):
+                self.activate(name)
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.cancel()
@@ -0,0 +1,57 @@
+# client/ui/masks.py
+"""Region extraction from the colour-keyed ``*_mask.png`` overlays.
+
+Each screen paints its clickable regions in flat colours on a mask image.
+Everything here works on whole surfaces in pygame's C code
+(``pygame.mask.from_threshold``) instead of calling ``get_at`` per pixel.
+"""
+import pygame
+
+# from_threshold tolerance: RGB must match exactly, alpha is ignored
+EXACT_RGB = (1, 1, 1, 255)
+
+
+def color_mask(surface, color):
+    """``pygame.Mask`` of every pixel in ``surface`` whose RGB equals ``color``."""
+    return pygame.mask.from_threshold(surface, color, EXACT_RGB)
+
+
+def mask_bounds(mask):
+    """Bounding rect of all set bits in ``mask``, or None if it is empty."""
+    rects = mask.get_bounding_rects()
+    if not rects:
+        return None
+    return rects[0].unionall(rects[1:])
+
+
+def find_color_bounds(surface, colors):
+    """Map each colour in ``colors`` to the bounding rect of its pixels (None if absent)."""
+    return {color: mask_bounds(color_mask(surface, color)) for color in colors}
+
+
+def _scan_order_key(mask):
+    """Sort key matching a column-major pixel scan: top edge, then the first pixel found."""
+    rect = mask_bounds(mask)
+    first_y = next(y for y in range(rect.top, rect.bottom) if mask.get_at((rect.x, y)))
+    return rect.y, rect.x, first_y
+
+
+def label_regions(surface, color_map, split=()):
+    """Build the hit/highlight masks for a colour-keyed overlay.
+
+    ``color_map`` maps an RGB colour to a region name. Each name gets one
+    full-size ``pygame.Mask`` of its colour, except names listed in
+    ``split``: those are broken into connected components (one per
+    repeated widget, e.g. character slots) and returned as a list ordered
+    top-to-bottom, ties broken left-to-right.
+    """
+    regions = {}
+    for color, name in color_map.items():
+        mask = color_mask(surface, color)
+        if name in split:
+            components = [c for c in mask.connected_components() if c.count()]
+            components.sort(key=_scan_order_key)
+            regions[name] = components
+        else:
+            regions[name] = mask
+    return regions
@@ -1,36 +1,39 @@
 import pygame
 from client import config
-from client.ui.login import Login
-from client.ui.setting_menu import SettingsMenu
+from client.assets import assets
+from client.ui.display import on_resolution_change
+from client.ui.hittest import HitGrid
+from client.ui.render import RetainedRenderer
+from client.ui.scenes import Scene
 
-class Menu:
+class Menu(Scene):
     def __init__(self, screen):
         self.screen = screen
         self.options = ["Start", "Settings", "Exit"]
         self.selected = 0
 
         # Load background
-        self.bg_img_orig = pygame.image.load("client/data/assets/images/menu_bg.png").convert_alpha()
-        self.bg_img = pygame.transform.scale(self.bg_img_orig, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-        self.last_size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
+        self.bg_img = assets.scaled("client/data/assets/images/menu_bg.png", (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
 
         # Font size proportional to screen height
-        self.font = pygame.font.SysFont(config.FONT_NAME, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+        self.font = assets.font(config.FONT_NAME, max(20, int(config.SCREEN_HEIGHT * 0.04)))
 
         # Store rectangles for mouse click and hover detection
-        self.last_mouse_pos = pygame.mouse.get_pos() # Track last mouse pos
         self.option_rects = []
+        self.hits = HitGrid()  # option index by position
+        self.renderer = RetainedRenderer()
+        on_resolution_change(self.on_resolution_change)
 
-    def draw(self):
-        # Draw background scaled to current screen size
-        current_size = (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
-        if current_size != self.last_size:
-            self.bg_img = pygame.transform.scale(self.bg_img_orig, current_size)
-            self.font = pygame.font.SysFont(config.FONT_NAME, max(20, int(config.SCREEN_HEIGHT * 0.04)))
-            self.last_size = current_size
+    def on_resolution_change(self, screen):
+        """Rescale the background and font for the new display."""
+        self.screen = screen
+        self.bg_img = assets.scaled("client/data/assets/images/menu_bg.png", (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        self.font = assets.font(config.FONT_NAME, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+        self.renderer.invalidate()
 
-            # Draw background scaled to current screen size
-        self.screen.blit(self.bg_img, (0, 0))
+    def draw(self):
+        # Only options whose colour changed are re-rendered and pushed
+        self.renderer.begin(self.screen, self.bg_img)
 
         # Draw options and store their rectangles
         self.option_rects.clear()  # Clear previous rectangles
@@ -40,59 +43,50 @@ class Menu:
 
         for i, option in enumerate(self.options):
             color = (50, 150, 255) if i == self.selected else (255, 255, 255)
-            text_surface = self.font.render(option, True, color)
-            rect = text_surface.get_rect(center=(center_x, center_y + i * spacing))
-            self.screen.blit(text_surface, rect)
+            rect = self.renderer.text(("option", i), self.font, option, color, center=(center_x, center_y + i * spacing))
             self.option_rects.append((option, rect))  # Store option and its rectangle
+        self.hits.set_rects((i, rect) for i, (_, rect) in enumerate(self.option_rects))
+
+        self.renderer.present()
+
+    # ---------------- Input ----------------
+    keys = {
+        pygame.K_UP: "select_previous",
+        pygame.K_DOWN: "select_next",
+        pygame.K_RETURN: "activate_selected",
+    }
+    actions = {"Start": "start", "Settings": "open_settings", "Exit": "exit_game"}
+
+    def select_previous(self):
+        self.selected = (self.selected - 1) % len(self.options)
+
+    def select_next(self):
+        self.selected = (self.selected + 1) % len(self.options)
+
+    def activate_selected(self):
+        self.activate(self.options[self.selected])
+
+    def start(self):
+        self.manager.push("login")
+
+    def open_settings(self):
+        self.manager.push("settings")
+
+    def exit_game(self):
+        self.manager.quit("exit")
+
+    def hit_test(self, pos):
+        return self.hits.at(pos)
+
+    def hover(self, index):
+        if index is not None:
+            self.selected = index
+
+    def click(self, index, event):
+        if event.button == 1 and index is not None:  # Left mouse button
+            self.selected = index  # Update selected option
+            self.activate_selected()
 
-        pygame.display.flip()
-
-    def run(self):
-        clock = pygame.time.Clock()
-        running = True
-
-        while running:
-            self.draw()
-
-            # Check mouse position for hover selection
-            mouse_pos = pygame.mouse.get_pos()
-            if mouse_pos != self.last_mouse_pos:
-                for i, (_, rect) in enumerate(self.option_rects):
-                    if rect.collidepoint(mouse_pos):
-                        self.selected = i
-                        break
-                self.last_mouse_pos = mouse_pos
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    raise SystemExit
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        self.selected = (self.selected - 1) % len(self.options)
-                    elif event.key == pygame.K_DOWN:
-                        self.selected = (self.selected + 1) % len(self.options)
-                    elif event.key == pygame.K_RETURN:
-                        option = self.options[self.selected]
-                        if option == "Start":
-                            return "start"
-                        elif option == "Settings":
-                            return "settings"
-                        elif option == "Exit":
-                            return "exit"
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left mouse button
-                        mouse_pos = event.pos
-                        for i, (option, rect) in enumerate(self.option_rects):
-                            if rect.collidepoint(mouse_pos):
-                                self.selected = i  # Update selected option
-                                if option == "Start":
-                                    return "start"
-                                elif option == "Settings":
-                                    return "settings"
-                                elif option == "Exit":
-                                    return "exit"
-
-            clock.tick(config.FPS)
-
-        return None
\ No newline at end of file
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.exit_game()
@@ -0,0 +1,196 @@
+# client/ui/render.py
+"""Retained-mode drawing with dirty rectangles.
+
+Screens describe each frame as a list of keyed items (images, text,
+translucent fills, mask highlights) on top of a background. An item is
+only rebuilt when its state changes, and only the rectangles that
+changed since the last frame are repainted and pushed to the display
+with ``pygame.display.update``. A frame where nothing changed costs a few
+dict lookups and no blits at all.
+
+A new screen surface, a size change or a new background forces a full
+redraw; call ``invalidate`` after anything else has drawn over the
+screen (a nested screen, a modal prompt).
+
+Highlight overlays (translucent fills and mask regions) are baked once at
+their bounding-rect size and kept in ``overlays``, so moving a highlight
+back and forth between regions never re-allocates them.
+"""
+from collections import OrderedDict
+
+import pygame
+
+from client import config
+from client.ui.masks import mask_bounds
+from client.ui.text import text_cache
+
+
+class _Item:
+    __slots__ = ("state", "surface", "rect")
+
+    def __init__(self, state, surface, rect):
+        self.state = state
+        self.surface = surface
+        self.rect = rect
+
+
+class RetainedRenderer:
+    def __init__(self):
+        self.screen = None
+        self.background = None
+        self._size = None
+        self._items = {}  # key -> _Item, from the last presented frame
+        self._order = []
+        self._frame = []
+        self._dirty = []
+        self._full = True
+
+    # ---------------- Frame ----------------
+    def begin(self, screen, background):
+        """Start a frame on ``screen``; any change of screen, size or background redraws everything."""
+        if screen is not self.screen or screen.get_size() != self._size or background is not self.background:
+            self.screen = screen
+            self.background = background
+            self._size = screen.get_size()
+            self._full = True
+        self._frame = []
+
+    def invalidate(self):
+        """Repaint the whole screen on the next ``present``."""
+        self._full = True
+
+    def present(self):
+        """Repaint what changed and push it to the display; returns the updated rects."""
+        seen = set(self._frame)
+        for key in self._order:
+            if key not in seen:
+                self._dirty.append(self._items.pop(key).rect)
+        self._order = self._frame
+
+        if self._full:
+            self._full = False
+            self._dirty = []
+            self._paint(self.screen.get_rect())
+            pygame.display.flip()
+            return [self.screen.get_rect()]
+
+        dirty, self._dirty = _merge(self._dirty), []
+        if not dirty:
+            return []
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self._paint(rect)
+        self.screen.set_clip(None)
+        pygame.display.update(dirty)
+        return dirty
+
+    def _paint(self, area):
+        if self.background is not None:
+            self.screen.blit(self.background, area, area)
+        else:
+            self.screen.fill((0, 0, 0), area)
+        for key in self._order:
+            item = self._items[key]
+            if item.rect.colliderect(area):
+                self.screen.blit(item.surface, item.rect)
+
+    # ---------------- Items ----------------
+    def item(self, key, state, build):
+        """Declare item ``key`` for this frame; ``build()`` returns (surface, rect) and
+        only runs when ``state`` differs from the previous frame. Returns the rect.
+        """
+        self._frame.append(key)
+        item = self._items.get(key)
+        if item is None or item.state != state:
+            surface, rect = build()
+            rect = pygame.Rect(rect)
+            if item is not None:
+                self._dirty.append(item.rect)
+            self._dirty.append(rect)
+            item = self._items[key] = _Item(state, surface, rect)
+        return item.rect
+
+    def image(self, key, surface, pos):
+        return self.item(key, (surface, tuple(pos)), lambda: (surface, surface.get_rect(topleft=pos)))
+
+    def text(self, key, font, text, color, **anchor):
+        """Render ``text`` positioned like ``surface.get_rect(**anchor)``."""
+        def build():
+            surface = text_cache.render(font, text, True, color)
+            return surface, surface.get_rect(**anchor)
+        return self.item(key, (font, text, color, tuple(anchor.items())), build)
+
+    def input_text(self, key, font, text, color, **anchor):
+        """Like ``text`` for an input field: re-rendered incrementally per keystroke."""
+        def build():
+            surface = text_cache.render_input(key, font, text, color)
+            return surface, surface.get_rect(**anchor)
+        return self.item(key, (font, text, color, tuple(anchor.items())), build)
+
+    def fill(self, key, rect, color, border_radius=0):
+        """A (possibly translucent, rounded) filled rectangle."""
+        rect = pygame.Rect(rect)
+        return self.item(
+            key, (tuple(rect), color, border_radius),
+            lambda: (overlays.fill(rect.size, color, border_radius), rect),
+        )
+
+    def mask(self, key, mask, color):
+        """``mask`` painted in ``color``, cropped to its set bits."""
+        return self.item(key, (mask, color), lambda: overlays.mask(mask, color))
+
+
+class OverlayCache:
+    """Baked overlay surfaces, least-recently-used first out."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def _get(self, key, bake):
+        value = self._surfaces.get(key)
+        if value is None:
+            value = self._surfaces[key] = bake()
+            if len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return value
+
+    def fill(self, size, color, border_radius=0):
+        """Surface of ``size`` filled with ``color``, rounded by ``border_radius``."""
+        def bake():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, color, surface.get_rect(), border_radius=border_radius)
+            return surface
+        return self._get(("fill", tuple(size), tuple(color), border_radius), bake)
+
+    def mask(self, mask, color):
+        """(surface, rect): ``mask`` in ``color``, cropped to the bounding rect of its set bits."""
+        def bake():
+            bounds = mask_bounds(mask) or pygame.Rect(0, 0, 0, 0)
+            surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+            mask.to_surface(surface, setcolor=color, unsetcolor=(0, 0, 0, 0), dest=(-bounds.x, -bounds.y))
+            return surface, bounds
+        return self._get(("mask", mask, tuple(color)), bake)
+
+
+overlays = OverlayCache(config.OVERLAY_CACHE_ENTRIES)
+
+
+def _merge(rects):
+    """Union overlapping rects so no area is repainted twice."""
+    merged = []
+    for rect in rects:
+        if not rect.w or not rect.h:
+            continue
+        rect = rect.copy()
+        i = 0
+        while i < len(merged):
+            if rect.colliderect(merged[i]):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
@@ -0,0 +1,204 @@
+# client/ui/scenes.py
+"""One main loop for every screen.
+
+Screens are ``Scene`` objects on the SceneManager's stack; only the top
+one gets events and draws. Scenes are built from the factories passed to
+``register`` the first time they are shown and kept afterwards, so
+going back and forth between screens never rebuilds their assets,
+masks or overlays. Scenes navigate with ``push``/``pop``/``replace``
+instead of running nested loops; a pushed scene hands its result back
+to the one below through ``resume``.
+
+Lifecycle, in the order the hooks run:
+
+- ``enter(**params)``: pushed (or replaced in) with the caller's params
+- ``suspend()`` / ``resume(result)``: another scene went on top / came off
+- ``exit()``: popped, replaced or the manager quit
+- resize: screens register their own listener with ``client.ui.display``,
+  so scenes below the top and cached scenes off the stack rescale too
+
+Input reaches the top scene through ``client.ui.input.InputDispatcher``:
+``keys`` and ``actions`` tables plus ``hit_test``/``hover``/``click``/``key``
+instead of one ``if/elif`` chain per screen.
+
+Server messages reach their subscribers through the client's
+``network.dispatcher.MessageDispatcher``, drained at the start of every
+frame (``NETWORK_MESSAGES_PER_FRAME`` at most; the rest wait for the
+next frame, which then starts without waiting on input).
+
+Each transition is logged with the time until the new scene's first
+frame is drawn.
+"""
+import time
+
+from client import config
+from client.ui.display import on_resolution_change
+from client.ui.input import InputDispatcher
+from client.ui.scheduler import FrameScheduler
+from core.utils import get_logger
+
+log = get_logger("ui")
+
+
+class Scene:
+    """Base class for screens run by a SceneManager; every hook is optional."""
+    manager = None
+    renderer = None  # a RetainedRenderer is repainted in full on enter/resume
+    keys = {}  # pygame key -> name of the method handling that KEYDOWN
+    actions = {}  # region or focus name -> name of the method activating it
+
+    def enter(self, **params):
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
+    def exit(self):
+        pass
+
+    def suspend(self):
+        pass
+
+    def resume(self, result):
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
+    def update(self):
+        """Once per frame before ``draw``; may navigate."""
+
+    def draw(self):
+        pass
+
+    # ---------------- Input ----------------
+    def hit_test(self, pos):
+        """The region under ``pos`` (None: nothing)."""
+        return None
+
+    def hover(self, region):
+        """The pointer moved onto ``region``; only called when it changes."""
+
+    def click(self, region, event):
+        if region in self.actions:
+            self.activate(region)
+
+    def activate(self, name):
+        getattr(self, self.actions[name])()
+
+    def key(self, event):
+        """A KEYDOWN missing from ``keys``."""
+
+    def handle_event(self, event):
+        """Any event that is not mouse motion, a key or a click."""
+
+    def wake_in(self):
+        """Seconds until the scene needs a frame without any input (None: never)."""
+        return None
+
+
+class SceneManager:
+    def __init__(self, screen, scheduler=None, dispatcher=None):
+        self.screen = screen
+        self.frame = scheduler or FrameScheduler()
+        self.dispatcher = dispatcher  # network.dispatcher.MessageDispatcher, or None
+        self.input = InputDispatcher()
+        self.stack = []
+        self.result = None
+        self._factories = {}  # name -> factory(screen) returning a Scene
+        self._scenes = {}  # name -> Scene, built on first use
+        self._transition = None  # (source label, started) until the next frame is drawn
+        on_resolution_change(self.on_resolution_change)
+
+    def on_resolution_change(self, screen):
+        self.screen = screen  # for scenes built from now on
+
+    # ---------------- Scenes ----------------
+    def register(self, name, factory):
+        """``factory(screen)`` builds scene ``name`` the first time it is shown."""
+        self._factories[name] = factory
+
+    def scene(self, name):
+        """The cached scene called ``name``, built now if this is its first use."""
+        scene = self._scenes.get(name)
+        if scene is None:
+            started = time.perf_counter()
+            scene = self._scenes[name] = self._factories[name](self.screen)
+            scene.scene_name = name
+            log.info("Built scene %s in %.1f ms", name, (time.perf_counter() - started) * 1000)
+        return scene
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    # ---------------- Transitions ----------------
+    def push(self, scene, **params):
+        """Show ``scene`` (a registered name or a Scene) on top of the current one."""
+        self._begin()
+        scene = self._resolve(scene)
+        if self.stack:
+            self.stack[-1].suspend()
+        self.stack.append(scene)
+        scene.manager = self
+        scene.enter(**params)
+
+    def pop(self, result=None):
+        """Close the top scene and hand ``result`` to the one below (or return it from ``run``)."""
+        self._begin()
+        scene = self.stack.pop()
+        scene.exit()
+        if self.stack:
+            self.stack[-1].resume(result)
+        else:
+            self.result = result
+
+    def replace(self, scene, **params):
+        """Close the top scene and show ``scene`` in its place."""
+        self._begin()
+        old = self.stack.pop()
+        old.exit()
+        scene = self._resolve(scene)
+        self.stack.append(scene)
+        scene.manager = self
+        scene.enter(**params)
+
+    def quit(self, result=None):
+        """Close every scene; ``run`` returns ``result``."""
+        while self.stack:
+            self.stack.pop().exit()
+        self.result = result
+        self._transition = None
+
+    def _resolve(self, scene):
+        return self.scene(scene) if isinstance(scene, str) else scene
+
+    def _begin(self):
+        if self._transition is None:  # a scene may navigate again from enter/resume
+            self._transition = (_label(self.top), time.perf_counter())
+
+    # ---------------- Main Loop ----------------
+    def run(self, scene=None, **params):
+        """Push ``scene`` (if given) and run until the stack is empty; returns the last result."""
+        if scene is not None:
+            self.push(scene, **params)
+        while self.stack:
+            if self.dispatcher is not None:
+                self.dispatcher.drain(config.NETWORK_MESSAGES_PER_FRAME)
+                if not self.stack:
+                    break  # a handler quit
+            scene = self.stack[-1]
+            scene.update()
+            if scene is not self.top:
+                continue  # navigated; draw the new scene before waiting on input
+            scene.draw()
+            if self._transition is not None:
+                source, started = self._transition
+                self._transition = None
+                log.info("Scene %s -> %s in %.1f ms", source, _label(scene), (time.perf_counter() - started) * 1000)
+
+            wake_in = 0 if self.dispatcher is not None and len(self.dispatcher) else scene.wake_in()
+            self.input.dispatch(self, self.frame.events(wake_in=wake_in))
+        return self.result
+
+
+def _label(scene):
+    if scene is None:
+        return "(none)"
+    return getattr(scene, "scene_name", None) or type(scene).__name__
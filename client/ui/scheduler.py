@@ -0,0 +1,79 @@
+# client/ui/scheduler.py
+"""Frame pacing for the SceneManager's main loop (and the startup splash).
+
+Instead of redrawing at ``config.FPS`` forever, a loop asks the
+FrameScheduler for its next batch of events. While an animation is
+running that returns every frame, like ``clock.tick``. Otherwise it
+blocks in ``pygame.event.wait`` until there is input, a network message
+(the receive thread posts NETWORK_EVENT through ``post_network_event``)
+or a wake-up the screen asked for, such as the next cursor blink.
+"""
+import math
+import threading
+import time
+
+import pygame
+
+from client import config
+
+# Posted by the network thread when messages arrive; carries no payload
+NETWORK_EVENT = pygame.event.custom_type()
+
+# Upper bound on an idle wait, so a lost wake-up only delays a frame
+MAX_IDLE_WAIT = 1.0
+
+_network_posted = threading.Event()
+
+
+def post_network_event():
+    """Wake the UI thread; safe to call from any thread, coalesced until consumed."""
+    if _network_posted.is_set():
+        return
+    _network_posted.set()
+    try:
+        pygame.event.post(pygame.event.Event(NETWORK_EVENT))
+    except pygame.error:
+        _network_posted.clear()  # display not initialised (yet)
+
+
+class FrameScheduler:
+    def __init__(self, fps=None):
+        self.fps = fps or config.FPS
+        self.clock = pygame.time.Clock()
+        self._animate_until = 0.0
+        self.frames = 0
+        self.idle_waits = 0
+
+    def animate(self, seconds):
+        """Run at full FPS for at least ``seconds`` (call again to extend)."""
+        self._animate_until = max(self._animate_until, time.monotonic() + seconds)
+
+    @property
+    def animating(self):
+        return time.monotonic() < self._animate_until
+
+    def events(self, wake_in=None):
+        """Events for the next frame.
+
+        Paces frames to ``fps``; when nothing is animating, blocks until an
+        event arrives or ``wake_in`` seconds pass (None: no timer).
+        """
+        self.frames += 1
+        self.clock.tick(self.fps)
+        events = pygame.event.get()
+        if not events and not self.animating:
+            timeout = MAX_IDLE_WAIT if wake_in is None else min(wake_in, MAX_IDLE_WAIT)
+            timeout_ms = math.ceil(timeout * 1000)
+            if timeout_ms > 0:  # event.wait(0) would block forever
+                self.idle_waits += 1
+                event = pygame.event.wait(timeout_ms)
+                if event.type != pygame.NOEVENT:
+                    events = [event] + pygame.event.get()
+        if any(event.type == NETWORK_EVENT for event in events):
+            _network_posted.clear()
+        return events
+
+
+def blink_wake_in(last_blink, interval=0.5):
+    """Seconds until a cursor that last toggled at ``last_blink`` (time.time()) toggles again."""
+    return max(0.0, last_blink + interval - time.time())
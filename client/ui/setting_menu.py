@@ -1,18 +1,23 @@
 import os
 import pygame
 from client import config
+from client.assets import assets
+from client.ui.display import change_resolution, on_resolution_change
+from client.ui.hittest import HitGrid
+from client.ui.render import RetainedRenderer
+from client.ui.scenes import Scene
 
-class SettingsMenu:
+class SettingsMenu(Scene):
     def __init__(self, screen):
         self.screen = screen
 
-        # Load background (keep original for scaling)
-        self.bg_img_orig = pygame.image.load("client/data/assets/images/settings_bg.png").convert()
-        self.bg_img = pygame.transform.scale(self.bg_img_orig, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+        # Background scaled per resolution by the shared asset cache
+        self.bg_path = "client/data/assets/images/settings_bg.png"
+        self.bg_img = assets.scaled(self.bg_path, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT), alpha=False)
 
         # Font proportional to screen height
-        font_path = "client/data/assets/fonts/cinzel.decorative-black.ttf"
-        self.font = pygame.font.Font(font_path, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+        self.font_path = "client/data/assets/fonts/cinzel.decorative-black.ttf"
+        self.font = assets.font(self.font_path, max(20, int(config.SCREEN_HEIGHT * 0.04)))
 
         # Main options
         self.options = ["Screen Mode", "Resolution", "Music", "Sound", "Return to Title", "Apply Changes"]
@@ -31,17 +36,24 @@ class SettingsMenu:
         )
 
         # Store rectangles for mouse interaction
-        self.last_mouse_pos = pygame.mouse.get_pos() # Track last mouse pos
         self.option_rects = []
+        self.hits = HitGrid()  # option index by position
+        self.renderer = RetainedRenderer()
+        on_resolution_change(self.on_resolution_change)
 
     def center_window(self, width, height):
         os.environ['SDL_VIDEO_CENTERED'] = '1'
         pygame.display.set_mode((width, height))
 
+    def on_resolution_change(self, screen):
+        """Rescale the background and font for the new display and repaint everything."""
+        self.screen = screen
+        self.bg_img = assets.scaled(self.bg_path, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT), alpha=False)
+        self.font = assets.font(self.font_path, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+        self.renderer.invalidate()
+
     def draw(self):
-        # Scale background dynamically
-        self.bg_img = pygame.transform.scale(self.bg_img_orig, (config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
-        self.screen.blit(self.bg_img, (0, 0))
+        self.renderer.begin(self.screen, self.bg_img)
 
         # Compute vertical spacing dynamically
         center_x = config.SCREEN_WIDTH // 2
@@ -52,25 +64,22 @@ class SettingsMenu:
         # --- Boxed semi-transparent panel ---
         panel_width = int(config.SCREEN_WIDTH * 0.6)
         panel_height = menu_height + 120                # Add padding top/bottom
-        overlay = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        pygame.draw.rect(
-        overlay,
-        (0, 0, 0, 100),           # semi-transparent black
-        overlay.get_rect(),
-        border_radius=20           # <-- roundness (pixels)
-    )
 
         # Center the panel behind the menu block
         menu_center_y = start_y + (menu_height - spacing) // 2
-        overlay_rect = overlay.get_rect(center=(center_x, menu_center_y))
-        self.screen.blit(overlay, overlay_rect)
+        overlay_rect = pygame.Rect(0, 0, panel_width, panel_height)
+        overlay_rect.center = (center_x, menu_center_y)
+        self.renderer.fill(
+            "panel", overlay_rect,
+            (0, 0, 0, 100),            # semi-transparent black
+            border_radius=20           # <-- roundness (pixels)
+        )
 
         self.option_rects = []
 
         for i, option in enumerate(self.options):
             # Highlight selected option
             color = (50, 150, 255) if i == self.selected_index else (255, 255, 255)
-            text_surface = self.font.render(option, True, color)
 
             # Compute y position
             extra_spacing = 0
@@ -82,25 +91,21 @@ class SettingsMenu:
             margin_x = int(config.SCREEN_WIDTH * 0.25)
 
             panel_right_x = int(config.SCREEN_WIDTH * 0.78)
-            rect = text_surface.get_rect(midleft=(margin_x, y_pos))
-            self.screen.blit(text_surface, rect)
+            rect = self.renderer.text(("option", i), self.font, option, color, midleft=(margin_x, y_pos))
             self.option_rects.append((option, rect))
 
             # Draw current resolution next to "Resolution"
             if option == "Resolution":
                 res_text = f"{self.resolutions[self.current_resolution_index][0]}x{self.resolutions[self.current_resolution_index][1]}"
-                res_surface = self.font.render(res_text, True, (200, 200, 0))
-                res_rect = res_surface.get_rect(midright=(panel_right_x, rect.centery))
-                self.screen.blit(res_surface, res_rect)
+                self.renderer.text("resolution", self.font, res_text, (200, 200, 0), midright=(panel_right_x, rect.centery))
 
             # Draw current screen mode next to "screen mode"
             if option == "Screen Mode":
                 res_text = f"{self.screen_mode[self.current_screen_mode_index]}"
-                res_surface = self.font.render(res_text, True, (200, 200, 0))
-                res_rect = res_surface.get_rect(midright=(panel_right_x, rect.centery))
-                self.screen.blit(res_surface, res_rect)
+                self.renderer.text("screen_mode", self.font, res_text, (200, 200, 0), midright=(panel_right_x, rect.centery))
 
-        pygame.display.flip()
+        self.hits.set_rects((i, rect) for i, (_, rect) in enumerate(self.option_rects))
+        self.renderer.present()
 
     def save_config(self):
         """Save current resolution to config.py."""
@@ -129,98 +134,89 @@ class SettingsMenu:
 
     def apply_changes(self):
         mode_text = self.screen_mode[self.current_screen_mode_index]
-        flags = pygame.FULLSCREEN if mode_text == "Full Screen" else 0
-
         new_width, new_height = self.resolutions[self.current_resolution_index]
-        config.SCREEN_WIDTH = new_width
-        config.SCREEN_HEIGHT = new_height
-        config.SCREEN_MODE = mode_text
-
-        # Center the window on the desktop
-        os.environ['SDL_VIDEO_CENTERED'] = '1'
-
-         # Apply changes
-        self.screen = pygame.display.set_mode((new_width, new_height), flags)
-
-        # Rescale background
-        self.bg_img = pygame.transform.scale(self.bg_img_orig, (new_width, new_height))
-
-        # Update font size
-        font_path = "client/data/assets/fonts/cinzel.decorative-black.ttf"
-        self.font = pygame.font.Font(font_path, max(20, int(config.SCREEN_HEIGHT * 0.04)))
 
+        # Every screen (this one included) rescales in its on_resolution_change
+        change_resolution((new_width, new_height), mode_text)
         print(f"Applied new resolution: {new_width} x {new_height}")
-        if hasattr(self, "window_rect"):
-            self.window_rect.center = (new_width // 2, new_height // 2)
 
         # Save to config file
         self.save_config()
 
-    def run(self):
-        clock = pygame.time.Clock()
-        running = True
-
-        while running:
-            self.draw()
-
-            # Check mouse position for hover selection
-            mouse_pos = pygame.mouse.get_pos()
-            if mouse_pos != self.last_mouse_pos:
-                for i, (_, rect) in enumerate(self.option_rects):
-                    if rect.collidepoint(mouse_pos):
-                        self.selected_index = i
-                        break
-                self.last_mouse_pos = mouse_pos
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        running = False
-                    elif event.key == pygame.K_UP:
-                        self.selected_index = (self.selected_index - 1) % len(self.options)
-                    elif event.key == pygame.K_DOWN:
-                        self.selected_index = (self.selected_index + 1) % len(self.options)
-                    elif event.key == pygame.K_LEFT:
-                        if self.options[self.selected_index] == "Resolution":
-                            self.current_resolution_index = (self.current_resolution_index - 1) % len(self.resolutions)
-                        if self.options[self.selected_index] == "Screen Mode":
-                            self.current_screen_mode_index = (self.current_screen_mode_index - 1) % len(self.screen_mode)
-                    elif event.key == pygame.K_RIGHT:
-                        if self.options[self.selected_index] == "Resolution":
-                            self.current_resolution_index = (self.current_resolution_index + 1) % len(self.resolutions)
-                        if self.options[self.selected_index] == "Screen Mode":
-                            self.current_screen_mode_index = (self.current_screen_mode_index + 1) % len(self.screen_mode)
-                    elif event.key == pygame.K_RETURN:
-                        selected_option = self.options[self.selected_index]
-                        if selected_option == "Apply Changes":
-                            self.apply_changes()
-                        elif selected_option == "Return to Title":
-                            running = False
-                        elif selected_option == "Quit":
-                            pygame.quit()
-                            raise SystemExit
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = event.pos
-                    for i, (option, rect) in enumerate(self.option_rects):
-                        if rect.collidepoint(mouse_pos):
-                            self.selected_index = i
-                            if option == "Resolution":
-                                if event.button == 1:  # Left click
-                                    self.current_resolution_index = (self.current_resolution_index + 1) % len(self.resolutions)
-                                elif event.button == 3:  # Right click
-                                    self.current_resolution_index = (self.current_resolution_index - 1) % len(self.resolutions)
-                            if option == "Screen Mode":
-                                if event.button == 1:  # Left click
-                                    self.current_screen_mode_index = (self.current_screen_mode_index + 1) % len(self.screen_mode)
-                            elif option == "Apply Changes":
-                                self.apply_changes()
-                            elif option == "Return to Title":
-                                running = False
-                            elif option == "Quit":
-                                return "exit"
-
-            clock.tick(config.FPS)
-
-        return "return"
\ No newline at end of file
+    # ---------------- Scene ----------------
+    def enter(self, **params):
+        # Show the applied settings again; unapplied choices are dropped on leaving
+        super().enter(**params)
+        self.current_resolution_index = next(
+            (i for i, r in enumerate(self.resolutions) if r == (config.SCREEN_WIDTH, config.SCREEN_HEIGHT)), 0
+        )
+        self.current_screen_mode_index = next(
+            (i for i, r in enumerate(self.screen_mode) if r == config.SCREEN_MODE), 0
+        )
+
+    # ---------------- Input ----------------
+    keys = {
+        pygame.K_ESCAPE: "close",
+        pygame.K_UP: "select_previous",
+        pygame.K_DOWN: "select_next",
+        pygame.K_LEFT: "previous_value",
+        pygame.K_RIGHT: "next_value",
+        pygame.K_RETURN: "activate_selected",
+    }
+    actions = {"Apply Changes": "apply_changes", "Return to Title": "close", "Quit": "quit_game"}
+
+    def close(self):
+        self.manager.pop("return")
+
+    def quit_game(self):
+        self.manager.quit("exit")
+
+    def select_previous(self):
+        self.selected_index = (self.selected_index - 1) % len(self.options)
+
+    def select_next(self):
+        self.selected_index = (self.selected_index + 1) % len(self.options)
+
+    def previous_value(self):
+        if self.options[self.selected_index] == "Resolution":
+            self.current_resolution_index = (self.current_resolution_index - 1) % len(self.resolutions)
+        if self.options[self.selected_index] == "Screen Mode":
+            self.current_screen_mode_index = (self.current_screen_mode_index - 1) % len(self.screen_mode)
+
+    def next_value(self):
+        if self.options[self.selected_index] == "Resolution":
+            self.current_resolution_index = (self.current_resolution_index + 1) % len(self.resolutions)
+        if self.options[self.selected_index] == "Screen Mode":
+            self.current_screen_mode_index = (self.current_screen_mode_index + 1) % len(self.screen_mode)
+
+    def activate_selected(self):
+        option = self.options[self.selected_index]
+        if option in self.actions:
+            self.activate(option)
+
+    def hit_test(self, pos):
+        return self.hits.at(pos)
+
+    def hover(self, index):
+        if index is not None:
+            self.selected_index = index
+
+    def click(self, index, event):
+        if index is None:
+            return
+        option = self.options[index]
+        self.selected_index = index
+        if option == "Resolution":
+            if event.button == 1:  # Left click
+                self.next_value()
+            elif event.button == 3:  # Right click
+                self.previous_value()
+        elif option == "Screen Mode":
+            if event.button == 1:  # Left click
+                self.next_value()
+        elif option in self.actions:
+            self.activate(option)
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.close()
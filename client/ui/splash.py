@@ -0,0 +1,55 @@
+import time
+import pygame
+from client import config
+from client.assets import assets
+from client.ui.text import text_cache
+
+class Splash:
+    """Progress bar shown while a Preloader streams assets in.
+
+    Draws only with fills and pygame's built-in font so it needs nothing
+    from the preload it is waiting on. ``images``/``fonts`` name what the
+    next screen needs (the whole preload by default); the rest keeps
+    loading after the splash returns.
+    """
+    def __init__(self, screen, preloader, images=None, fonts=()):
+        self.screen = screen
+        self.preloader = preloader
+        self.images = images
+        self.fonts = fonts
+        self.font = assets.font(None, max(20, int(config.SCREEN_HEIGHT * 0.04)))
+        self.first_frame_at = None
+
+    def draw(self, progress):
+        self.screen.fill((10, 10, 20))
+        width = int(config.SCREEN_WIDTH * 0.5)
+        height = max(8, int(config.SCREEN_HEIGHT * 0.02))
+        bar = pygame.Rect(0, 0, width, height)
+        bar.center = (config.SCREEN_WIDTH // 2, int(config.SCREEN_HEIGHT * 0.6))
+
+        text = text_cache.render(self.font, "Loading...", True, (255, 255, 255))
+        self.screen.blit(text, text.get_rect(midbottom=(bar.centerx, bar.top - height)))
+        pygame.draw.rect(self.screen, (60, 60, 80), bar)
+        pygame.draw.rect(self.screen, (50, 150, 255), (bar.x, bar.y, int(width * progress), height))
+        pygame.display.flip()
+
+    def run(self):
+        """Draw frames until the awaited assets are loaded."""
+        clock = pygame.time.Clock()
+        while True:
+            # Draw before polling so the first frame doesn't wait on conversions
+            self.draw(self.preloader.progress)
+            if self.first_frame_at is None:
+                self.first_frame_at = time.perf_counter()
+            self.preloader.poll()
+            if self.preloader.done or (
+                self.images is not None and self.preloader.ready(self.images, self.fonts)
+            ):
+                return
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    raise SystemExit
+
+            clock.tick(config.FPS)
@@ -0,0 +1,71 @@
+# client/ui/text.py
+"""Cache of rendered text surfaces.
+
+``font.render`` rasterises the whole string every call. Labels repeat the
+same (font, text, antialias, color, background) over and over, so
+``TextCache.render`` keeps those surfaces in a bounded LRU.
+
+Input fields change one keystroke at a time. ``render_input`` keeps a
+short history per field, so deleting characters, retyping them and
+redrawing a masked password are cache hits; new text costs one
+``font.render``. (SDL_ttf already caches glyphs; composing the string
+from glyph surfaces in Python measured slower than rendering it.)
+"""
+from collections import OrderedDict
+
+from client import config
+
+# Surfaces remembered per input field: enough to backspace over a long name
+INPUT_HISTORY = 64
+
+
+class TextCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()  # (font, text, antialias, color, bg) -> Surface
+        self._inputs = {}  # field key -> OrderedDict of recently shown (font, text, color)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def render(self, font, text, antialias, color, bg=None):
+        """Same result as ``font.render(text, antialias, color, bg)``; do not draw on it."""
+        key = (font, text, antialias, tuple(color), tuple(bg) if bg else None)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color, bg) if bg else font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    # ---------------- Input fields ----------------
+    def render_input(self, field, font, text, color, history=INPUT_HISTORY):
+        """Antialiased ``text`` for input ``field``, kept apart from the label LRU."""
+        key = (font, text, tuple(color))
+        recent = self._inputs.setdefault(field, OrderedDict())
+        surface = recent.get(key)
+        if surface is not None:
+            self.hits += 1
+            recent.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = recent[key] = font.render(text, True, color)
+        if len(recent) > history:
+            recent.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self._inputs.clear()
+
+
+text_cache = TextCache(config.TEXT_CACHE_ENTRIES)
@@ -0,0 +1,306 @@
+# core/game_state.py
+"""Client-side game state: the logged-in user and their characters.
+
+GameState keeps one slotted record per entity (User, Character with its
+Stats) for the whole session. The server's ``character_list`` is a full
+snapshot; after that it can send ``state_delta`` messages that only name
+what changed::
+
+    {"action": "state_delta", "version": 12, "base": 11,
+     "add": [{"id": 4, "name": "Mage", "stats": {...}}],
+     "update": [{"id": 3, "stats": {"hp": 80}}],
+     "remove": [2],
+     "user": {"username": "renamed"}}
+
+Records are updated in place, so a delta allocates nothing per entity it
+leaves alone. ``version`` is the server's state version: a delta at or
+below the current version is a duplicate and is ignored; one whose
+``base`` is not the current version means a delta was missed, so the
+store stays as it is and ``out_of_sync`` is set until the next snapshot.
+Deltas without a version (e.g. local changes after a confirmed delete)
+are applied as they are.
+
+Listeners get a Change naming exactly which ids were added, removed or
+updated (and which fields of each), so screens redo only what depends
+on those entities. Everything runs on the thread that applies the
+messages, the UI thread when fed by ``attach``.
+"""
+from core.utils import get_logger
+
+log = get_logger("network")
+
+_MISSING = object()
+
+
+# ---------------- Records ----------------
+class User:
+    __slots__ = ("id", "username")
+
+    def __init__(self, id=None, username=None):
+        self.id = id
+        self.username = username
+
+    def update(self, data):
+        """Copy the fields present in ``data``; returns the names of those that changed."""
+        changed = ()
+        for field in self.__slots__:
+            value = data.get(field, _MISSING)
+            if value is not _MISSING and value != getattr(self, field):
+                setattr(self, field, value)
+                changed += (field,)
+        return changed
+
+    def to_dict(self):
+        return {"id": self.id, "username": self.username}
+
+    def __repr__(self):
+        return f"User({self.id!r}, {self.username!r})"
+
+
+class Stats:
+    """A character's stats: level, hp and mp as slots, anything else in ``extra``.
+
+    Accepts both the snapshot's names ("Level", "HP") and the hot
+    ``stat_update`` schema's ("hp", "mp"); ``get`` answers either.
+    """
+    __slots__ = ("level", "hp", "mp", "extra")
+    FIELDS = {"Level": "level", "level": "level", "HP": "hp", "hp": "hp", "MP": "mp", "mp": "mp"}
+    NAMES = {"level": "Level", "hp": "HP", "mp": "MP"}  # field -> name in snapshots
+
+    def __init__(self):
+        self.level = None
+        self.hp = None
+        self.mp = None
+        self.extra = {}
+
+    def get(self, key, default=None):
+        field = self.FIELDS.get(key)
+        if field is None:
+            return self.extra.get(key, default)
+        value = getattr(self, field)
+        return default if value is None else value
+
+    def update(self, data):
+        """Copy ``data``'s stats; returns the names (fields or extra keys) of those that changed."""
+        changed = ()
+        for key, value in data.items():
+            if key == "id":
+                continue  # stat_update data carries the character id alongside the stats
+            field = self.FIELDS.get(key)
+            if field is not None:
+                if getattr(self, field) != value:
+                    setattr(self, field, value)
+                    changed += (field,)
+            elif self.extra.get(key, _MISSING) != value:
+                self.extra[key] = value
+                changed += (key,)
+        return changed
+
+    def to_dict(self):
+        stats = {name: getattr(self, field) for field, name in self.NAMES.items() if getattr(self, field) is not None}
+        stats.update(self.extra)
+        return stats
+
+
+class Character:
+    __slots__ = ("id", "name", "stats")
+
+    def __init__(self, id, name=""):
+        self.id = id
+        self.name = name
+        self.stats = Stats()
+
+    @classmethod
+    def from_dict(cls, data):
+        character = cls(data["id"], data.get("name", ""))
+        character.stats.update(data.get("stats") or {})
+        return character
+
+    def update(self, data):
+        """Copy ``name`` and ``stats`` from ``data``; returns the names of the fields that changed."""
+        changed = ()
+        name = data.get("name", _MISSING)
+        if name is not _MISSING and name != self.name:
+            self.name = name
+            changed = ("name",)
+        stats = data.get("stats")
+        if stats:
+            changed += self.stats.update(stats)
+        return changed
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "stats": self.stats.to_dict()}
+
+    def __repr__(self):
+        return f"Character({self.id!r}, {self.name!r})"
+
+
+class Change:
+    """What one snapshot or delta changed, as handed to GameState listeners."""
+    __slots__ = ("version", "added", "updated", "removed", "user")
+
+    def __init__(self, version):
+        self.version = version
+        self.added = []  # character ids
+        self.updated = {}  # character id -> names of the fields that changed
+        self.removed = []  # character ids
+        self.user = ()  # names of the user fields that changed
+
+    def __bool__(self):
+        return bool(self.added or self.updated or self.removed or self.user)
+
+    def __repr__(self):
+        return (f"Change(version={self.version}, added={self.added}, updated={self.updated}, "
+                f"removed={self.removed}, user={self.user})")
+
+
+# ---------------- Store ----------------
+class GameState:
+    def __init__(self):
+        self.version = 0
+        self.user = None
+        self.characters = {}  # id -> Character, in the server's order
+        self.out_of_sync = False  # a delta was missed; waiting for a snapshot
+        self.applied = 0
+        self.ignored = 0
+        self._listeners = []
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        state = cls()
+        state.load(snapshot)
+        return state
+
+    def character_list(self):
+        return list(self.characters.values())
+
+    # ---------------- Listeners ----------------
+    def subscribe(self, listener):
+        """Call ``listener(change)`` after every snapshot or delta that changed something."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, change):
+        if change:
+            for listener in list(self._listeners):
+                listener(change)
+        return change
+
+    # ---------------- Snapshots ----------------
+    def load(self, snapshot):
+        """Replace the state with a full snapshot (a ``character_list`` payload); returns the Change.
+
+        Characters that are still there keep their records and only report
+        the fields that differ.
+        """
+        version = snapshot.get("version")
+        if version is not None:
+            self.version = version
+        self.out_of_sync = False
+        change = Change(self.version)
+        if snapshot.get("user"):
+            change.user = self._update_user(snapshot["user"])
+
+        old, self.characters = self.characters, {}
+        for data in snapshot.get("characters") or ():
+            character = old.pop(data["id"], None)
+            if character is None:
+                character = Character.from_dict(data)
+                change.added.append(character.id)
+            else:
+                fields = character.update(data)
+                if fields:
+                    change.updated[character.id] = fields
+            self.characters[character.id] = character
+        change.removed.extend(old)
+        self.applied += 1
+        return self._notify(change)
+
+    def snapshot(self):
+        """The state as a ``character_list``-shaped dict, with its version."""
+        return {
+            "version": self.version,
+            "user": self.user.to_dict() if self.user else None,
+            "characters": [character.to_dict() for character in self.characters.values()],
+        }
+
+    # ---------------- Deltas ----------------
+    def apply(self, delta):
+        """Apply a ``state_delta``; returns the Change, or None if it was ignored."""
+        version = delta.get("version")
+        if version is not None:
+            if version <= self.version:
+                self.ignored += 1
+                return None  # already applied
+            base = delta.get("base", version - 1)
+            if base != self.version:
+                if not self.out_of_sync:
+                    log.warning("State delta %s does not follow version %s; waiting for a snapshot",
+                                version, self.version)
+                self.out_of_sync = True
+                self.ignored += 1
+                return None
+            self.version = version
+        change = Change(self.version)
+
+        if delta.get("user"):
+            change.user = self._update_user(delta["user"])
+        for data in delta.get("add") or ():
+            character = self.characters.get(data["id"])
+            if character is None:
+                self.characters[data["id"]] = Character.from_dict(data)
+                change.added.append(data["id"])
+            else:
+                fields = character.update(data)  # re-sent add: treat as an update
+                if fields:
+                    change.updated[character.id] = fields
+        for data in delta.get("update") or ():
+            character = self.characters.get(data["id"])
+            if character is None:
+                log.debug("Update for unknown character %s", data["id"])
+                continue
+            fields = character.update(data)
+            if fields:
+                change.updated[character.id] = fields
+        for char_id in delta.get("remove") or ():
+            if self.characters.pop(char_id, None) is not None:
+                change.removed.append(char_id)
+                change.updated.pop(char_id, None)
+        self.applied += 1
+        return self._notify(change)
+
+    def add_character(self, data):
+        return self.apply({"add": [data]})
+
+    def remove_character(self, char_id):
+        return self.apply({"remove": [char_id]})
+
+    def _update_user(self, data):
+        if self.user is None:
+            self.user = User(data.get("id"), data.get("username"))
+            return tuple(field for field in User.__slots__ if getattr(self.user, field) is not None)
+        return self.user.update(data)
+
+    # ---------------- Server messages ----------------
+    def attach(self, dispatcher):
+        """Keep the state current from a ``network.dispatcher.MessageDispatcher``'s messages."""
+        dispatcher.subscribe("character_list", self.load)
+        dispatcher.subscribe("state_delta", self.apply)
+        dispatcher.subscribe("character_created", lambda message: self.add_character(message["character"]))
+        dispatcher.subscribe("stat_update", self._on_stat_update)
+
+    def _on_stat_update(self, message):
+        # The hottest message: update the one record without building a delta
+        data = message["data"]
+        character = self.characters.get(data["id"])
+        if character is None:
+            return
+        fields = character.stats.update(data)
+        if fields:
+            change = Change(self.version)
+            change.updated[character.id] = fields
+            self.applied += 1
+            self._notify(change)
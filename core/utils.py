@@ -0,0 +1,105 @@
+# core/utils.py
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+
+LOGGER_ROOT = "otherworldly"
+SUBSYSTEMS = ("network", "ui", "assets")
+
+_listener = None
+
+
+def get_logger(subsystem):
+    """Logger for one subsystem ("network", "ui", "assets"), e.g. ``otherworldly.network``.
+
+    Use %-style arguments (``log.debug("Server: %s", message)``) rather than
+    f-strings: when the level is disabled the call returns after one level
+    check and the arguments are never formatted.
+    """
+    return logging.getLogger(f"{LOGGER_ROOT}.{subsystem}")
+
+
+class RedactingFormatter(logging.Formatter):
+    """Formatter that masks secrets such as passwords and session tokens.
+
+    Matches ``key: value`` / ``key=value`` pairs in the formatted text, which
+    covers both plain messages and the repr of message dicts. A quoted value
+    is masked whole, escaped quotes included; an unquoted one up to the next
+    ``,``, ``}`` or line end, since it may contain spaces.
+    """
+
+    SECRET_KEYS = ("password", "token", "session_token", "secret")
+    _pattern = re.compile(
+        r"""(['"]?(?:%s)['"]?\s*[:=]\s*)('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|[^,}\r\n]*)"""
+        % "|".join(SECRET_KEYS),
+        re.IGNORECASE,
+    )
+
+    @staticmethod
+    def _mask(match):
+        quote = match.group(2)[:1]
+        if quote not in ("'", '"'):
+            quote = ""
+        return f"{match.group(1)}{quote}***{quote}"
+
+    def format(self, record):
+        return self._pattern.sub(self._mask, super().format(record))
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves most formatting to the listener thread.
+
+    The stock handler fully formats every record in the calling thread.
+    Here only the %-arguments are merged into the message, so the listener
+    never reads objects (message dicts) the caller goes on to change;
+    timestamps, layout and redaction are done by the listener. Records of
+    disabled levels never reach the handler, so they still cost nothing.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(levels=None, stream=None, default_level="INFO"):
+    """Route every subsystem logger through a background queue listener.
+
+    ``levels`` maps subsystem name to level name, e.g. ``{"network": "DEBUG"}``;
+    subsystems not listed use ``default_level``. Output is written to
+    ``stream`` (stderr by default) by the listener thread, with secrets
+    redacted. Calling it again replaces the previous setup.
+    """
+    global _listener
+    shutdown_logging()
+
+    levels = levels or {}
+    root = logging.getLogger(LOGGER_ROOT)
+    root.setLevel(logging.DEBUG)
+    root.propagate = False
+    for subsystem in SUBSYSTEMS:
+        get_logger(subsystem).setLevel(levels.get(subsystem, default_level))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(RedactingFormatter("%(asctime)s %(levelname)-7s [%(name)s] %(message)s"))
+    log_queue = queue.SimpleQueue()
+    root.handlers[:] = [_DeferredQueueHandler(log_queue)]
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush and stop the background listener, if one is running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
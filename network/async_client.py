@@ -0,0 +1,290 @@
+# network/async_client.py
+import asyncio
+import itertools
+import json
+from collections import defaultdict, deque
+
+from core.utils import get_logger
+from network.protocol import (
+    HELLO_OK_ACTION, JsonLineCodec, ProtocolError, get_codec, hello_message,
+)
+
+log = get_logger("network")
+
+
+class AsyncGameClient:
+    """asyncio counterpart of GameClient built on ``asyncio.open_connection``.
+
+    Exposes the same surface (``connect``, ``login``, ``request``,
+    ``send_json``, ``delete_character``, ``close``, ``on_message``) as
+    coroutines. There are no helper threads: the receive loop is a task,
+    writes wait on ``drain()`` for backpressure, and requests are awaitable
+    futures matched by ``req_id``. ``on_message`` is called on the event
+    loop for every server message.
+    """
+
+    def __init__(self, host="127.0.0.1", port=5000, codecs=("json",), handshake_timeout=2.0,
+                 connect_timeout=5.0, connect_attempt_delay=0.25):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.connect_attempt_delay = connect_attempt_delay  # asyncio's happy eyeballs delay
+        self.codecs = tuple(codecs)
+        self.handshake_timeout = handshake_timeout
+        self.codec = JsonLineCodec()
+        self.reader = None
+        self.writer = None
+        self.recv_task = None
+        self.running = False
+        self.on_message = None
+
+        self.logged_in = False
+        self.user_id = None
+        self._last_login = None
+        self._login_lock = asyncio.Lock()
+
+        self._req_ids = itertools.count(1)
+        self._pending = {}  # req_id -> asyncio.Future
+        self._pending_by_action = defaultdict(deque)
+
+    # ---------------- Connection ----------------
+    async def connect(self):
+        if self.connected:
+            return
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, happy_eyeballs_delay=self.connect_attempt_delay,
+                                    interleave=1),
+            self.connect_timeout)
+        framer = await self._negotiate_codec()
+        self.running = True
+        self.recv_task = asyncio.get_running_loop().create_task(self._receive_loop(framer))
+        log.info("Connected to server %s:%s", self.host, self.port)
+
+        if self._last_login:
+            asyncio.get_running_loop().create_task(self._relogin_if_needed())
+
+    @property
+    def connected(self):
+        return self.writer is not None and self.running
+
+    async def _negotiate_codec(self):
+        """Same handshake as GameClient._negotiate_codec, awaiting the reply."""
+        self.codec = JsonLineCodec()
+        framer = self.codec.new_framer()
+        if self.codecs == (JsonLineCodec.name,):
+            return framer
+
+        self.writer.write(self.codec.encode(hello_message(self.codecs)))
+        await self.writer.drain()
+        try:
+            line = None
+            while line is None:
+                data = await asyncio.wait_for(self.reader.read(4096), self.handshake_timeout)
+                if not data:
+                    raise ConnectionError("server closed the connection during handshake")
+                framer.feed(data)
+                line = framer.next_frame()
+                while line is not None and not line.strip():
+                    line = framer.next_frame()
+            reply = json.loads(line)
+        except asyncio.TimeoutError:
+            log.warning("No codec handshake reply, using JSON lines")
+            return framer
+
+        if reply.get("action") != HELLO_OK_ACTION:
+            log.warning("Server declined codec handshake, using JSON lines: %s", reply)
+            return framer
+        try:
+            self.codec = get_codec(reply.get("codec", JsonLineCodec.name))
+        except ProtocolError as e:
+            log.warning("%s, using JSON lines", e)
+            return framer
+        leftover = framer.take_buffered()
+        framer = self.codec.new_framer()
+        framer.feed(leftover)
+        log.info("Using %s wire codec", self.codec.name)
+        return framer
+
+    # ---------------- Auto Relogin ----------------
+    async def _relogin_if_needed(self):
+        async with self._login_lock:
+            if self._last_login and not self.logged_in:
+                username, password = self._last_login
+                log.info("Re-sending login after reconnect")
+                await self.send_json({
+                    "action": "login",
+                    "data": {"username": username, "password": password}
+                })
+
+    # ---------------- Receive Loop ----------------
+    async def _receive_loop(self, framer):
+        codec = self.codec
+        try:
+            while self.running:
+                # Frames the handshake already buffered are handled before the first read
+                for frame in framer.drain():
+                    self._handle_frame(codec, frame)
+                data = await self.reader.read(65536)
+                if not data:
+                    log.warning("Server disconnected")
+                    break
+                framer.feed(data)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            log.warning("Receive error: %s", e)
+        self._on_disconnect(ConnectionError("connection to server lost"))
+
+    def _on_disconnect(self, exc):
+        self.running = False
+        self.logged_in = False
+        self.user_id = None
+        pending = list(self._pending.values())
+        self._pending.clear()
+        self._pending_by_action.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(exc)
+
+    def _handle_frame(self, codec, frame):
+        try:
+            message = codec.decode(frame)
+            if message is None:
+                return
+            log.debug("Server: %s", message)
+
+            if message.get("action") == "character_list":
+                self.logged_in = True
+                user = message.get("user")
+                if user:
+                    self.user_id = user.get("id")
+            elif message.get("action") == "snapshot":
+                # Baselines advance with acks; written now, flushed with the next drain
+                self.writer.write(codec.encode({"action": "snapshot_ack", "tick": message["tick"]}))
+
+            future = self._pop_pending(message.get("req_id"), message.get("action"))
+            if future is not None and not future.done():
+                future.set_result(message)
+            if self.on_message:
+                self.on_message(message)
+        except Exception as e:
+            log.warning("Failed to parse server message: %r - %s", frame, e)
+
+    def _pop_pending(self, req_id, action):
+        if req_id is not None:
+            return self._pending.pop(req_id, None)
+        for key in (action, None):
+            waiting = self._pending_by_action.get(key)
+            while waiting:
+                future = self._pending.pop(waiting.popleft(), None)
+                if future is not None:
+                    return future
+        return None
+
+    # ---------------- Send ----------------
+    async def send_json(self, data: dict):
+        """Write one message and wait until the transport buffer drains below its high-water mark."""
+        if not self.connected:
+            await self.connect()
+        try:
+            self.writer.write(self.codec.encode(data))
+            await self.writer.drain()
+        except Exception as e:
+            log.warning("Failed to send message: %s", e)
+            await self.close()
+
+    # ---------------- Login ----------------
+    async def login(self, username: str, password: str):
+        await self.connect()
+        self._last_login = (username, password)
+        return await self.request(
+            {"action": "login", "data": {"username": username, "password": password}},
+            expect_action="character_list"
+        )
+
+    # ---------------- Request ----------------
+    async def request(self, data: dict = None, expect_action=None, timeout=5):
+        """Send a message and await its response (None on timeout)."""
+        req_id = next(self._req_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = future
+        waiting = self._pending_by_action[expect_action]
+        waiting.append(req_id)
+        if len(waiting) > 64 and len(waiting) > 2 * len(self._pending):
+            self._pending_by_action[expect_action] = deque(r for r in waiting if r in self._pending)
+        try:
+            if data:
+                await self.send_json(dict(data, req_id=req_id))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            log.warning("Request timed out")
+        except ConnectionError as e:
+            log.warning("Request failed: %s", e)
+        finally:
+            self._pending.pop(req_id, None)
+        return None
+
+    # ---------------- Character Management ----------------
+    async def delete_character(self, char_id):
+        if not self.connected:
+            log.warning("Cannot delete: client not connected")
+            return None
+        if not self.logged_in:
+            log.warning("Cannot delete: user not logged in")
+            return None
+        return await self.request(
+            {"action": "delete_character", "data": {"char_id": char_id}},
+            expect_action="delete_character_ok"
+        )
+
+    # ---------------- Close ----------------
+    async def close(self):
+        self.running = False
+        self.logged_in = False
+        self.user_id = None
+        if self.recv_task and self.recv_task is not asyncio.current_task():
+            self.recv_task.cancel()
+        if self.writer:
+            writer, self.writer = self.writer, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+        self._on_disconnect(ConnectionError("client closed"))
+
+
+class EventLoopPump:
+    """Drives an asyncio event loop from a frame-based main loop such as pygame's.
+
+    Call ``pump()`` once per frame: it runs every callback that is ready and
+    polls sockets without blocking, then returns so the frame can render.
+    ``submit`` schedules a coroutine and returns its task; check
+    ``task.done()`` on later frames instead of awaiting it::
+
+        pump = EventLoopPump()
+        client = AsyncGameClient(config.SERVER_IP, config.SERVER_PORT)
+        login = pump.submit(client.login(username, password))
+        while running:
+            pump.pump()
+            if login.done():
+                ...
+            clock.tick(config.FPS)
+    """
+
+    def __init__(self, loop=None):
+        self.loop = loop or asyncio.new_event_loop()
+
+    def submit(self, coro):
+        return self.loop.create_task(coro)
+
+    def pump(self):
+        # A pending stop() makes the selector poll with a zero timeout
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+
+    def close(self):
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+        self.pump()
+        self.loop.close()
@@ -2,173 +2,637 @@
 import socket
 import threading
 import json
-import queue
 import time
+import heapq
+import itertools
+import random
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, Future, InvalidStateError
+
+from core.game_state import GameState
+from core.utils import get_logger
+from network.connect import open_connection
+from network.dispatcher import MessageDispatcher
+from network.interpolation import SnapshotBuffer
+from network.protocol import (
+    COMPRESSORS, HELLO_OK_ACTION, CompressedFramer, JsonLineCodec, ProtocolError, get_codec,
+    get_compression, hello_message,
+)
+
+log = get_logger("network")
 
 class GameClient:
-    def __init__(self, host="127.0.0.1", port=5000):
+    def __init__(self, host="127.0.0.1", port=5000, codecs=("json",), handshake_timeout=2.0,
+                 max_queued_writes=1024, flush_interval=0.0, auto_reconnect=True,
+                 reconnect_base_delay=0.5, reconnect_max_delay=30.0, inbox_size=1024,
+                 snapshot_rate=20, interpolation_delay=0.1, compression=(), compress_threshold=32,
+                 connect_timeout=5.0, read_timeout=None, connect_attempt_delay=0.25):
         self.host = host
         self.port = port
+        self.connect_timeout = connect_timeout  # for reaching the server, all its addresses included
+        self.read_timeout = read_timeout  # silence after which the connection counts as lost; None waits
+        self.connect_attempt_delay = connect_attempt_delay  # head start of each address over the next
+        self.codecs = tuple(codecs)  # wire codecs to offer, most preferred first
+        # Stream compressions to offer, most preferred first; only those installed here are offered
+        self.compression = tuple(name for name in compression if name in COMPRESSORS)
+        self.compress_threshold = compress_threshold  # batches shorter than this are sent raw
+        self.handshake_timeout = handshake_timeout
+        self.codec = JsonLineCodec()
+        self.stream = None  # the connection's compression (protocol._CompressedStream), if agreed
         self.sock = None
+        # "disconnected", "connecting" or "connected", for screens to show; each
+        # change also calls ``on_wakeup``. ``last_error`` says why a connect failed.
+        self.status = "disconnected"
+        self.last_error = None
+        self._connecting = None  # Future of the connect_async in progress
+        self._connect_lock = threading.Lock()
+        self._establish_lock = threading.Lock()  # one connection attempt at a time
         self.recv_thread = None
+        self.send_thread = None
         self.running = False
-        self.on_message = None
-        self._response_queue = queue.Queue()  # queue for all messages
+        self.on_message = None  # called on the receive thread; UIs subscribe to ``dispatcher``
+        # Called on the receive thread after each batch of messages and on
+        # disconnect, e.g. to wake a UI loop blocked in pygame.event.wait
+        self.on_wakeup = None
+        # Every server message, request replies included, for the UI thread to drain
+        self.dispatcher = MessageDispatcher(inbox_size)
+        # The user and characters, kept current from those messages as they are drained
+        self.state = GameState()
+        self.state.attach(self.dispatcher)
+        # Entity snapshots, for screens to sample once per frame
+        self.world = SnapshotBuffer(snapshot_rate, interpolation_delay)
+        self.world.attach(self.dispatcher)
+
+        # Messages waiting for the writer thread, which owns socket writes. They
+        # stay here across an outage and are flushed once the session resumes.
+        self._outgoing = deque()
+        self._out_cond = threading.Condition()
+        self._writer_sock = None  # socket the writer thread may currently write to
+        self.max_queued_writes = max_queued_writes
+        self.flush_interval = flush_interval  # extra time to gather a batch before each flush
+        self.write_stats = WriteStats()
+
+        # Reconnect supervisor
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.reconnect_attempts = 0
+        self._supervisor = None
+        self._supervisor_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        # In-flight requests: req_id -> (Future, expected action)
+        self._req_ids = itertools.count(1)
+        self._pending = {}
+        self._pending_by_action = defaultdict(deque)  # fallback for replies without req_id
+        self._pending_lock = threading.Lock()
+        self._reaper = _DeadlineReaper()
 
         self.logged_in = False
         self.user_id = None
-        self._last_login = None
-        self._login_lock = threading.Lock()  # prevent simultaneous relogin attempts
+        self._last_login = None     # credentials, kept only until the server issues a session token
+        self._session_token = None
 
     # ---------------- Connection ----------------
     def connect(self):
         if self.connected:
             return
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.connect((self.host, self.port))
-        self.running = True
-        self.recv_thread = threading.Thread(target=self._receive_loop, daemon=True)
-        self.recv_thread.start()
-        print(f"[+] Connected to server {self.host}:{self.port}")
-
-        # Trigger relogin asynchronously if needed
-        if self._last_login:
-            threading.Thread(target=self._relogin_if_needed, daemon=True).start()
+        self._closed.clear()
+        self._establish()
+
+    def connect_async(self):
+        """Connect on a background thread; returns a Future that completes once connected.
+
+        Calling it again while a connect is in progress returns the same
+        Future, and an attempt the reconnect supervisor has in progress is
+        waited for rather than joined by a second connection. If the connect
+        fails, the Future holds the error and the reconnect supervisor keeps
+        trying (with ``auto_reconnect``).
+        """
+        with self._connect_lock:
+            if self._connecting is not None:
+                return self._connecting
+            future = Future()
+            if self.connected:
+                future.set_result(None)
+                return future
+            self._connecting = future
+        self._closed.clear()
+        threading.Thread(target=self._connect_in_background, args=(future,), daemon=True).start()
+        return future
+
+    def _connect_in_background(self, future):
+        error = None
+        try:
+            self._establish()
+        except Exception as e:
+            error = e
+        with self._connect_lock:
+            self._connecting = None
+        if error is None:
+            future.set_result(None)
+            return
+        log.warning("Cannot connect to %s:%s: %s", self.host, self.port, error)
+        future.set_exception(error)
+        self._start_supervisor()
+
+    def _set_status(self, status, error=None):
+        self.status = status
+        self.last_error = error
+        if self.on_wakeup:
+            self.on_wakeup()
+
+    def _establish(self):
+        """Open the socket, negotiate a codec, resume any session and start both I/O threads.
+
+        Attempts from ``connect``, ``connect_async`` and the reconnect supervisor
+        run one at a time; one that finds the client already connected returns.
+        """
+        with self._establish_lock:
+            if self.connected:
+                return
+            self._set_status("connecting", self.last_error)
+            self.sock = None
+            try:
+                self.sock = open_connection(self.host, self.port, self.connect_timeout, self.connect_attempt_delay)
+                # Writes are already batched by the writer thread; don't let Nagle hold back single frames
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.sock.settimeout(self.read_timeout)
+                framer = self._negotiate_codec()
+                # Written ahead of anything buffered during an outage, so the server
+                # has re-authenticated us before it sees those messages.
+                resume = self._resume_message()
+                if resume:
+                    log.info("Resuming session after reconnect")
+                    self.sock.sendall(self._wrap(self.codec.encode(resume)))
+            except Exception as e:
+                if self.sock is not None:
+                    self.sock.close()
+                    self.sock = None
+                self._set_status("disconnected", e)
+                raise
+            self.running = True
+            self.recv_thread = threading.Thread(target=self._receive_loop, args=(self.sock, framer), daemon=True)
+            self.recv_thread.start()
+            with self._out_cond:
+                self._writer_sock = self.sock
+            self.send_thread = threading.Thread(target=self._send_loop, args=(self.sock,), daemon=True)
+            self.send_thread.start()
+            self._set_status("connected")
+            log.info("Connected to server %s:%s", self.host, self.port)
+
+    def _negotiate_codec(self):
+        """Agree on a wire codec before the receive thread starts.
+
+        Offers ``self.codecs`` with a ``hello`` action and reads the reply
+        directly off the socket. A server that answers with anything other
+        than ``hello_ok`` (or not at all) keeps the JSON-lines protocol.
+        Returns the framer the receive loop should continue with, holding any
+        bytes that arrived after the reply.
+        """
+        self.codec = JsonLineCodec()
+        self.stream = None
+        framer = self.codec.new_framer()
+        if self.codecs == (JsonLineCodec.name,) and not self.compression:
+            return framer
+
+        self.sock.sendall(self.codec.encode(hello_message(self.codecs, self.compression)))
+        self.sock.settimeout(self.handshake_timeout)
+        reply = None
+        try:
+            while reply is None:
+                if not framer.recv_into(self.sock):
+                    raise ConnectionError("server closed the connection during handshake")
+                line = framer.next_frame()
+                while line is not None and not line.strip():
+                    line = framer.next_frame()
+                if line is not None:
+                    reply = json.loads(line)
+        except socket.timeout:
+            log.warning("No codec handshake reply, using JSON lines")
+            return framer
+        finally:
+            self.sock.settimeout(self.read_timeout)
+
+        if reply.get("action") != HELLO_OK_ACTION:
+            log.warning("Server declined codec handshake, using JSON lines: %s", reply)
+            return framer
+        try:
+            self.codec = get_codec(reply.get("codec", JsonLineCodec.name))
+        except ProtocolError as e:
+            log.warning("%s, using JSON lines", e)
+            return framer
+        leftover = framer.take_buffered()
+        framer = self.codec.new_framer()
+        if reply.get("compression"):
+            # The server compresses from here on, so an unknown choice cannot be ignored
+            self.stream = get_compression(reply["compression"], self.compress_threshold)
+            framer = CompressedFramer(framer, self.stream)
+        framer.feed(leftover)
+        log.info("Using %s wire codec%s", self.codec.name,
+                 f" with {self.stream.name} compression" if self.stream else "")
+        return framer
+
+    def _wrap(self, data):
+        """Chunk ``data`` for the negotiated compression (unchanged without one)."""
+        return self.stream.wrap(data) if self.stream is not None else data
 
     @property
     def connected(self):
         return self.sock is not None and self.running
 
-    # ---------------- Auto Relogin ----------------
-    def _relogin_if_needed(self):
-        with self._login_lock:
-            if self._last_login and not self.logged_in:
-                username, password = self._last_login
-                print("[*] Re-sending login after reconnect...")
-                self.send_json({
-                    "action": "login",
-                    "data": {"username": username, "password": password}
-                })
-                # Do NOT block here: `_receive_loop` will handle response and set logged_in
+    # ---------------- Reconnect Supervisor ----------------
+    def _resume_message(self):
+        """Message that restores the session on a fresh connection, if there is one to restore."""
+        if self._session_token:
+            return {"action": "resume", "data": {"token": self._session_token}}
+        if self._last_login:
+            # Server has not issued a token; fall back to the original credentials
+            username, password = self._last_login
+            return {"action": "login", "data": {"username": username, "password": password}}
+        return None
+
+    def backoff_delay(self, attempt):
+        """Capped exponential backoff with jitter, so clients don't reconnect in lockstep."""
+        delay = min(self.reconnect_max_delay, self.reconnect_base_delay * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _start_supervisor(self):
+        with self._supervisor_lock:
+            if self._closed.is_set() or not self.auto_reconnect or self._supervisor is not None:
+                return
+            self._supervisor = threading.Thread(target=self._reconnect_loop, daemon=True)
+            self._supervisor.start()
+
+    def _reconnect_loop(self):
+        """Retry until connected or closed.
+
+        The exit check and clearing ``_supervisor`` share the lock with
+        ``_start_supervisor``, so a connection that drops right after it
+        was established either keeps this loop going or starts a new one.
+        """
+        attempt = 0
+        while True:
+            with self._supervisor_lock:
+                if self.connected or self._closed.is_set():
+                    self._supervisor = None
+                    return
+            if self._closed.wait(self.backoff_delay(attempt)) or self.connected:
+                continue
+            self.reconnect_attempts += 1
+            try:
+                self._establish()
+                attempt = 0
+            except Exception as e:
+                log.info("Reconnect attempt %d failed: %s", attempt + 1, e)
+                attempt += 1
 
     # ---------------- Receive Loop ----------------
-    def _receive_loop(self):
-        buffer = ""
-        while self.running:
+    def _receive_loop(self, sock, framer):
+        codec = self.codec
+        while True:
             try:
-                data = self.sock.recv(4096)
-                if not data:
-                    print("[!] Server disconnected")
-                    self.running = False
-                    self.logged_in = False
-                    self.user_id = None
+                # Drained before each read, so frames the handshake already buffered don't wait for more data
+                frames = framer.drain()
+                for frame in frames:
+                    self._handle_frame(codec, frame)
+                if frames and self.on_wakeup:
+                    self.on_wakeup()
+                if not framer.recv_into(sock):
+                    if not self._closed.is_set():
+                        log.warning("Server disconnected")
                     break
-                buffer += data.decode("utf-8")
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    if line.strip():
-                        try:
-                            message = json.loads(line)
-                            # Debug log
-                            print("[<] Server:", message)
-
-                            # Update login state if character_list received
-                            if message.get("action") == "character_list":
-                                self.logged_in = True
-                                user = message.get("user")
-                                if user:
-                                    self.user_id = user.get("id")
-
-                            self._response_queue.put(message)
-                            if self.on_message:
-                                self.on_message(message)
-                        except Exception as e:
-                            print(f"[!] Failed to parse server message: {line} - {e}")
             except Exception as e:
-                print(f"[!] Receive error: {e}")
-                self.running = False
-                self.logged_in = False
-                self.user_id = None
+                if not self._closed.is_set():
+                    log.warning("Receive error: %s", e)
                 break
+        self._on_disconnect(sock)
+
+    def _on_disconnect(self, sock):
+        if self.sock is not sock:
+            return  # already replaced or closed
+        # Detach the writer first, so nothing queued once we look disconnected goes to the dead socket
+        with self._out_cond:
+            self._writer_sock = None
+            self._out_cond.notify_all()
+        self.running = False
+        self.logged_in = False
+        self.user_id = None
+        self.sock = None
+        sock.close()
+        self._fail_pending(ConnectionError("connection to server lost"))
+        self._set_status("disconnected")
+        self._start_supervisor()
+
+    def _handle_frame(self, codec, frame):
+        try:
+            message = codec.decode(frame)
+            if message is None:
+                return
+            log.debug("Server: %s", message)
+
+            # Update login state if character_list received
+            action = message.get("action")
+            if action == "character_list":
+                self.logged_in = True
+                user = message.get("user")
+                if user:
+                    self.user_id = user.get("id")
+                if message.get("session_token"):
+                    self._session_token = message["session_token"]
+                    self._last_login = None  # resume with the token from now on
+            elif action == "resume_failed":
+                self._session_token = None
+            elif action == "snapshot":
+                # Stamped here, not when the UI drains it, so the jitter buffer sees network timing only
+                message["received_at"] = time.monotonic()
+                self.send({"action": "snapshot_ack", "tick": message["tick"]})
+
+            future = self._pop_pending(message.get("req_id"), message.get("action"))
+            if future is not None:
+                try:
+                    future.set_result(message)
+                except InvalidStateError:
+                    pass  # cancelled or timed out while the reply was in flight
+            self.dispatcher.post(message)
+            if self.on_message:
+                self.on_message(message)
+        except Exception as e:
+            log.warning("Failed to parse server message: %r - %s", frame, e)
 
     # ---------------- Send ----------------
     def send_json(self, data: dict):
         try:
-            self.send(json.dumps(data))
+            self.send(data)
         except Exception as e:
-            print(f"[!] Failed to send JSON: {e}")
+            log.warning("Failed to send JSON: %s", e)
+
+    def send(self, message):
+        """Queue a message dict (or JSON text) for the writer thread; never blocks.
 
-    def send(self, message: str):
-        """Send raw string message, auto-reconnect if needed."""
+        While the connection is down, messages are buffered (up to
+        ``max_queued_writes``) and the reconnect supervisor is started; they
+        are flushed once the session has been resumed. Delivery is
+        at-most-once: frames already written to a connection the server
+        then drops are lost without notice, only queued ones survive.
+        """
+        with self._out_cond:
+            if len(self._outgoing) >= self.max_queued_writes:
+                self.write_stats.dropped += 1
+                log.warning("Outgoing queue full, dropping message")
+                return
+            self._outgoing.append(message)
+            self._out_cond.notify()
         if not self.connected:
+            self._start_supervisor()
+
+    @property
+    def queue_depth(self):
+        """Messages waiting for the writer thread."""
+        return len(self._outgoing)
+
+    # ---------------- Send Loop ----------------
+    def _send_loop(self, sock):
+        """Own all writes to ``sock``: flush everything queued with one sendall per batch."""
+        codec = self.codec
+        stream = self.stream
+        stats = self.write_stats
+        while True:
+            with self._out_cond:
+                while not self._outgoing and self._writer_sock is sock:
+                    self._out_cond.wait()
+                if self._writer_sock is not sock:
+                    return
+            if self.flush_interval:
+                time.sleep(self.flush_interval)
+            with self._out_cond:
+                batch = list(self._outgoing)
+                self._outgoing.clear()
+
+            parts = []
+            for message in batch:
+                try:
+                    parts.append(codec.encode(message))
+                except Exception as e:
+                    log.warning("Failed to encode message: %s", e)
+            data = b"".join(parts)
+            if stream is not None and data:
+                data = stream.wrap(data)  # one compressed (or raw) chunk per batch
             try:
-                self.connect()
-                # Wait for login to complete if we had previous credentials
-                if hasattr(self, "_last_login") and not self.logged_in:
-                    # simple blocking wait for login to complete
-                    start = time.time()
-                    while not self.logged_in and time.time() - start < 5:
-                        time.sleep(0.05)
-                    if not self.logged_in:
-                        print("[!] Cannot send: login did not complete")
-                        return
+                sock.sendall(data)
             except Exception as e:
-                print(f"[!] Cannot send: failed to reconnect: {e}")
+                log.warning("Failed to send message: %s", e)
+                with self._out_cond:
+                    # Keep the batch for the next connection
+                    self._outgoing.extendleft(reversed(batch))
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)  # wakes the receive loop, which reconnects
+                except OSError:
+                    pass
                 return
-        try:
-            self.sock.sendall((message + "\n").encode("utf-8"))
-        except Exception as e:
-            print(f"[!] Failed to send message: {e}")
-            self.running = False
-            self.sock.close()
-            self.sock = None
-
+            stats.record(len(parts), len(data))
 
     # ---------------- Login ----------------
     def login(self, username: str, password: str):
-        self._last_login = (username, password)
         self.connect()  # ensures connection
-        self.send_json({
-            "action": "login",
-            "data": {"username": username, "password": password}
-        })
-        # request(...) can still be used for blocking login if needed
-        return self.request(expect_action="character_list")
+        self._last_login = (username, password)
+        self._session_token = None
+        return self.request(
+            {"action": "login", "data": {"username": username, "password": password}},
+            expect_action="character_list"
+        )
+
+    def login_async(self, username: str, password: str):
+        """Log in without blocking; the reply is delivered through ``dispatcher``.
+
+        Connects in the background first if needed. Returns the connect
+        Future; nothing is sent if that fails.
+        """
+        def send(connecting):
+            if connecting.exception() is None:
+                self._last_login = (username, password)
+                self._session_token = None
+                self.send_json({"action": "login", "data": {"username": username, "password": password}})
+
+        connecting = self.connect_async()
+        connecting.add_done_callback(send)
+        return connecting
 
     # ---------------- Request ----------------
     def request(self, data: dict = None, expect_action=None, timeout=5):
-        """Send a JSON message and block until a matching response is received."""
-        if data:
-            self.send_json(data)
+        """Send a JSON message and block until its response is received (None on timeout)."""
+        future = self.request_async(data, expect_action)
         try:
-            start = time.time()
-            while True:
-                remaining = max(0, timeout - (time.time() - start))
-                msg = self._response_queue.get(timeout=remaining)
-                if expect_action is None or msg.get("action") == expect_action:
-                    return msg
-        except queue.Empty:
-            print("[!] Request timed out")
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            log.warning("Request timed out")
+        except CancelledError:
+            log.info("Request cancelled")
+        except ConnectionError as e:
+            log.warning("Request failed: %s", e)
+        return None
+
+    def request_async(self, data: dict = None, expect_action=None, timeout=None):
+        """Send a JSON message tagged with a fresh ``req_id`` and return a Future for its reply.
+
+        The reply is matched by the ``req_id`` the server echoes back; replies
+        without one complete the oldest request waiting for ``expect_action``.
+        Any number of requests may be in flight at once. ``timeout`` fails the
+        future with TimeoutError; ``future.cancel()`` abandons the request.
+        """
+        req_id = next(self._req_ids)
+        future = Future()
+        with self._pending_lock:
+            self._pending[req_id] = (future, expect_action)
+            waiting = self._pending_by_action[expect_action]
+            waiting.append(req_id)
+            if len(waiting) > 64 and len(waiting) > 2 * len(self._pending):
+                # Drop ids already answered by req_id so the fallback index stays bounded
+                self._pending_by_action[expect_action] = deque(r for r in waiting if r in self._pending)
+        future.add_done_callback(lambda _f: self._forget(req_id))
+        if timeout is not None:
+            self._reaper.watch(future, timeout)
+        if data:
+            self.send_json(dict(data, req_id=req_id))
+        return future
+
+    def _forget(self, req_id):
+        with self._pending_lock:
+            self._pending.pop(req_id, None)
+
+    def _pop_pending(self, req_id, action):
+        """Find the request a server message answers, or None for an unsolicited push."""
+        with self._pending_lock:
+            if req_id is not None:
+                # A reply to a request that already timed out stays unsolicited
+                entry = self._pending.pop(req_id, None)
+                return entry[0] if entry else None
+            for key in (action, None):
+                waiting = self._pending_by_action.get(key)
+                while waiting:
+                    entry = self._pending.pop(waiting.popleft(), None)
+                    if entry is not None:
+                        return entry[0]
             return None
 
+    def _fail_pending(self, exc):
+        with self._pending_lock:
+            futures = [future for future, _ in self._pending.values()]
+            self._pending.clear()
+            self._pending_by_action.clear()
+        for future in futures:
+            try:
+                future.set_exception(exc)
+            except InvalidStateError:
+                pass
+
     # ---------------- Character Management ----------------
     def delete_character(self, char_id):
-        if not self.connected:
-            print("[!] Cannot delete: client not connected")
-            return None
-        if not self.logged_in:
-            print("[!] Cannot delete: user not logged in")
+        if not self._can_delete():
             return None
         return self.request(
             {"action": "delete_character", "data": {"char_id": char_id}},
             expect_action="delete_character_ok"
         )
 
+    def delete_character_async(self, char_id, timeout=5):
+        """``delete_character`` without blocking: a Future for the reply, or None if not logged in."""
+        if not self._can_delete():
+            return None
+        return self.request_async(
+            {"action": "delete_character", "data": {"char_id": char_id}},
+            expect_action="delete_character_ok", timeout=timeout
+        )
+
+    def _can_delete(self):
+        if not self.connected:
+            log.warning("Cannot delete: client not connected")
+            return False
+        if not self.logged_in:
+            log.warning("Cannot delete: user not logged in")
+            return False
+        return True
+
     # ---------------- Close ----------------
     def close(self):
+        self._closed.set()
         self.running = False
         self.logged_in = False
         self.user_id = None
+        with self._out_cond:
+            self._writer_sock = None
+            self._out_cond.notify_all()
         if self.sock:
-            self.sock.close()
-            self.sock = None
+            sock, self.sock = self.sock, None
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        self.status = "disconnected"
+        self._fail_pending(ConnectionError("client closed"))
+
+
+class WriteStats:
+    """Counters kept by GameClient's writer thread."""
+
+    __slots__ = ("flushes", "messages", "bytes", "max_batch", "dropped")
+
+    def __init__(self):
+        self.flushes = 0
+        self.messages = 0
+        self.bytes = 0
+        self.max_batch = 0
+        self.dropped = 0
+
+    def record(self, messages, nbytes):
+        self.flushes += 1
+        self.messages += messages
+        self.bytes += nbytes
+        if messages > self.max_batch:
+            self.max_batch = messages
+
+    @property
+    def bytes_per_flush(self):
+        return self.bytes / self.flushes if self.flushes else 0.0
+
+    @property
+    def messages_per_flush(self):
+        return self.messages / self.flushes if self.flushes else 0.0
+
+
+class _DeadlineReaper:
+    """Single daemon thread that fails request futures whose timeout has passed."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def watch(self, future, timeout):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + timeout, next(self._seq), future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].done():
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                _, _, future = heapq.heappop(self._heap)
+                try:
+                    future.set_exception(TimeoutError("request timed out"))
+                except InvalidStateError:
+                    pass
@@ -0,0 +1,147 @@
+# network/connect.py
+"""Opening the TCP connection to the server.
+
+``open_connection`` resolves the host through ``addresses``, a cache of
+getaddrinfo results, then races the addresses it returns ("happy
+eyeballs", RFC 8305): families are interleaved (IPv6, IPv4, IPv6, ...
+when the resolver puts IPv6 first), each attempt is a non-blocking
+connect, and the next one starts ``attempt_delay`` seconds later or as
+soon as one fails, so a dead IPv6 route costs a fraction of a second
+instead of a full connect timeout. The first socket to connect wins and
+the others are closed; the whole race is bounded by ``timeout``.
+
+When every address fails the cached entry is dropped, so the next
+attempt resolves the host again.
+"""
+import errno
+import itertools
+import os
+import selectors
+import socket
+import threading
+import time
+
+from core.utils import get_logger
+
+log = get_logger("network")
+
+_IN_PROGRESS = {0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN}
+
+
+class AddressCache:
+    """getaddrinfo results per (host, port), reused for ``ttl`` seconds."""
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+        self._entries = {}  # (host, port) -> (expires at, addrinfo list)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host, port):
+        """Stream addresses for ``host``:``port``, as ``socket.getaddrinfo`` returns them."""
+        key = (host, port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        self.put(host, port, infos)
+        return infos
+
+    def put(self, host, port, infos):
+        """Remember ``infos`` (getaddrinfo tuples) as the addresses of ``host``:``port``."""
+        with self._lock:
+            self._entries[(host, port)] = (time.monotonic() + self.ttl, list(infos))
+
+    def forget(self, host, port):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+addresses = AddressCache()
+
+
+def interleave(infos):
+    """Order addresses for connecting: alternate address families, starting with the first one's."""
+    by_family = {}
+    for info in infos:
+        by_family.setdefault(info[0], []).append(info)
+    ordered = itertools.chain.from_iterable(itertools.zip_longest(*by_family.values()))
+    return [info for info in ordered if info is not None]
+
+
+def open_connection(host, port, timeout=5.0, attempt_delay=0.25, cache=None):
+    """Return a blocking TCP socket connected to ``host``:``port``.
+
+    Raises ``TimeoutError`` when no address connects within ``timeout``
+    seconds, or the last connect error when every address was refused.
+    """
+    cache = addresses if cache is None else cache
+    deadline = time.monotonic() + timeout
+    infos = interleave(cache.resolve(host, port))
+    try:
+        return _race(infos, deadline, attempt_delay)
+    except OSError:
+        cache.forget(host, port)
+        raise
+
+
+def _race(infos, deadline, attempt_delay):
+    pending = list(infos)
+    attempts = []
+    error = None
+    next_attempt = time.monotonic()
+    selector = selectors.DefaultSelector()
+    try:
+        while True:
+            now = time.monotonic()
+            if pending and (now >= next_attempt or not attempts):
+                family, type_, proto, _, sockaddr = pending.pop(0)
+                try:
+                    sock = socket.socket(family, type_, proto)
+                except OSError as e:  # e.g. no IPv6 on this host: try the next address
+                    error = e
+                    continue
+                sock.setblocking(False)
+                err = sock.connect_ex(sockaddr)
+                if err not in _IN_PROGRESS:
+                    sock.close()
+                    error = OSError(err, f"{os.strerror(err)} connecting to {sockaddr}")
+                    continue
+                attempts.append(sock)
+                selector.register(sock, selectors.EVENT_WRITE, sockaddr)
+                next_attempt = now + attempt_delay
+                continue
+
+            if not attempts:
+                raise error or ConnectionError("no addresses to connect to")
+            if now >= deadline:
+                raise TimeoutError("timed out connecting to " + ", ".join(
+                    str(key.data) for key in selector.get_map().values()))
+            wait = deadline - now
+            if pending:
+                wait = min(wait, next_attempt - now)
+            for key, _ in selector.select(wait):
+                sock = key.fileobj
+                selector.unregister(sock)
+                attempts.remove(sock)
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err:
+                    sock.close()
+                    error = OSError(err, f"{os.strerror(err)} connecting to {key.data}")
+                    next_attempt = now  # don't wait out the delay behind a refused address
+                    continue
+                sock.setblocking(True)
+                log.debug("Connected to %s", key.data)
+                return sock
+    finally:
+        for sock in attempts:
+            sock.close()
+        selector.close()
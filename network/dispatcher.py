@@ -0,0 +1,71 @@
+# network/dispatcher.py
+"""Delivering server messages to the UI thread.
+
+The client's receive thread ``post``s every decoded message into a
+bounded inbox. The UI thread calls ``drain`` once per frame, which hands
+up to ``budget`` messages to the handlers subscribed to their action
+(and to those subscribed to every message, action None). Handlers
+therefore run on the UI thread, in arrival order, and any number of
+them can listen to the same action without replacing each other.
+
+The inbox is a ``collections.deque``, whose append and popleft are
+atomic, so posting never takes a lock. When the inbox is full the oldest
+message is dropped and counted in ``dropped``; a UI that stops draining
+cannot make the client grow without bound.
+"""
+from collections import defaultdict, deque
+
+from core.utils import get_logger
+
+log = get_logger("network")
+
+
+class MessageDispatcher:
+    def __init__(self, max_messages=1024):
+        self.max_messages = max_messages
+        self._inbox = deque(maxlen=max_messages)
+        self._handlers = defaultdict(list)  # action (None: every message) -> handlers
+        self.posted = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def __len__(self):
+        """Messages waiting for ``drain``."""
+        return len(self._inbox)
+
+    # ---------------- Subscribers (UI thread) ----------------
+    def subscribe(self, action, handler):
+        """Call ``handler(message)`` from ``drain`` for each message with ``action`` (None: all)."""
+        self._handlers[action].append(handler)
+
+    def unsubscribe(self, action, handler):
+        handlers = self._handlers.get(action)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    # ---------------- Inbox ----------------
+    def post(self, message):
+        """Queue ``message`` for the UI; called by the single receive thread."""
+        if len(self._inbox) == self.max_messages:
+            self.dropped += 1  # the append below pushes out the oldest message
+        self._inbox.append(message)
+        self.posted += 1
+
+    def drain(self, budget=None):
+        """Deliver up to ``budget`` waiting messages (all of them if None); returns how many."""
+        count = 0
+        while self._inbox and (budget is None or count < budget):
+            message = self._inbox.popleft()
+            count += 1
+            action = message.get("action")
+            # Copies: a handler may subscribe or unsubscribe while being called
+            for handler in list(self._handlers.get(action, ())) + list(self._handlers.get(None, ())):
+                try:
+                    handler(message)
+                except Exception as e:
+                    log.warning("Handler for %r failed: %s", action, e)
+        self.delivered += count
+        return count
+
+    def clear(self):
+        self._inbox.clear()
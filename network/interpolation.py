@@ -0,0 +1,112 @@
+# network/interpolation.py
+"""Smooth entity positions between server snapshots.
+
+Snapshots arrive at the server's tick rate (20 per second by default)
+and with network jitter; frames are drawn at ``config.FPS``. The
+SnapshotBuffer is a jitter buffer: it stamps each snapshot with the
+server time of its tick, learns the offset between that and the local
+clock from the fastest deliveries seen (jitter only ever makes a
+snapshot later), and ``sample`` renders the world ``delay`` seconds
+behind the newest server time it can expect to have. Fields marked
+``lerp`` in ``protocol.SNAPSHOT_FIELDS`` are interpolated between the
+two snapshots around that moment; the others take the older snapshot's
+value. An entity is only drawn once the snapshot adding it is reached
+and disappears with the first snapshot without it.
+
+When a snapshot is later than ``delay`` allows, the newest one is held
+(``underruns``); one arriving after its moment was already drawn is
+dropped (``late``).
+"""
+import bisect
+import time
+
+from network.protocol import SNAPSHOT_FIELDS
+
+# How fast the clock offset creeps back up after a fast delivery, per snapshot
+OFFSET_DRIFT = 0.002
+
+
+class SnapshotBuffer:
+    def __init__(self, tick_rate=20, delay=0.1, capacity=64, fields=SNAPSHOT_FIELDS):
+        self.tick_rate = tick_rate
+        self.delay = delay
+        self.capacity = capacity
+        self.lerp_fields = tuple(field.name for field in fields if field.lerp)
+        self._ticks = []  # ticks buffered, ascending
+        self._entities = {}  # tick -> {entity id: {field: value}}
+        self._offset = None  # local clock minus server time, for the fastest deliveries
+        self._drawn_tick = 0.0  # render position of the last sample, in ticks
+        self.received = 0
+        self.late = 0
+        self.underruns = 0
+
+    def __len__(self):
+        return len(self._ticks)
+
+    # ---------------- Receiving ----------------
+    def push(self, tick, entities, received_at=None):
+        """Buffer the snapshot for ``tick``, received at ``received_at`` (time.monotonic)."""
+        if received_at is None:
+            received_at = time.monotonic()
+        offset = received_at - tick / self.tick_rate
+        if self._offset is None or offset < self._offset:
+            self._offset = offset
+        else:
+            self._offset += (offset - self._offset) * OFFSET_DRIFT  # follow clock drift slowly
+
+        self.received += 1
+        if tick in self._entities or (self._ticks and tick < self._drawn_tick):
+            self.late += 1
+            return
+        bisect.insort(self._ticks, tick)
+        self._entities[tick] = entities
+        while len(self._ticks) > self.capacity:
+            del self._entities[self._ticks.pop(0)]
+
+    def attach(self, dispatcher):
+        """Buffer the ``snapshot`` messages of a ``network.dispatcher.MessageDispatcher``."""
+        dispatcher.subscribe("snapshot", lambda message: self.push(
+            message["tick"], message["entities"], message.get("received_at")))
+
+    # ---------------- Rendering ----------------
+    def render_tick(self, now=None):
+        """The (fractional) server tick to draw at local time ``now``."""
+        if self._offset is None:
+            return None
+        if now is None:
+            now = time.monotonic()
+        return (now - self._offset - self.delay) * self.tick_rate
+
+    def sample(self, now=None):
+        """Every entity's state to draw at ``now``: {entity id: {field: value}}."""
+        ticks = self._ticks
+        if not ticks:
+            return {}
+        at = self.render_tick(now)
+        self._drawn_tick = at
+        i = bisect.bisect_right(ticks, at)
+        if i == 0:
+            return self._entities[ticks[0]]  # still filling the buffer
+        # Drop what can no longer be drawn; ticks[i - 1] is still needed
+        for old in ticks[:i - 1]:
+            del self._entities[old]
+        del ticks[:i - 1]
+        if len(ticks) == 1:
+            if at > ticks[0]:
+                self.underruns += 1
+            return self._entities[ticks[0]]
+
+        older, newer = self._entities[ticks[0]], self._entities[ticks[1]]
+        alpha = (at - ticks[0]) / (ticks[1] - ticks[0])
+        lerp_fields = self.lerp_fields
+        states = {}
+        for entity_id, after in newer.items():
+            before = older.get(entity_id)
+            if before is None:
+                continue  # added by the newer snapshot; shown once it is reached
+            state = dict(before)
+            for name in lerp_fields:
+                a = before[name]
+                state[name] = a + (after[name] - a) * alpha
+            states[entity_id] = state
+        return states
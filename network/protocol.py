@@ -0,0 +1,846 @@
+# network/protocol.py
+"""Wire-level framing and message codecs shared by the network clients."""
+import json
+import struct
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # optional accelerator; _pack/_unpack speak the same format
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional; "zstd" compression is only offered when installed
+    zstandard = None
+
+
+class ProtocolError(Exception):
+    """Raised when the byte stream from the server cannot be framed or decoded."""
+
+
+class _FrameBuffer:
+    """Growable receive buffer filled in place with ``recv_into``.
+
+    Consumed bytes are reclaimed by sliding the unread tail to the front
+    only when the buffer runs out of room, so steady-state reads never
+    allocate.
+    """
+
+    def __init__(self, chunk_size=4096, max_frame_size=1 << 20):
+        self.chunk_size = chunk_size
+        self.max_frame_size = max_frame_size
+        self._buf = bytearray(chunk_size)
+        self._view = memoryview(self._buf)
+        self._start = 0  # first unconsumed byte
+        self._scan = 0   # where the next frame search begins
+        self._end = 0    # one past the last filled byte
+
+    # ---------------- Filling ----------------
+    def recv_into(self, sock):
+        """Read once from ``sock`` into the buffer; returns 0 on EOF."""
+        self._reserve(self.chunk_size)
+        n = sock.recv_into(self._view[self._end:], self.chunk_size)
+        self._end += n
+        return n
+
+    def feed(self, data):
+        """Append already-received bytes (used by non-socket transports)."""
+        n = len(data)
+        self._reserve(n)
+        self._buf[self._end:self._end + n] = data
+        self._end += n
+
+    def take_buffered(self):
+        """Remove and return every unconsumed byte, e.g. to hand over to another framer."""
+        data = bytes(self._view[self._start:self._end])
+        self._start = self._scan = self._end = 0
+        return data
+
+    def _reserve(self, n):
+        if len(self._buf) - self._end >= n:
+            return
+        pending = self._end - self._start
+        if self._start:
+            # Same-size slice assignment does not resize, so the exported
+            # memoryview stays valid. The source may overlap the destination,
+            # so it is copied out first.
+            self._buf[:pending] = bytes(self._view[self._start:self._end])
+            self._scan -= self._start
+            self._start, self._end = 0, pending
+        if len(self._buf) - self._end < n:
+            if pending > self.max_frame_size:
+                raise ProtocolError(f"frame exceeds {self.max_frame_size} bytes")
+            self._view.release()
+            self._buf.extend(bytes(max(len(self._buf), n)))
+            self._view = memoryview(self._buf)
+
+    def _reset_if_empty(self):
+        if self._start == self._end:
+            self._start = self._scan = self._end = 0
+
+    @property
+    def buffered(self):
+        """Number of received bytes not yet returned as frames."""
+        return self._end - self._start
+
+
+class LineFramer(_FrameBuffer):
+    """Incremental decoder for newline-delimited frames.
+
+    The delimiter search resumes from the offset where the previous scan
+    stopped, so every byte is looked at once no matter how many frames
+    arrive in a burst. Frames are decoded to ``str`` only once complete, so
+    a multi-byte UTF-8 character split across two reads is never decoded
+    half-way.
+    """
+
+    def __init__(self, chunk_size=4096, max_frame_size=1 << 20, delimiter=b"\n"):
+        super().__init__(chunk_size, max_frame_size)
+        self.delimiter = delimiter
+
+    # ---------------- Framing ----------------
+    def next_frame(self):
+        """Return the next complete frame as ``str``, or None if there is none yet.
+
+        A frame that is not valid UTF-8 is consumed before the
+        ``UnicodeDecodeError`` propagates, so the caller can log it and keep
+        reading.
+        """
+        idx = self._buf.find(self.delimiter, self._scan, self._end)
+        if idx < 0:
+            self._scan = self._end
+            self._reset_if_empty()
+            return None
+        start = self._start
+        self._start = self._scan = idx + len(self.delimiter)
+        return str(self._view[start:idx], "utf-8")
+
+    def drain(self):
+        """Return every complete frame currently buffered as a list of ``str``.
+
+        All complete frames are decoded and split in one pass; if that batch
+        is not valid UTF-8 it falls back to ``next_frame`` so only the bad
+        frame is lost.
+        """
+        last = self._buf.rfind(self.delimiter, self._scan, self._end)
+        if last < 0:
+            self.next_frame()  # resets or advances the scan offset
+            return []
+        try:
+            text = str(self._view[self._start:last], "utf-8")
+        except UnicodeDecodeError:
+            frames = []
+            while True:
+                try:
+                    frame = self.next_frame()
+                except UnicodeDecodeError:
+                    continue
+                if frame is None:
+                    return frames
+                frames.append(frame)
+        self._start = self._scan = last + len(self.delimiter)
+        return text.split(self.delimiter.decode("utf-8"))
+
+    def __iter__(self):
+        return iter(self.drain())
+
+
+class LengthPrefixFramer(_FrameBuffer):
+    """Decoder for frames prefixed with a 4-byte big-endian payload length."""
+
+    HEADER = struct.Struct("!I")
+
+    def next_frame(self):
+        """Return the next complete payload as ``bytes``, or None if there is none yet."""
+        avail = self._end - self._start
+        if avail < 4:
+            self._reset_if_empty()
+            return None
+        (length,) = self.HEADER.unpack_from(self._buf, self._start)
+        if length > self.max_frame_size:
+            raise ProtocolError(f"frame of {length} bytes exceeds {self.max_frame_size}")
+        if avail < 4 + length:
+            self._reserve(4 + length - avail)
+            return None
+        start = self._start + 4
+        self._start = self._scan = start + length
+        return bytes(self._view[start:self._start])
+
+    def drain(self):
+        """Return every complete payload currently buffered."""
+        frames = []
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return frames
+            frames.append(frame)
+
+    def __iter__(self):
+        return iter(self.drain())
+
+
+# ---------------- msgpack-format packing ----------------
+# A pure-Python subset of the msgpack format (nil, bool, int, float, str,
+# bin, array, map), used when the ``msgpack`` package is not installed. Both
+# produce the same bytes, so either side may run with or without it.
+_B = struct.Struct("!B")
+_H = struct.Struct("!H")
+_I = struct.Struct("!I")
+_INT = {1: (0xd0, struct.Struct("!b")), 2: (0xd1, struct.Struct("!h")),
+        4: (0xd2, struct.Struct("!i")), 8: (0xd3, struct.Struct("!q"))}
+_UINT = {1: (0xcc, _B), 2: (0xcd, _H), 4: (0xce, _I), 8: (0xcf, struct.Struct("!Q"))}
+_INT_BY_TAG = {tag: st for table in (_INT, _UINT) for tag, st in table.values()}
+_DOUBLE = struct.Struct("!d")
+
+
+def _pack_len(out, n, fix_base, fix_max, tags):
+    if n <= fix_max:
+        out.append(fix_base | n)
+    elif n < 0x100 and tags[0] is not None:
+        out.append(tags[0])
+        out.append(n)
+    elif n < 0x10000:
+        out.append(tags[1])
+        out += _H.pack(n)
+    else:
+        out.append(tags[2])
+        out += _I.pack(n)
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xff)
+        else:
+            table = _UINT if obj > 0 else _INT
+            for size in (1, 2, 4, 8):
+                tag, st = table[size]
+                try:
+                    packed = st.pack(obj)
+                except struct.error:
+                    continue
+                out.append(tag)
+                out += packed
+                break
+            else:
+                raise ProtocolError(f"integer out of range: {obj}")
+    elif isinstance(obj, float):
+        out.append(0xcb)
+        out += _DOUBLE.pack(obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        _pack_len(out, len(data), 0xa0, 31, (0xd9, 0xda, 0xdb))
+        out += data
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        _pack_len(out, len(data), 0, -1, (0xc4, 0xc5, 0xc6))
+        out += data
+    elif isinstance(obj, (list, tuple)):
+        _pack_len(out, len(obj), 0x90, 15, (None, 0xdc, 0xdd))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        _pack_len(out, len(obj), 0x80, 15, (None, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise ProtocolError(f"cannot encode {type(obj).__name__}")
+
+
+def _unpack(buf, pos):
+    tag = buf[pos]
+    pos += 1
+    if tag < 0x80:
+        return tag, pos
+    if tag >= 0xe0:
+        return tag - 0x100, pos
+    if 0xa0 <= tag <= 0xbf:
+        end = pos + (tag & 0x1f)
+        return str(buf[pos:end], "utf-8"), end
+    if 0x90 <= tag <= 0x9f:
+        return _unpack_array(buf, pos, tag & 0x0f)
+    if 0x80 <= tag <= 0x8f:
+        return _unpack_map(buf, pos, tag & 0x0f)
+    if tag == 0xc0:
+        return None, pos
+    if tag == 0xc2:
+        return False, pos
+    if tag == 0xc3:
+        return True, pos
+    if tag == 0xcb:
+        return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+    int_struct = _INT_BY_TAG.get(tag)
+    if int_struct is not None:
+        return int_struct.unpack_from(buf, pos)[0], pos + int_struct.size
+    if tag in (0xd9, 0xda, 0xdb, 0xc4, 0xc5, 0xc6, 0xdc, 0xdd, 0xde, 0xdf):
+        if tag in (0xd9, 0xc4):
+            n, pos = buf[pos], pos + 1
+        elif tag in (0xda, 0xc5, 0xdc, 0xde):
+            n, pos = _H.unpack_from(buf, pos)[0], pos + 2
+        else:
+            n, pos = _I.unpack_from(buf, pos)[0], pos + 4
+        if tag in (0xd9, 0xda, 0xdb):
+            return str(buf[pos:pos + n], "utf-8"), pos + n
+        if tag in (0xc4, 0xc5, 0xc6):
+            return bytes(buf[pos:pos + n]), pos + n
+        if tag in (0xdc, 0xdd):
+            return _unpack_array(buf, pos, n)
+        return _unpack_map(buf, pos, n)
+    raise ProtocolError(f"unsupported msgpack tag 0x{tag:02x}")
+
+
+def _unpack_array(buf, pos, n):
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(buf, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(buf, pos, n):
+    result = {}
+    for _ in range(n):
+        key, pos = _unpack(buf, pos)
+        result[key], pos = _unpack(buf, pos)
+    return result, pos
+
+
+def packb(obj):
+    """Serialize ``obj`` to msgpack bytes."""
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def unpackb(data):
+    """Deserialize one msgpack value from ``data``."""
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    view = memoryview(data)
+    obj, pos = _unpack(view, 0)
+    if pos != len(view):
+        raise ProtocolError("trailing bytes after msgpack value")
+    return obj
+
+
+# ---------------- Hot-action schemas ----------------
+class StructSchema:
+    """Fixed ``struct`` layout for a high-frequency action.
+
+    A message ``{"action": action, "data": {...}}`` whose data keys are
+    exactly ``fields`` is sent as a schema id plus packed values instead of
+    a generic map. Float fields are sent as 32-bit floats.
+    """
+
+    __slots__ = ("schema_id", "action", "fields", "field_set", "struct")
+
+    def __init__(self, schema_id, action, fields, fmt):
+        self.schema_id = schema_id
+        self.action = action
+        self.fields = tuple(fields)
+        self.field_set = frozenset(fields)
+        # length prefix, frame kind, schema id, then the values
+        self.struct = struct.Struct("!IBB" + fmt)
+
+
+FRAME_GENERIC = 0
+FRAME_STRUCT = 1
+FRAME_SNAPSHOT = 2
+
+HOT_SCHEMAS = (
+    StructSchema(1, "move", ("x", "y"), "ff"),
+    StructSchema(2, "stat_update", ("id", "hp", "mp"), "Iii"),
+)
+
+
+# ---------------- Entity snapshots ----------------
+class SnapshotField:
+    """One quantized entity field: ``value * scale`` rounded and packed as ``fmt``.
+
+    ``wrap`` fields (angles) are taken modulo the format's range instead
+    of overflowing; ``lerp`` fields are interpolated between snapshots.
+    """
+
+    __slots__ = ("name", "fmt", "scale", "wrap", "lerp")
+
+    def __init__(self, name, fmt, scale=1, wrap=False, lerp=False):
+        self.name = name
+        self.fmt = fmt
+        self.scale = scale
+        self.wrap = wrap
+        self.lerp = lerp
+
+
+SNAPSHOT_FIELDS = (
+    SnapshotField("x", "i", 16, lerp=True),  # world units, 1/16 precision
+    SnapshotField("y", "i", 16, lerp=True),
+    SnapshotField("facing", "B", 256 / 360, wrap=True),  # degrees in 256 steps
+    SnapshotField("hp", "H"),
+    SnapshotField("mp", "H"),
+    SnapshotField("anim", "B"),
+)
+
+_SNAPSHOT_HEADER = struct.Struct("!IIH")  # tick, baseline tick (0: none), entity records
+_ENTITY_HEADER = struct.Struct("!IB")  # entity id, bitmask of the fields that follow
+ENTITY_REMOVED = 0x80  # mask bit: the entity is gone since the baseline
+
+
+class _SnapshotLayout:
+    """Quantizing and per-bitmask ``struct`` layouts shared by the encoder and decoder."""
+
+    def __init__(self, fields):
+        if len(fields) > 7:
+            raise ValueError("at most 7 snapshot fields fit the bitmask")
+        self.fields = tuple(fields)
+        self.full_mask = (1 << len(fields)) - 1
+        self._structs = {}  # mask -> (struct of the masked fields, their indexes)
+
+    def layout(self, mask):
+        layout = self._structs.get(mask)
+        if layout is None:
+            indexes = tuple(i for i in range(len(self.fields)) if mask & (1 << i))
+            layout = self._structs[mask] = (
+                struct.Struct("!" + "".join(self.fields[i].fmt for i in indexes)), indexes)
+        return layout
+
+    def quantize(self, state):
+        values = []
+        for field in self.fields:
+            value = round(state.get(field.name, 0) * field.scale)
+            if field.wrap:
+                value %= 1 << (8 * struct.calcsize(field.fmt))
+            values.append(value)
+        return tuple(values)
+
+    def dequantize(self, values):
+        return {field.name: value / field.scale if field.scale != 1 else value
+                for field, value in zip(self.fields, values)}
+
+
+class SnapshotEncoder:
+    """Server side of entity snapshots, one per connection.
+
+    ``encode(tick, entities)`` sends, per entity, only the quantized fields
+    that differ from the last snapshot the client acknowledged (``ack``);
+    entities missing from that baseline are sent in full, and entities
+    that disappeared are sent as a bare ``ENTITY_REMOVED`` record. Until
+    the first ack, or once the acked snapshot has dropped out of the last
+    ``history`` sent, every entity is sent in full.
+    """
+
+    def __init__(self, fields=SNAPSHOT_FIELDS, history=32):
+        self._layout = _SnapshotLayout(fields)
+        self.history = history
+        self.acked = 0
+        self._sent = {}  # tick -> {entity id: quantized values}, oldest first
+
+    def ack(self, tick):
+        if tick > self.acked and tick in self._sent:
+            self.acked = tick
+            for old in [t for t in self._sent if t < tick]:
+                del self._sent[old]
+
+    def encode(self, tick, entities):
+        """Snapshot body for ``entities`` ({id: {field: value}}) at ``tick`` (> 0)."""
+        layout = self._layout
+        baseline = self._sent.get(self.acked)
+        base_tick = self.acked if baseline is not None else 0
+        baseline = baseline or {}
+        current = {}
+        parts = []
+        count = 0
+        try:
+            for entity_id, state in entities.items():
+                values = current[entity_id] = layout.quantize(state)
+                old = baseline.get(entity_id)
+                if old is None:
+                    mask = layout.full_mask
+                else:
+                    mask = 0
+                    for i, value in enumerate(values):
+                        if value != old[i]:
+                            mask |= 1 << i
+                    if not mask:
+                        continue
+                fields, indexes = layout.layout(mask)
+                parts.append(_ENTITY_HEADER.pack(entity_id, mask))
+                parts.append(fields.pack(*[values[i] for i in indexes]))
+                count += 1
+        except struct.error as e:
+            raise ProtocolError(f"entity {entity_id} does not fit the snapshot fields: {e}") from None
+        for entity_id in baseline:
+            if entity_id not in current:
+                parts.append(_ENTITY_HEADER.pack(entity_id, ENTITY_REMOVED))
+                count += 1
+
+        self._sent[tick] = current
+        while len(self._sent) > self.history:
+            del self._sent[next(iter(self._sent))]
+        return _SNAPSHOT_HEADER.pack(tick, base_tick, count) + b"".join(parts)
+
+
+class SnapshotDecoder:
+    """Client side of entity snapshots: rebuilds each full snapshot from its baseline.
+
+    Keeps the last ``history`` snapshots received, which covers every
+    baseline an encoder with the same ``history`` can refer to.
+    """
+
+    def __init__(self, fields=SNAPSHOT_FIELDS, history=32):
+        self._layout = _SnapshotLayout(fields)
+        self.history = history
+        self._received = {}  # tick -> {entity id: quantized values}, oldest first
+
+    def decode(self, body):
+        """``{"action": "snapshot", "tick": ..., "entities": {id: {field: value}}}``."""
+        layout = self._layout
+        tick, base_tick, count = _SNAPSHOT_HEADER.unpack_from(body, 0)
+        if base_tick:
+            baseline = self._received.get(base_tick)
+            if baseline is None:
+                raise ProtocolError(f"snapshot {tick} refers to unknown baseline {base_tick}")
+            current = dict(baseline)
+        else:
+            current = {}
+        pos = _SNAPSHOT_HEADER.size
+        for _ in range(count):
+            entity_id, mask = _ENTITY_HEADER.unpack_from(body, pos)
+            pos += _ENTITY_HEADER.size
+            if mask & ENTITY_REMOVED:
+                current.pop(entity_id, None)
+                continue
+            fields, indexes = layout.layout(mask)
+            values = fields.unpack_from(body, pos)
+            pos += fields.size
+            if mask == layout.full_mask:
+                current[entity_id] = values
+            else:
+                old = current.get(entity_id)
+                if old is None:
+                    raise ProtocolError(f"partial update for unknown entity {entity_id}")
+                merged = list(old)
+                for i, value in zip(indexes, values):
+                    merged[i] = value
+                current[entity_id] = tuple(merged)
+
+        self._received[tick] = current
+        while len(self._received) > self.history:
+            del self._received[next(iter(self._received))]
+        return {"action": "snapshot", "tick": tick,
+                "entities": {entity_id: layout.dequantize(values) for entity_id, values in current.items()}}
+
+
+# ---------------- Codecs ----------------
+class JsonLineCodec:
+    """Newline-delimited JSON text; the fallback every server understands."""
+
+    name = "json"
+
+    def new_framer(self):
+        return LineFramer()
+
+    def encode(self, message):
+        """Frame a message dict, or already-serialized JSON text."""
+        if isinstance(message, str):
+            return (message + "\n").encode("utf-8")
+        return (json.dumps(message) + "\n").encode("utf-8")
+
+    def decode(self, frame):
+        """Parse one frame; blank keep-alive lines decode to None."""
+        if not frame.strip():
+            return None
+        return json.loads(frame)
+
+
+class MsgpackCodec:
+    """Length-prefixed msgpack frames with ``struct`` fast paths for hot actions.
+
+    Also carries entity snapshot frames (``encode_snapshot``), which decode
+    to ``snapshot`` messages against this connection's earlier snapshots.
+    """
+
+    name = "msgpack"
+    _GENERIC_HEADER = struct.Struct("!IB")
+
+    def __init__(self, schemas=HOT_SCHEMAS):
+        self.schemas_by_action = {s.action: s for s in schemas}
+        self.schemas_by_id = {s.schema_id: s for s in schemas}
+        self.snapshots = SnapshotDecoder()
+
+    def new_framer(self):
+        return LengthPrefixFramer()
+
+    def encode(self, message):
+        if isinstance(message, str):
+            message = json.loads(message)
+        schema = self.schemas_by_action.get(message.get("action"))
+        if schema is not None and len(message) == 2:
+            data = message.get("data")
+            if type(data) is dict and data.keys() == schema.field_set:
+                try:
+                    return schema.struct.pack(
+                        schema.struct.size - 4, FRAME_STRUCT, schema.schema_id,
+                        *[data[f] for f in schema.fields])
+                except struct.error:
+                    pass  # value out of range for the schema; send it generically
+        body = packb(message)
+        return self._GENERIC_HEADER.pack(len(body) + 1, FRAME_GENERIC) + body
+
+    def encode_snapshot(self, body):
+        """Frame a ``SnapshotEncoder.encode`` body."""
+        return self._GENERIC_HEADER.pack(len(body) + 1, FRAME_SNAPSHOT) + body
+
+    def decode(self, frame):
+        kind = frame[0]
+        if kind == FRAME_GENERIC:
+            return unpackb(frame[1:])
+        if kind == FRAME_STRUCT:
+            schema = self.schemas_by_id.get(frame[1])
+            if schema is None:
+                raise ProtocolError(f"unknown schema id {frame[1]}")
+            values = schema.struct.unpack(b"\0\0\0\0" + frame)[3:]
+            return {"action": schema.action, "data": dict(zip(schema.fields, values))}
+        if kind == FRAME_SNAPSHOT:
+            return self.snapshots.decode(memoryview(frame)[1:])
+        raise ProtocolError(f"unknown frame kind {kind}")
+
+
+CODECS = {
+    MsgpackCodec.name: MsgpackCodec,
+    JsonLineCodec.name: JsonLineCodec,
+}
+
+# ---------------- Stream compression ----------------
+# Preset dictionary for both compressors: the keys and values every session
+# repeats, so even the first small batch compresses. Changing it changes
+# the wire format; both sides must use the same bytes.
+COMPRESSION_DICTIONARY = json.dumps([
+    {"action": "character_list", "user": {"id": 0, "username": ""}, "session_token": "", "characters": [
+        {"id": 0, "name": "", "stats": {"Level": 0, "HP": 0, "MP": 0, "guild": None}}]},
+    {"action": "character_created", "character": {"id": 0, "name": "", "stats": {"Level": 1}}},
+    {"action": "state_delta", "version": 0, "base": 0, "add": [], "update": [], "remove": []},
+    {"action": "stat_update", "data": {"id": 0, "hp": 0, "mp": 0}},
+    {"action": "snapshot_ack", "tick": 0, "req_id": 0},
+    {"action": "delete_character", "data": {"char_id": 0}},
+    {"action": "create_character", "data": {"name": ""}},
+    {"action": "login", "data": {"username": "", "password": ""}},
+    {"action": "login_failed", "reason": ""},
+    {"action": "move", "data": {"x": 0.0, "y": 0.0}},
+]).encode("utf-8")
+
+_CHUNK_HEADER = struct.Struct("!I")  # chunk length, top bit set if the chunk is compressed
+CHUNK_COMPRESSED = 0x80000000
+
+
+class _CompressedStream:
+    """Both directions of one connection's compression.
+
+    Outgoing data is written in chunks, one per batch the writer flushes
+    (``wrap``). A batch shorter than ``threshold`` bytes is sent raw;
+    anything longer goes through the persistent compressor and is
+    flushed to a byte boundary, so the peer can decode the chunk as soon
+    as it arrives while later chunks keep referring back to earlier ones.
+    ``decompress(data, max_length)`` raises ProtocolError rather than
+    expand one chunk past ``max_length`` bytes.
+    """
+
+    name = None
+
+    def __init__(self, threshold=32):
+        self.threshold = threshold
+        self.bytes_in = 0  # before compression
+        self.bytes_out = 0  # on the wire, chunk headers included
+        self.chunks_compressed = 0
+        self.chunks_raw = 0
+
+    def wrap(self, data):
+        """Chunk ``data`` for the wire, compressed if it is at least ``threshold`` bytes."""
+        self.bytes_in += len(data)
+        if len(data) < self.threshold:
+            self.chunks_raw += 1
+            chunk = _CHUNK_HEADER.pack(len(data)) + data
+        else:
+            # Once compressed it must be sent: the compressor now refers back to it
+            body = self.compress(data)
+            self.chunks_compressed += 1
+            chunk = _CHUNK_HEADER.pack(len(body) | CHUNK_COMPRESSED) + body
+        self.bytes_out += len(chunk)
+        return chunk
+
+    @property
+    def ratio(self):
+        """Wire bytes per byte written, so far (1.0: no saving)."""
+        return self.bytes_out / self.bytes_in if self.bytes_in else 1.0
+
+
+class ZlibStream(_CompressedStream):
+    name = "zlib"
+
+    def __init__(self, threshold=32, level=6):
+        super().__init__(threshold)
+        self._compressor = zlib.compressobj(level, zdict=COMPRESSION_DICTIONARY)
+        self._decompressor = zlib.decompressobj(zdict=COMPRESSION_DICTIONARY)
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def decompress(self, data, max_length):
+        out = self._decompressor.decompress(data, max_length + 1)
+        if len(out) > max_length:
+            raise _expands_past(max_length)
+        return out
+
+
+class ZstdStream(_CompressedStream):
+    """zstd with COMPRESSION_DICTIONARY as a raw-content dictionary; needs ``zstandard``."""
+
+    name = "zstd"
+    # zstd takes no output limit; one block (4 bytes in at least) expands to 128 KB at most,
+    # so longer chunks are fed in slices this big and the output checked after each
+    DECOMPRESS_SLICE = 128
+
+    def __init__(self, threshold=32, level=3):
+        super().__init__(threshold)
+        dictionary = zstandard.ZstdCompressionDict(COMPRESSION_DICTIONARY,
+                                                   dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+        self._compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary).compressobj()
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=dictionary).decompressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def decompress(self, data, max_length):
+        decompress = self._decompressor.decompress
+        step = self.DECOMPRESS_SLICE
+        if len(data) <= step:
+            out = decompress(data)
+        else:
+            parts, size = [], 0
+            for i in range(0, len(data), step):
+                part = decompress(data[i:i + step])
+                size += len(part)
+                if size > max_length:
+                    raise _expands_past(max_length)
+                parts.append(part)
+            out = b"".join(parts)
+        if len(out) > max_length:
+            raise _expands_past(max_length)
+        return out
+
+
+def _expands_past(max_length):
+    return ProtocolError(f"compressed chunk expands past {max_length} bytes")
+
+
+COMPRESSORS = {ZlibStream.name: ZlibStream}
+if zstandard is not None:
+    COMPRESSORS = {ZstdStream.name: ZstdStream, **COMPRESSORS}
+
+
+def get_compression(name, threshold=32):
+    try:
+        return COMPRESSORS[name](threshold)
+    except KeyError:
+        raise ProtocolError(f"unknown compression {name!r}") from None
+
+
+class CompressedFramer(_FrameBuffer):
+    """Unwraps the chunks a ``_CompressedStream`` wrote and frames their content with ``inner``.
+
+    Drop-in for the codec's framer in the receive loop: ``recv_into`` and
+    ``feed`` take wire bytes; ``next_frame``/``drain`` return ``inner``'s
+    frames. Chunks are unwrapped one at a time as frames are asked for, so
+    a burst of large but well-compressed frames is never all inflated
+    into ``inner`` at once, and ``max_frame_size`` bounds each frame
+    rather than the whole burst.
+    """
+
+    def __init__(self, inner, stream, chunk_size=4096, max_frame_size=1 << 20):
+        super().__init__(chunk_size, max_frame_size)
+        self.inner = inner
+        self.stream = stream
+
+    def _unwrap_chunk(self):
+        """Feed the next complete chunk's content to ``inner``; False if none is buffered yet."""
+        avail = self._end - self._start
+        if avail < 4:
+            self._reset_if_empty()
+            return False
+        (header,) = _CHUNK_HEADER.unpack_from(self._buf, self._start)
+        length = header & ~CHUNK_COMPRESSED
+        if length > self.max_frame_size:
+            raise ProtocolError(f"chunk of {length} bytes exceeds {self.max_frame_size}")
+        if avail < 4 + length:
+            self._reserve(4 + length - avail)
+            return False
+        start = self._start + 4
+        self._start = self._scan = start + length
+        with self._view[start:self._start] as chunk:  # released, so the buffer may grow
+            # A compressed chunk may not expand past max_frame_size either
+            self.inner.feed(self.stream.decompress(chunk, self.max_frame_size)
+                            if header & CHUNK_COMPRESSED else chunk)
+        self._reset_if_empty()
+        return True
+
+    def next_frame(self):
+        while True:
+            frame = self.inner.next_frame()
+            if frame is not None or not self._unwrap_chunk():
+                return frame
+
+    def drain(self):
+        frames = self.inner.drain()
+        while self._unwrap_chunk():
+            frames.extend(self.inner.drain())
+        return frames
+
+    def __iter__(self):
+        return iter(self.drain())
+
+
+# ---------------- Handshake ----------------
+HELLO_ACTION = "hello"
+HELLO_OK_ACTION = "hello_ok"
+
+
+def get_codec(name):
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise ProtocolError(f"unknown codec {name!r}") from None
+
+
+def hello_message(codecs, compression=()):
+    """Handshake request offering ``codecs`` (and ``compression``) in order of preference."""
+    data = {"codecs": list(codecs)}
+    if compression:
+        data["compression"] = list(compression)
+    return {"action": HELLO_ACTION, "data": data}
+
+
+def choose_codec(offered, supported=CODECS):
+    """Pick the first offered codec that is also supported; JSON lines otherwise."""
+    for name in offered:
+        if name in supported:
+            return name
+    return JsonLineCodec.name
+
+
+def choose_compression(offered, supported=COMPRESSORS):
+    """Pick the first offered compression that is also supported; None for raw frames."""
+    for name in offered:
+        if name in supported:
+            return name
+    return None
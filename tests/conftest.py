@@ -0,0 +1,143 @@
+# conftest.py
+import socket
+import threading
+import time
+
+import pytest
+
+from network.protocol import (
+    CODECS, HELLO_ACTION, HELLO_OK_ACTION, CompressedFramer, JsonLineCodec, choose_codec,
+    choose_compression, get_codec, get_compression,
+)
+
+
+def echo_handler(message):
+    """Reply to every message with itself."""
+    return [message]
+
+
+class StandInServer:
+    """Local TCP server speaking the client's wire protocol.
+
+    ``handler(message)`` returns the list of replies to send back (message
+    dicts, or ``bytes`` already framed for the negotiated codec). Set
+    ``codecs`` to the codec names this server accepts in a ``hello``; an
+    empty tuple makes it behave like a server that predates the handshake.
+    ``compression`` lists the stream compressions it accepts (none by
+    default); each connection's stream is kept in ``streams``.
+    With ``drop_every=n`` the server turns flaky and cuts the connection
+    after every n-th message it receives; ``accept_delay`` makes it wait
+    that many seconds before accepting each connection.
+    """
+
+    def __init__(self, handler=echo_handler, codecs=tuple(CODECS), drop_every=None, compression=(),
+                 accept_delay=0):
+        self.handler = handler
+        self.accept_delay = accept_delay
+        self.codecs = codecs
+        self.compression = compression
+        self.streams = []
+        self.drop_every = drop_every
+        self.received = []
+        self.connections = []
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self.host, self.port = self._sock.getsockname()[:2]
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while self._running:
+            time.sleep(self.accept_delay)
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        codec = JsonLineCodec()
+        framer = codec.new_framer()
+        stream = None
+        try:
+            while framer.recv_into(conn):
+                while True:
+                    frame = framer.next_frame()
+                    if frame is None:
+                        break
+                    message = codec.decode(frame)
+                    if message is None:
+                        continue
+                    if message.get("action") == HELLO_ACTION and self.codecs:
+                        name = choose_codec(message["data"]["codecs"], self.codecs)
+                        compression = choose_compression(message["data"].get("compression", ()), self.compression)
+                        reply = {"action": HELLO_OK_ACTION, "codec": name}
+                        if compression:
+                            reply["compression"] = compression
+                        conn.sendall(codec.encode(reply))
+                        leftover = framer.take_buffered()
+                        codec = get_codec(name)
+                        framer = codec.new_framer()
+                        if compression:
+                            stream = get_compression(compression)
+                            self.streams.append(stream)
+                            framer = CompressedFramer(framer, stream)
+                        framer.feed(leftover)
+                        continue
+                    self.received.append(message)
+                    replies = self.handler(message)
+                    if replies:
+                        data = b"".join(r if isinstance(r, bytes) else codec.encode(r) for r in replies)
+                        conn.sendall(stream.wrap(data) if stream else data)
+                    if self.drop_every and len(self.received) % self.drop_every == 0:
+                        conn.shutdown(socket.SHUT_RDWR)
+                        return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def drop_connections(self):
+        """Abruptly close every accepted connection."""
+        for conn in self.connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+        self.connections.clear()
+
+    def stop(self):
+        self._running = False
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)  # wakes the blocked accept; close alone keeps listening
+        except OSError:
+            pass
+        self._sock.close()
+        self.drop_connections()
+
+
+@pytest.fixture
+def stand_in_server():
+    """Factory fixture: ``stand_in_server(handler=..., codecs=...)``."""
+    servers = []
+
+    def start(**kwargs):
+        server = StandInServer(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def stalled_listener():
+    """Address of a listener that never accepts and whose backlog is full,
+    so connecting to it hangs until the client gives up."""
+    server = socket.create_server(("127.0.0.1", 0), backlog=0)
+    filler = socket.create_connection(server.getsockname())
+    yield server.getsockname()
+    filler.close()
+    server.close()
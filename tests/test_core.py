@@ -0,0 +1,147 @@
+# test_core.py
+import io
+import logging
+
+from core.utils import RedactingFormatter, get_logger, setup_logging, shutdown_logging
+
+
+# ---------------- Logging ----------------
+class _CountingRepr:
+    calls = 0
+
+    def __repr__(self):
+        _CountingRepr.calls += 1
+        return "counted"
+
+    __str__ = __repr__
+
+
+def test_disabled_debug_never_formats_arguments():
+    setup_logging({"network": "INFO"}, stream=io.StringIO())
+    try:
+        log = get_logger("network")
+        for _ in range(1000):
+            log.debug("Server: %s", _CountingRepr())
+        assert _CountingRepr.calls == 0
+    finally:
+        shutdown_logging()
+
+
+def test_listener_writes_per_subsystem_levels_and_redacts():
+    out = io.StringIO()
+    setup_logging({"network": "DEBUG", "ui": "WARNING"}, stream=out)
+    try:
+        get_logger("network").debug("Server: %s",
+                                    {"action": "login", "data": {"username": "bob", "password": "hunter22"}})
+        get_logger("network").info("resume token=abc123 accepted")
+        get_logger("ui").info("hidden at WARNING")
+    finally:
+        shutdown_logging()  # flushes the queue
+    text = out.getvalue()
+    assert "[otherworldly.network]" in text
+    assert "'username': 'bob'" in text
+    assert "hunter22" not in text and "'password': '***'" in text
+    assert "abc123" not in text and "token=***" in text
+    assert "hidden at WARNING" not in text
+
+
+def test_logged_arguments_are_captured_when_logging():
+    out = io.StringIO()
+    setup_logging({"network": "DEBUG"}, stream=out)
+    try:
+        message = {"action": "snapshot", "tick": 1}
+        get_logger("network").debug("Server: %s", message)
+        message["received_at"] = 12.5  # changed right after, as GameClient does
+    finally:
+        shutdown_logging()
+    assert "'tick': 1}" in out.getvalue() and "received_at" not in out.getvalue()
+
+
+def test_redacting_formatter_handles_json_text():
+    record = logging.LogRecord("x", logging.INFO, __file__, 1,
+                               '{"password": "pw123456", "session_token": "t0k"}', None, None)
+    formatted = RedactingFormatter("%(message)s").format(record)
+    assert formatted == '{"password": "***", "session_token": "***"}'
+
+    cases = {
+        str({"password": "abc def", "user": "bob"}): "{'password': '***', 'user': 'bob'}",
+        str({"password": "a,b"}): "{'password': '***'}",
+        str({"password": "p'q"}): "{'password': \"***\"}",
+        str({"password": "it's \"quoted\""}): "{'password': '***'}",
+        '{"token": "x\\"y, z"}': '{"token": "***"}',
+        "password=hunter 2": "password=***",
+        "resume token=abc123, ok": "resume token=***, ok",
+    }
+    for message, expected in cases.items():
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, message, None, None)
+        assert RedactingFormatter("%(message)s").format(record) == expected
+
+
+# ---------------- Game state ----------------
+SNAPSHOT = {
+    "action": "character_list", "version": 3,
+    "user": {"id": 7, "username": "tester"},
+    "characters": [
+        {"id": 1, "name": "Hero", "stats": {"Level": 5, "HP": 100, "guild": None}},
+        {"id": 2, "name": "Mage", "stats": {"Level": 2, "HP": 60}},
+    ],
+}
+
+
+def test_snapshot_reload_keeps_records_and_reports_only_changes():
+    from core.game_state import GameState
+    state = GameState()
+    changes = []
+    state.subscribe(changes.append)
+    state.load(SNAPSHOT)
+    assert changes[0].added == [1, 2] and changes[0].user == ("id", "username")
+    hero = state.characters[1]
+    assert hero.stats.get("Level") == 5 and hero.stats.get("hp") == 100 and hero.stats.get("guild", 0) is None
+
+    reloaded = dict(SNAPSHOT, version=4, characters=[
+        {"id": 1, "name": "Hero", "stats": {"Level": 6, "HP": 100, "guild": None}},
+        {"id": 3, "name": "Rogue", "stats": {}},
+    ])
+    state.load(reloaded)
+    change = changes[1]
+    assert (change.added, change.updated, change.removed, change.user) == ([3], {1: ("level",)}, [2], ())
+    assert state.characters[1] is hero and list(state.characters) == [1, 3]
+    assert state.snapshot() == {"version": 4, "user": {"id": 7, "username": "tester"},
+                                "characters": reloaded["characters"]}
+    state.load(reloaded)
+    assert len(changes) == 2  # nothing changed, nobody is told
+
+
+def test_deltas_apply_in_version_order_and_gaps_wait_for_a_snapshot():
+    from core.game_state import GameState
+    state = GameState.from_snapshot(SNAPSHOT)
+    change = state.apply({"version": 4, "add": [{"id": 5, "name": "Bard", "stats": {"Level": 1}}],
+                          "update": [{"id": 2, "name": "Archmage", "stats": {"mp": 90}}], "remove": [1]})
+    assert (change.added, change.updated, change.removed) == ([5], {2: ("name", "mp")}, [1])
+    assert [c.name for c in state.character_list()] == ["Archmage", "Bard"]
+
+    assert state.apply({"version": 4, "remove": [2]}) is None  # duplicate
+    assert state.apply({"version": 6, "base": 5, "remove": [2]}) is None  # version 5 was missed
+    assert state.out_of_sync and 2 in state.characters and state.ignored == 2
+    state.load(dict(SNAPSHOT, version=6))
+    assert not state.out_of_sync and state.version == 6
+    assert state.remove_character(1).removed == [1]  # unversioned local change
+    assert state.version == 6
+
+
+def test_state_follows_dispatched_messages_in_place():
+    from core.game_state import GameState
+    from network.dispatcher import MessageDispatcher
+    dispatcher = MessageDispatcher()
+    state = GameState()
+    state.attach(dispatcher)
+    changes = []
+    state.subscribe(changes.append)
+    dispatcher.post(SNAPSHOT)
+    dispatcher.post({"action": "character_created", "character": {"id": 9, "name": "New", "stats": {}}})
+    dispatcher.post({"action": "stat_update", "data": {"id": 1, "hp": 80, "mp": 10}})
+    dispatcher.post({"action": "stat_update", "data": {"id": 1, "hp": 80, "mp": 10}})  # no change
+    dispatcher.drain()
+    assert [c.added for c in changes] == [[1, 2], [9], []]
+    assert changes[2].updated == {1: ("hp", "mp")}
+    assert state.characters[1].stats.hp == 80 and "id" not in state.characters[1].stats.extra
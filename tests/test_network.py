@@ -0,0 +1,742 @@
+# test_network.py
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from network import protocol
+from network.async_client import AsyncGameClient, EventLoopPump
+from network.client import GameClient
+from network.connect import AddressCache, interleave, open_connection
+from network.protocol import (
+    JsonLineCodec, LengthPrefixFramer, LineFramer, MsgpackCodec, ProtocolError,
+)
+
+
+# ---------------- LineFramer ----------------
+def test_line_framer_splits_burst():
+    framer = LineFramer(chunk_size=16)
+    framer.feed(b'{"a": 1}\n{"a": 2}\n{"a"')
+    assert list(framer) == ['{"a": 1}', '{"a": 2}']
+    framer.feed(b": 3}\n")
+    assert list(framer) == ['{"a": 3}']
+    assert framer.buffered == 0
+
+
+def test_line_framer_utf8_split_across_reads():
+    data = "héllo ⚔\n".encode("utf-8")
+    framer = LineFramer(chunk_size=4)
+    for i in range(len(data)):
+        framer.feed(data[i:i + 1])
+        if i < len(data) - 1:
+            assert framer.next_frame() is None
+    assert framer.next_frame() == "héllo ⚔"
+
+
+def test_line_framer_compacts_an_overlapping_tail():
+    framer = LineFramer(chunk_size=16)
+    framer.feed(b"ab\ncdefghijklm")
+    assert framer.next_frame() == "ab"
+    framer.feed(b"nop\n")  # no room left: the 11 unread bytes slide 3 to the front
+    assert framer.next_frame() == "cdefghijklmnop"
+
+
+def test_line_framer_recv_into_socket():
+    a, b = socket.socketpair()
+    try:
+        lines = [f"line {i}" for i in range(2000)]
+        a.sendall(("\n".join(lines) + "\n").encode("utf-8"))
+        a.close()
+        framer = LineFramer(chunk_size=64)
+        received = []
+        while framer.recv_into(b):
+            received.extend(framer)
+        assert received == lines
+    finally:
+        b.close()
+
+
+def test_line_framer_skips_invalid_utf8_frame():
+    framer = LineFramer()
+    framer.feed(b"\xff\xfe\nok\n")
+    with pytest.raises(UnicodeDecodeError):
+        framer.next_frame()
+    assert framer.next_frame() == "ok"
+
+
+def test_line_framer_rejects_oversized_frame():
+    framer = LineFramer(chunk_size=8, max_frame_size=32)
+    with pytest.raises(ProtocolError):
+        for _ in range(10):
+            framer.feed(b"x" * 8)
+
+
+# ---------------- Codecs ----------------
+
+def _roundtrip(codec, message):
+    framer = codec.new_framer()
+    data = codec.encode(message)
+    for i in range(len(data)):  # worst case: one byte per read
+        framer.feed(data[i:i + 1])
+    frames = framer.drain()
+    assert len(frames) == 1
+    return codec.decode(frames[0])
+
+
+@pytest.mark.parametrize("codec", [JsonLineCodec(), MsgpackCodec()])
+def test_codec_roundtrip(codec):
+    message = {
+        "action": "character_list",
+        "user": {"id": 7, "username": "tester"},
+        "characters": [
+            {"id": i, "name": f"Hero{i}", "stats": {"Level": i, "HP": 100.5, "alive": True, "guild": None}}
+            for i in range(20)
+        ],
+        "big": 2 ** 40, "neg": -70000, "tiny": -5, "text": "ünïcode " * 50,
+    }
+    assert _roundtrip(codec, message) == message
+
+
+def test_pure_python_msgpack_matches_format(monkeypatch):
+    monkeypatch.setattr(protocol, "msgpack", None)
+    assert protocol.packb({"a": [1, -1, None]}) == b"\x81\xa1a\x93\x01\xff\xc0"
+    assert protocol.unpackb(b"\x81\xa1a\x93\x01\xff\xc0") == {"a": [1, -1, None]}
+
+
+def test_hot_action_uses_struct_schema():
+    codec = MsgpackCodec()
+    frame = codec.encode({"action": "stat_update", "data": {"id": 3, "hp": 90, "mp": -1}})
+    assert len(frame) == 4 + 2 + 12
+    assert _roundtrip(codec, {"action": "move", "data": {"x": 1.5, "y": -2.25}}) == \
+        {"action": "move", "data": {"x": 1.5, "y": -2.25}}
+    # Extra keys fall back to the generic encoding
+    extra = {"action": "move", "data": {"x": 1.5, "y": 2.0, "run": True}}
+    assert _roundtrip(codec, extra) == extra
+
+
+def test_length_prefix_framer_partial_header():
+    framer = LengthPrefixFramer()
+    framer.feed(b"\x00\x00")
+    assert framer.next_frame() is None
+    framer.feed(b"\x00\x03ab")
+    assert framer.next_frame() is None
+    framer.feed(b"c\x00\x00\x00\x00")
+    assert framer.drain() == [b"abc", b""]
+
+
+# ---------------- Codec handshake ----------------
+def test_client_negotiates_msgpack(stand_in_server):
+    server = stand_in_server()
+    client = GameClient(server.host, server.port, codecs=("msgpack", "json"))
+    client.connect()
+    try:
+        assert client.codec.name == "msgpack"
+        reply = client.request({"action": "ping", "data": {"n": 1}}, expect_action="ping")
+        assert reply["data"] == {"n": 1}
+    finally:
+        client.close()
+
+
+def test_client_falls_back_to_json_lines(stand_in_server):
+    server = stand_in_server(codecs=(), handler=lambda m: [{"action": "error", "reason": "unknown"}]
+                             if m["action"] == "hello" else [m])
+    client = GameClient(server.host, server.port, codecs=("msgpack", "json"), handshake_timeout=1)
+    client.connect()
+    try:
+        assert client.codec.name == "json"
+        assert client.request({"action": "ping"}, expect_action="ping")["action"] == "ping"
+    finally:
+        client.close()
+
+
+def test_client_handles_frames_sent_with_the_handshake_reply():
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        conn, _ = listener.accept()
+        conn.recv(4096)  # the hello
+        conn.sendall(JsonLineCodec().encode({"action": "hello_ok", "codec": "msgpack"})
+                     + MsgpackCodec().encode({"action": "chat", "data": {"text": "welcome"}}))
+        conn.recv(4096)  # hold the connection open without sending more
+
+    threading.Thread(target=serve, daemon=True).start()
+    client = GameClient(*listener.getsockname(), codecs=("msgpack",))
+    received = []
+    client.on_message = received.append
+    client.connect()
+    try:
+        assert _wait_for(lambda: received, timeout=2)
+        assert received[0]["data"]["text"] == "welcome"
+    finally:
+        client.close()
+        listener.close()
+
+
+# ---------------- Request correlation ----------------
+def _reversing_handler(batch_size):
+    """Answer pings in reverse order of arrival, batch_size at a time."""
+    held = []
+
+    def handler(message):
+        held.append({"action": "pong", "req_id": message.get("req_id"), "data": message["data"]})
+        if len(held) < batch_size:
+            return []
+        replies = held[::-1]
+        held.clear()
+        return replies
+    return handler
+
+
+def test_thousand_pipelined_requests_resolve_by_req_id(stand_in_server):
+    server = stand_in_server(handler=_reversing_handler(50))
+    client = GameClient(server.host, server.port)
+    client.connect()
+    try:
+        futures = [client.request_async({"action": "ping", "data": {"n": i}}, expect_action="pong")
+                   for i in range(1000)]
+        for i, future in enumerate(futures):
+            assert future.result(timeout=10)["data"]["n"] == i
+        assert not client._pending
+        assert len(client.dispatcher) == 1000  # replies are also delivered to the UI
+    finally:
+        client.close()
+
+
+def test_reply_without_req_id_matches_expected_action(stand_in_server):
+    def handler(message):
+        return [{"action": "server_notice", "text": "hi"},
+                {"action": message["action"] + "_ok", "data": message["data"]}]
+
+    server = stand_in_server(handler=handler)
+    client = GameClient(server.host, server.port)
+    client.connect()
+    try:
+        reply = client.request({"action": "delete_character", "data": {"char_id": 3}},
+                               expect_action="delete_character_ok")
+        assert reply["data"] == {"char_id": 3}
+        # The push nobody asked for is kept, not swallowed by the request
+        notices = []
+        client.dispatcher.subscribe("server_notice", notices.append)
+        assert _wait_for(lambda: client.dispatcher.drain() or notices)
+        assert notices[0]["text"] == "hi"
+    finally:
+        client.close()
+
+
+def test_request_timeout_and_cancel(stand_in_server):
+    server = stand_in_server(handler=lambda m: [])
+    client = GameClient(server.host, server.port)
+    client.connect()
+    try:
+        timed = client.request_async({"action": "ping"}, expect_action="pong", timeout=0.1)
+        with pytest.raises(TimeoutError):
+            timed.result(timeout=2)
+        cancelled = client.request_async({"action": "ping"}, expect_action="pong")
+        assert cancelled.cancel()
+        assert client.request({"action": "ping"}, expect_action="pong", timeout=0.1) is None
+        assert not client._pending
+    finally:
+        client.close()
+
+
+def test_pending_requests_fail_on_disconnect(stand_in_server):
+    server = stand_in_server(handler=lambda m: [])
+    client = GameClient(server.host, server.port)
+    client.connect()
+    future = client.request_async({"action": "ping"}, expect_action="pong")
+    server.drop_connections()
+    with pytest.raises(ConnectionError):
+        future.result(timeout=2)
+    client.close()
+
+
+def test_on_wakeup_fires_per_batch_and_on_disconnect(stand_in_server):
+    server = stand_in_server()
+    client = GameClient(server.host, server.port, auto_reconnect=False)
+    wakeups = []
+    client.on_wakeup = lambda: wakeups.append(len(client.dispatcher))
+    client.connect()
+    wakeups.clear()  # status changes while connecting wake the UI too
+    try:
+        client.send_json({"action": "ping"})
+        assert _wait_for(lambda: wakeups)
+        assert wakeups[0] >= 1  # called after the batch was handled
+        count = len(wakeups)
+        server.drop_connections()
+        assert _wait_for(lambda: len(wakeups) > count)
+    finally:
+        client.close()
+
+
+# ---------------- AsyncGameClient ----------------
+def test_async_client_pipelines_requests(stand_in_server):
+    server = stand_in_server(handler=_reversing_handler(10))
+
+    async def scenario():
+        client = AsyncGameClient(server.host, server.port, codecs=("msgpack", "json"))
+        await client.connect()
+        try:
+            assert client.codec.name == "msgpack"
+            replies = await asyncio.gather(*[
+                client.request({"action": "ping", "data": {"n": i}}, expect_action="pong")
+                for i in range(200)
+            ])
+            return [r["data"]["n"] for r in replies]
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) == list(range(200))
+
+
+def test_event_loop_pump_drives_client_without_blocking(stand_in_server):
+    server = stand_in_server(handler=lambda m: [{"action": "character_list", "req_id": m.get("req_id"),
+                                                 "user": {"id": 9}, "characters": []}])
+    pump = EventLoopPump()
+    client = AsyncGameClient(server.host, server.port)
+    task = pump.submit(client.login("tester", "secret1"))
+    frames = 0
+    deadline = time.monotonic() + 5
+    while not task.done() and time.monotonic() < deadline:
+        start = time.perf_counter()
+        pump.pump()
+        assert time.perf_counter() - start < 0.05  # a frame never waits on the network
+        frames += 1
+        time.sleep(0.001)
+    assert task.result()["user"] == {"id": 9}
+    assert client.logged_in and client.user_id == 9
+    assert frames > 1
+    pump.submit(client.close())
+    pump.close()
+
+
+# ---------------- Coalescing writer ----------------
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_writer_coalesces_concurrent_sends(stand_in_server):
+    server = stand_in_server(handler=lambda m: [])
+    client = GameClient(server.host, server.port, flush_interval=0.002)
+    client.connect()
+    try:
+        assert client.sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+
+        def burst(thread_id):
+            for i in range(250):
+                client.send_json({"action": "move", "data": {"t": thread_id, "i": i}})
+
+        threads = [threading.Thread(target=burst, args=(t,)) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert _wait_for(lambda: len(server.received) == 1000)
+        stats = client.write_stats
+        assert stats.messages == 1000
+        assert stats.flushes < 1000
+        assert stats.bytes_per_flush > 0
+        for t in range(4):  # frames from each thread arrive whole and in order
+            assert [m["data"]["i"] for m in server.received if m["data"]["t"] == t] == list(range(250))
+    finally:
+        client.close()
+
+
+# ---------------- Reconnect supervisor ----------------
+class _SessionHandler:
+    """Issues a session token on login and accepts it on resume."""
+
+    def __init__(self):
+        self.logins = []
+        self.resumes = []
+
+    def __call__(self, message):
+        action = message["action"]
+        if action == "login":
+            self.logins.append(message["data"])
+            return [{"action": "character_list", "req_id": message.get("req_id"), "user": {"id": 1},
+                     "characters": [], "session_token": "tok-1"}]
+        if action == "resume":
+            self.resumes.append(message["data"]["token"])
+            return [{"action": "character_list", "user": {"id": 1}, "characters": []}]
+        return []
+
+
+def _fast_client(server, **kwargs):
+    return GameClient(server.host, server.port, reconnect_base_delay=0.01,
+                      reconnect_max_delay=0.05, **kwargs)
+
+
+def test_backoff_delay_is_capped_and_jittered():
+    client = GameClient(reconnect_base_delay=0.5, reconnect_max_delay=8)
+    delays = [client.backoff_delay(a) for a in range(10) for _ in range(20)]
+    assert all(0.25 <= d <= 8 for d in delays)
+    assert max(client.backoff_delay(9) for _ in range(20)) <= 8
+    assert len({round(d, 6) for d in delays}) > 10
+
+
+def test_reconnects_and_resumes_with_token_on_flaky_server(stand_in_server):
+    handler = _SessionHandler()
+    server = stand_in_server(handler=handler, drop_every=25)
+    client = _fast_client(server)
+    try:
+        assert client.login("tester", "secret1")["session_token"] == "tok-1"
+        for i in range(200):
+            client.send_json({"action": "move", "data": {"i": i}})
+            time.sleep(0.0005)
+        moves = lambda: [m["data"]["i"] for m in server.received if m["action"] == "move"]
+        # Delivery is at-most-once: moves already written into a connection the
+        # server drops are lost, the rest arrive once each and in order
+        assert _wait_for(lambda: len(moves()) >= 180 and client.queue_depth == 0, timeout=10)
+        assert moves() == sorted(set(moves()))
+        assert client.reconnect_attempts >= 1
+        assert len(handler.logins) == 1  # the password went over the wire once
+        assert handler.resumes and set(handler.resumes) == {"tok-1"}
+        assert _wait_for(lambda: client.logged_in)
+    finally:
+        client.close()
+
+
+def test_send_never_blocks_during_outage(stand_in_server):
+    server = stand_in_server(handler=lambda m: [])
+    client = _fast_client(server, max_queued_writes=50)
+    client.connect()
+    server.stop()
+    assert _wait_for(lambda: not client.connected)
+    try:
+        start = time.perf_counter()
+        for i in range(60):
+            client.send_json({"action": "move", "data": {"i": i}})
+        assert time.perf_counter() - start < 0.5
+        assert client.queue_depth == 50
+        assert client.write_stats.dropped == 10
+
+        # The server comes back (on a new port here); the buffer is flushed in order
+        revived = stand_in_server(handler=lambda m: [])
+        client.port = revived.port
+        assert _wait_for(lambda: len(revived.received) == 50, timeout=5)
+        assert [m["data"]["i"] for m in revived.received] == list(range(50))
+    finally:
+        client.close()
+
+
+# ---------------- MessageDispatcher ----------------
+def test_dispatcher_delivers_per_action_to_every_subscriber_within_budget():
+    from network.dispatcher import MessageDispatcher
+    dispatcher = MessageDispatcher()
+    seen = []
+    dispatcher.subscribe("chat", lambda m: seen.append(("a", m["n"])))
+    dispatcher.subscribe("chat", lambda m: seen.append(("b", m["n"])))
+    dispatcher.subscribe(None, lambda m: seen.append(("all", m["n"])))
+    for n in range(5):
+        dispatcher.post({"action": "chat" if n != 2 else "stat_update", "n": n})
+
+    assert dispatcher.drain(budget=3) == 3
+    assert seen == [("a", 0), ("b", 0), ("all", 0), ("a", 1), ("b", 1), ("all", 1), ("all", 2)]
+    assert len(dispatcher) == 2
+    assert dispatcher.drain() == 2 and len(dispatcher) == 0
+    assert dispatcher.delivered == 5
+
+
+def test_dispatcher_inbox_is_bounded_and_survives_handler_changes():
+    from network.dispatcher import MessageDispatcher
+    dispatcher = MessageDispatcher(max_messages=3)
+    for n in range(5):
+        dispatcher.post({"action": "tick", "n": n})
+    assert len(dispatcher) == 3 and dispatcher.dropped == 2
+
+    seen = []
+
+    def once(message):
+        seen.append(message["n"])
+        dispatcher.unsubscribe("tick", once)
+
+    def failing(message):
+        raise ValueError("bad handler")
+
+    dispatcher.subscribe("tick", failing)
+    dispatcher.subscribe("tick", once)
+    assert dispatcher.drain() == 3
+    assert seen == [2]  # the oldest were dropped; a failing handler does not stop the others
+
+
+# ---------------- Entity snapshots ----------------
+def _world(n, step=0):
+    return {i: {"x": 10.0 * i + step * 0.5 * (i % 2), "y": 3.25, "facing": 90, "hp": 100, "mp": 40, "anim": 1}
+            for i in range(1, n + 1)}
+
+
+def test_snapshot_deltas_send_only_changed_fields_against_the_acked_baseline():
+    from network.protocol import SnapshotDecoder, SnapshotEncoder
+    encoder, decoder = SnapshotEncoder(), SnapshotDecoder()
+    full = encoder.encode(1, _world(20))
+    assert decoder.decode(full)["entities"] == _world(20)
+    unacked = encoder.encode(2, _world(20, step=1))
+    assert len(unacked) == len(full)  # nothing acked yet: still sent in full
+
+    encoder.ack(1)
+    world = _world(20, step=2)
+    del world[3]
+    world[4]["x"] = 40.03  # quantized to 1/16: rounds back to the baseline value
+    decoder.decode(unacked)
+    delta = encoder.encode(3, world)
+    assert len(delta) < len(full) // 3
+    message = decoder.decode(delta)
+    assert message["tick"] == 3 and 3 not in message["entities"]
+    assert message["entities"] == {i: dict(state, x=round(state["x"] * 16) / 16) for i, state in world.items()}
+
+    with pytest.raises(ProtocolError):
+        SnapshotDecoder().decode(delta)  # a decoder that never saw the baseline
+
+
+def test_snapshot_buffer_interpolates_through_jitter():
+    import random
+    from network.interpolation import SnapshotBuffer
+    rng = random.Random(3)
+    buffer = SnapshotBuffer(tick_rate=20, delay=0.1)
+    path = lambda t: 100 * t  # x moves 100 units per second
+    arrivals = sorted((tick / 20 + 0.05 + rng.uniform(0, 0.04), tick) for tick in range(1, 60))
+    frames, now = [], 0.0
+    for received_at, tick in arrivals:
+        while now < received_at:
+            sample = buffer.sample(now)
+            if 1 in sample and now > 0.5:
+                frames.append((now, sample[1]["x"]))
+            now += 1 / 60
+        buffer.push(tick, {1: {"x": path(tick / 20), "y": 0}}, received_at)
+
+    assert buffer.underruns == 0 and buffer.late == 0 and len(frames) > 100
+    steps = [b[1] - a[1] for a, b in zip(frames, frames[1:])]
+    assert all(abs(step - 100 / 60) < 0.05 for step in steps)  # one even step per frame
+    lag = [path(t) - x for t, x in frames]
+    assert max(lag) - min(lag) < 1
+
+
+def test_client_decodes_and_acks_snapshots_from_server(stand_in_server):
+    from network.protocol import SnapshotEncoder
+    encoder, codec, sizes = SnapshotEncoder(), MsgpackCodec(), []
+
+    def handler(message):
+        if message["action"] == "snapshot_ack":
+            encoder.ack(message["tick"])
+            tick = message["tick"] + 1
+        elif message["action"] == "enter_world":
+            tick = 1
+        else:
+            return []
+        if tick > 5:
+            return []
+        frame = codec.encode_snapshot(encoder.encode(tick, _world(50, step=tick)))
+        sizes.append(len(frame))
+        return [frame]
+
+    server = stand_in_server(handler=handler)
+    client = GameClient(server.host, server.port, codecs=("msgpack",))
+    client.connect()
+    try:
+        client.send({"action": "enter_world"})
+        assert _wait_for(lambda: client.dispatcher.drain() is not None and len(client.world) == 5)
+        assert _wait_for(lambda: encoder.acked == 5)  # the last ack may still be on its way
+        assert client.world.sample(time.monotonic() + 10)[2]["x"] == _world(50, step=5)[2]["x"]
+        assert sizes[0] > 4 * max(sizes[1:])
+    finally:
+        client.close()
+
+
+# ---------------- Stream compression ----------------
+def _character_list(n):
+    return {"action": "character_list", "user": {"id": 7, "username": "tester"},
+            "characters": [{"id": i, "name": f"Hero{i}", "stats": {"Level": i, "HP": 100, "MP": 50, "guild": None}}
+                           for i in range(n)]}
+
+
+@pytest.mark.parametrize("name", ["zlib", "zstd"])
+def test_compressed_stream_round_trips_split_chunks(name):
+    from network.protocol import CompressedFramer, get_compression
+    if name == "zstd":
+        pytest.importorskip("zstandard")
+    sender, receiver = get_compression(name, threshold=64), get_compression(name, threshold=64)
+    codec = JsonLineCodec()
+    batches = [codec.encode({"action": "ping"}), codec.encode(_character_list(6)), codec.encode(_character_list(6))]
+    wire = [sender.wrap(batch) for batch in batches]
+    assert (sender.chunks_raw, sender.chunks_compressed) == (1, 2)
+    assert len(wire[2]) < len(wire[1]) < len(batches[1]) // 2  # the second list refers back to the first
+
+    framer = CompressedFramer(codec.new_framer(), receiver)
+    frames = []
+    for byte in b"".join(wire):  # worst case: one byte per read
+        framer.feed(bytes([byte]))
+        frames.extend(framer.drain())
+    assert [codec.decode(f) for f in frames] == [{"action": "ping"}, _character_list(6), _character_list(6)]
+
+
+@pytest.mark.parametrize("name", ["zlib", "zstd"])
+def test_compressed_chunk_may_not_expand_past_max_frame_size(name):
+    from network.protocol import CompressedFramer, get_compression
+    if name == "zstd":
+        pytest.importorskip("zstandard")
+    sender, receiver = get_compression(name), get_compression(name)
+    codec = JsonLineCodec()
+    framer = CompressedFramer(codec.new_framer(), receiver, max_frame_size=1 << 16)
+    framer.feed(sender.wrap(codec.encode(_character_list(300))))  # about 30 KB: fits
+    assert [codec.decode(f) for f in framer.drain()] == [_character_list(300)]
+    bomb = sender.wrap(b" " * (1 << 24))
+    assert len(bomb) < 1 << 16
+    framer.feed(bomb)
+    with pytest.raises(ProtocolError):
+        framer.drain()
+
+
+@pytest.mark.parametrize("name", ["zlib", "zstd"])
+def test_compressed_burst_is_limited_per_frame(name):
+    from network.protocol import CompressedFramer, get_compression
+    if name == "zstd":
+        pytest.importorskip("zstandard")
+    sender, receiver = get_compression(name), get_compression(name)
+    codec = JsonLineCodec()
+    messages = [{"action": "blob", "data": str(i) * 300_000} for i in range(5)]
+    def burst():
+        return b"".join(sender.wrap(codec.encode(m)) for m in messages)
+
+    wire = burst()
+    assert len(wire) < 1 << 16  # five 300 KB frames, together past the 1 MB limit, in one read
+    framer = CompressedFramer(codec.new_framer(), receiver)
+    framer.feed(wire)
+    assert [codec.decode(f) for f in framer.drain()] == messages
+    framer.feed(burst())
+    assert [codec.decode(framer.next_frame()) for _ in messages] == messages
+    assert framer.next_frame() is None
+
+
+def test_client_negotiates_compression_per_connection(stand_in_server):
+    server = stand_in_server(handler=lambda m: [_character_list(20) if m["action"] == "list" else m],
+                             compression=("zlib",))
+    client = GameClient(server.host, server.port, codecs=("msgpack",), compression=("zstd", "zlib"),
+                        compress_threshold=128)
+    client.connect()
+    try:
+        assert client.stream.name == "zlib"
+        assert client.request({"action": "ping", "data": {"n": 1}}, expect_action="ping")["data"] == {"n": 1}
+        assert client.request({"action": "list"}, expect_action="character_list") == _character_list(20)
+        assert client.stream.chunks_raw >= 2  # the small requests went uncompressed
+        assert server.streams[0].ratio < 0.5
+    finally:
+        client.close()
+
+    plain = stand_in_server()  # accepts the codec but no compression
+    client = GameClient(plain.host, plain.port, codecs=("msgpack",), compression=("zlib",))
+    client.connect()
+    try:
+        assert client.codec.name == "msgpack" and client.stream is None
+        assert client.request({"action": "ping"}, expect_action="ping")["action"] == "ping"
+    finally:
+        client.close()
+
+
+# ---------------- Connecting ----------------
+def test_connect_async_returns_at_once_while_server_delays_accept(stand_in_server):
+    server = stand_in_server(accept_delay=0.3)
+    client = GameClient(server.host, server.port, codecs=("msgpack", "json"))
+    statuses = []
+    client.on_wakeup = lambda: statuses.append(client.status)
+    try:
+        started = time.monotonic()
+        future = client.connect_async()
+        assert time.monotonic() - started < 0.1
+        assert client.connect_async() is future
+        future.result(timeout=3)
+        assert time.monotonic() - started >= 0.25
+        assert client.status == "connected" and client.codec.name == "msgpack"
+        assert statuses[0] == "connecting" and statuses[-1] == "connected"
+    finally:
+        client.close()
+
+
+def test_connect_async_and_supervisor_open_one_connection(stand_in_server):
+    server = stand_in_server(accept_delay=0.3)
+    client = _fast_client(server, codecs=("msgpack", "json"))
+    try:
+        future = client.connect_async()  # still in the handshake when the supervisor retries
+        client._start_supervisor()
+        future.result(timeout=3)
+        assert client.connect_async().result(timeout=1) is None
+        time.sleep(0.7)  # long enough for the server to accept a second connection
+        assert len(server.connections) == 1 and client.connected
+    finally:
+        client.close()
+
+
+def test_connect_gives_up_on_stalled_listener(stalled_listener):
+    client = GameClient(*stalled_listener, connect_timeout=0.3, auto_reconnect=False)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        client.connect()
+    assert time.monotonic() - started < 1
+    assert client.status == "disconnected" and isinstance(client.last_error, TimeoutError)
+    assert isinstance(client.connect_async().exception(timeout=2), TimeoutError)
+
+
+def test_open_connection_races_past_a_stalled_address(stand_in_server, stalled_listener):
+    server = stand_in_server()
+    cache = AddressCache()
+    cache.put("game.test", 5000, [
+        (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", stalled_listener),
+        (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (server.host, server.port)),
+    ])
+    started = time.monotonic()
+    sock = open_connection("game.test", 5000, timeout=2, attempt_delay=0.05, cache=cache)
+    try:
+        assert sock.getpeername() == (server.host, server.port)
+        assert sock.gettimeout() is None
+        assert time.monotonic() - started < 0.5
+    finally:
+        sock.close()
+
+
+def test_open_connection_skips_address_families_the_host_lacks(stand_in_server, monkeypatch):
+    server = stand_in_server()
+    real_socket = socket.socket
+
+    def no_ipv6(family=socket.AF_INET, *args, **kwargs):
+        if family == socket.AF_INET6:
+            raise OSError(97, "Address family not supported by protocol")
+        return real_socket(family, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "socket", no_ipv6)
+    cache = AddressCache()
+    cache.put("game.test", 5000, [
+        (socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", ("::1", server.port, 0, 0)),
+        (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (server.host, server.port)),
+    ])
+    sock = open_connection("game.test", 5000, timeout=2, cache=cache)
+    try:
+        assert sock.getpeername() == (server.host, server.port)
+    finally:
+        sock.close()
+
+
+def test_interleave_alternates_address_families():
+    v6 = [(socket.AF_INET6, socket.SOCK_STREAM, 0, "", f"v6-{i}") for i in range(3)]
+    v4 = [(socket.AF_INET, socket.SOCK_STREAM, 0, "", "v4-0")]
+    assert interleave(v6 + v4) == [v6[0], v4[0], v6[1], v6[2]]
+
+
+def test_address_cache_reuses_lookups_until_a_connect_fails():
+    cache = AddressCache()
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    for _ in range(2):  # "localhost" may put a refused ::1 first; the race moves on
+        open_connection("localhost", port, timeout=2, cache=cache).close()
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    listener.close()
+    with pytest.raises(ConnectionRefusedError):
+        open_connection("localhost", port, timeout=2, cache=cache)
+    cache.resolve("localhost", port)
+    assert cache.misses == 2
@@ -0,0 +1,731 @@
+# test_ui.py
+import os
+from concurrent.futures import Future
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from client.ui.masks import find_color_bounds, label_regions
+
+LOGIN_MASK = "client/data/assets/images/login_window_mask.png"
+LOGIN_COLORS = [(0, 0, 255), (0, 255, 255), (0, 255, 0), (255, 0, 0)]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+
+def _reference_bounds(surface, color):
+    """Per-pixel scan equivalent to the original Login._find_color_bounds (inclusive extent)."""
+    coords = [(x, y) for x in range(surface.get_width()) for y in range(surface.get_height())
+              if surface.get_at((x, y))[:3] == color]
+    if not coords:
+        return None
+    xs, ys = zip(*coords)
+    return pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+
+
+# ---------------- Mask bounds ----------------
+def test_find_color_bounds_synthetic():
+    surface = pygame.Surface((40, 30))
+    surface.fill((0, 0, 0))
+    surface.fill((255, 0, 0), (3, 4, 10, 5))
+    surface.fill((255, 0, 0), (20, 25, 1, 1))  # disjoint pixel extends the box
+    surface.fill((0, 0, 254), (0, 0, 5, 5))    # near-miss colour is not matched
+    bounds = find_color_bounds(surface, [(255, 0, 0), (0, 0, 255)])
+    assert bounds[(255, 0, 0)] == pygame.Rect(3, 4, 18, 22)
+    assert bounds[(0, 0, 255)] is None
+
+
+def test_find_color_bounds_matches_pixel_scan_on_login_mask():
+    mask = pygame.image.load(LOGIN_MASK).convert()
+    mask = pygame.transform.scale(mask, (mask.get_width() // 4, mask.get_height() // 4))
+    bounds = find_color_bounds(mask, LOGIN_COLORS)
+    for color in LOGIN_COLORS:
+        assert bounds[color] == _reference_bounds(mask, color)
+
+
+# ---------------- Region labeling ----------------
+SELECTION_MASK = "client/data/assets/images/character_selection_mask.png"
+SELECTION_COLORS = {
+    (0, 128, 0): "start_btn",
+    (176, 224, 230): "slot",
+    (255, 0, 0): "return_btn",
+    (0, 0, 255): "delete_btn",
+}
+
+
+def _reference_build_masks(surface, color_map):
+    """The original CharacterSelection._build_masks: per-pixel scan plus flood fill."""
+    masks = {}
+    slot_masks = []
+    width, height = surface.get_size()
+    for color, name in color_map.items():
+        if name != "slot":
+            masks[name] = pygame.Mask((width, height))
+    visited = pygame.Mask((width, height))
+    for x in range(width):
+        for y in range(height):
+            color = surface.get_at((x, y))[:3]
+            if color not in color_map:
+                continue
+            field_name = color_map[color]
+            if field_name == "slot" and not visited.get_at((x, y)):
+                slot_mask = pygame.Mask((width, height))
+                to_check = [(x, y)]
+                while to_check:
+                    cx, cy = to_check.pop()
+                    if 0 <= cx < width and 0 <= cy < height:
+                        if not visited.get_at((cx, cy)) and surface.get_at((cx, cy))[:3] == color:
+                            visited.set_at((cx, cy), 1)
+                            slot_mask.set_at((cx, cy), 1)
+                            to_check.extend([(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)])
+                slot_masks.append(slot_mask)
+            elif field_name != "slot":
+                masks[field_name].set_at((x, y), 1)
+    slot_masks.sort(key=lambda m: m.get_bounding_rects()[0].y if m.get_bounding_rects() else 9999)
+    masks["slots"] = slot_masks[:6]
+    return masks
+
+
+def _same_mask(a, b):
+    return a.get_size() == b.get_size() and a.count() == b.count() == a.overlap_area(b, (0, 0))
+
+
+def _labelled(surface, color_map):
+    regions = label_regions(surface, color_map, split=("slot",))
+    masks = {name: mask for name, mask in regions.items() if name != "slot"}
+    masks["slots"] = regions["slot"][:6]
+    return masks
+
+
+def _assert_same_masks(expected, actual):
+    assert expected.keys() == actual.keys()
+    for name in expected:
+        if name == "slots":
+            assert len(expected["slots"]) == len(actual["slots"])
+            for exp, act in zip(expected["slots"], actual["slots"]):
+                assert _same_mask(exp, act)
+        else:
+            assert _same_mask(expected[name], actual[name])
+
+
+def test_label_regions_matches_flood_fill_on_selection_mask():
+    surface = pygame.image.load(SELECTION_MASK).convert()
+    surface = pygame.transform.scale(surface, (surface.get_width() // 4, surface.get_height() // 4))
+    expected = _reference_build_masks(surface, SELECTION_COLORS)
+    actual = _labelled(surface, SELECTION_COLORS)
+    assert len(actual["slots"]) == 6
+    _assert_same_masks(expected, actual)
+
+
+def test_label_regions_orders_slots_like_column_scan():
+    surface = pygame.Surface((60, 40))
+    surface.fill((0, 0, 0))
+    slot = (176, 224, 230)
+    # Two slots sharing a top edge, one below, and an L-shape whose first
+    # scanned pixel is lower than its neighbour's
+    surface.fill(slot, (30, 2, 10, 5))
+    surface.fill(slot, (2, 2, 10, 5))
+    surface.fill(slot, (2, 20, 10, 5))
+    surface.fill(slot, (45, 6, 3, 3))
+    surface.fill(slot, (46, 2, 10, 3))
+    surface.fill((0, 0, 255), (50, 30, 4, 4))
+    expected = _reference_build_masks(surface, SELECTION_COLORS)
+    _assert_same_masks(expected, _labelled(surface, SELECTION_COLORS))
+
+
+# ---------------- Disk cache ----------------
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    from client import cache
+    disk = cache.DiskCache(str(tmp_path / "cache"), 1 << 20)
+    monkeypatch.setattr(cache, "ui_cache", disk)
+    return disk
+
+
+def test_pack_mask_round_trip():
+    from client.cache import pack_mask, unpack_mask
+    mask = pygame.Mask((37, 21))
+    for x, y in [(3, 4), (4, 4), (20, 9), (36, 20), (5, 17)]:
+        mask.set_at((x, y), 1)
+    packed = pack_mask(mask)
+    assert packed[1] == (3, 4, 34, 17)
+    assert len(packed[2]) < 34 * 17
+    assert _same_mask(mask, unpack_mask(packed))
+    assert unpack_mask(pack_mask(pygame.Mask((5, 5)))).count() == 0
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    from client.cache import DiskCache
+    disk = DiskCache(str(tmp_path), 2500)
+    disk.put("a", b"x" * 1000)
+    disk.put("b", b"x" * 1000)
+    os.utime(tmp_path / "a.bin", (1, 1))
+    os.utime(tmp_path / "b.bin", (2, 2))
+    assert disk.get("a") is not None  # refreshes "a", leaving "b" oldest
+    disk.put("c", b"x" * 1000)
+    assert disk.get("b") is None
+    assert disk.get("a") is not None and disk.get("c") is not None
+
+
+def test_disk_cache_discards_corrupt_entries(tmp_path):
+    from client.cache import DiskCache
+    disk = DiskCache(str(tmp_path), 1 << 20)
+    disk.put("k", {"v": 1})
+    (tmp_path / "k.bin").write_bytes(b"not a cache entry")
+    assert disk.get("k") is None
+    assert not (tmp_path / "k.bin").exists()
+
+
+def test_disk_cache_never_unpickles(tmp_path):
+    import pickle
+    from client.cache import CACHE_VERSION, DiskCache
+    disk = DiskCache(str(tmp_path), 1 << 20)
+    (tmp_path / "k.bin").write_bytes(pickle.dumps((CACHE_VERSION, {"v": 1})))
+    assert disk.get("k") is None
+    assert not (tmp_path / "k.bin").exists()
+
+
+def test_disk_cache_round_trips_entries_and_rejects_bad_payloads(tmp_path):
+    from client.cache import DiskCache, pack_mask, unpack_mask
+    disk = DiskCache(str(tmp_path), 1 << 20)
+    value = {(255, 0, 0): (1, 2, 3, 4), "b": None, "raw": [b"\x00\xff", b""], "f": 0.5, "t": True}
+    disk.put("k", value)
+    assert disk.get("k") == value
+
+    size, rect, _ = pack_mask(pygame.Mask((4, 4), fill=True))
+    disk.put("m", (size, rect, b"garbage"))
+    assert disk.get("m", unpack_mask) is None
+    assert not (tmp_path / "m.bin").exists()
+
+
+def test_cached_regions_warm_start_matches_cold(disk_cache):
+    from client.cache import cached_color_bounds, cached_regions
+    surface = pygame.image.load(SELECTION_MASK)
+    size = (surface.get_width() // 4, surface.get_height() // 4)
+    cold = cached_regions(SELECTION_MASK, size, SELECTION_COLORS, split=("slot",))
+    warm = cached_regions(SELECTION_MASK, size, SELECTION_COLORS, split=("slot",))
+    assert (disk_cache.misses, disk_cache.hits) == (1, 1)
+    assert len(warm["slot"]) == len(cold["slot"]) == 6
+    for name in cold:
+        if name == "slot":
+            assert all(_same_mask(c, w) for c, w in zip(cold["slot"], warm["slot"]))
+        else:
+            assert _same_mask(cold[name], warm[name])
+
+    cached_regions(SELECTION_MASK, (size[0] + 1, size[1]), SELECTION_COLORS, split=("slot",))
+    assert disk_cache.misses == 2  # a new resolution is a new key
+
+    login_size = (200, 150)
+    assert cached_color_bounds(LOGIN_MASK, login_size, LOGIN_COLORS) == \
+        cached_color_bounds(LOGIN_MASK, login_size, LOGIN_COLORS)
+
+
+# ---------------- Asset manager ----------------
+def test_asset_manager_shares_images_and_evicts_lru(disk_cache):
+    from client.assets import AssetManager, surface_bytes
+    AssetManager(budget_bytes=1 << 30).scaled(LOGIN_MASK, (20, 10))  # warm the disk cache
+    manager = AssetManager(budget_bytes=1 << 30)
+    small = manager.scaled(LOGIN_MASK, (40, 30))
+    assert manager.scaled(LOGIN_MASK, (40.0, 30)) is small
+    base = manager.image(LOGIN_MASK)
+    assert manager.image(LOGIN_MASK) is base
+
+    # base was just used, so the disk-cached variant pushes out small
+    manager.budget_bytes = surface_bytes(base) + surface_bytes(small)
+    manager.scaled(LOGIN_MASK, (20, 10))
+    assert manager.used_bytes <= manager.budget_bytes
+    assert manager.image(LOGIN_MASK) is base
+    assert manager.scaled(LOGIN_MASK, (40, 30)) is not small
+
+
+def test_asset_manager_opens_each_font_once():
+    from client.assets import AssetManager
+    pygame.font.init()
+    manager = AssetManager(budget_bytes=0)
+    assert manager.font(None, 24) is manager.font(None, 24.0)
+    assert manager.font(None, 24) is not manager.font(None, 25)
+
+
+def test_preloader_hands_converted_assets_to_manager(disk_cache):
+    from client.assets import AssetManager
+    pygame.font.init()
+    manager = AssetManager(budget_bytes=1 << 30)
+    images = [(LOGIN_MASK, (40, 30), True), (SELECTION_MASK, None, False)]
+    preloader = manager.preload(images, fonts=[None], workers=2)
+    assert preloader.total == 3
+
+    # A screen asking first waits for that job only and converts it itself
+    native = manager.image(SELECTION_MASK, alpha=False)
+    assert native.get_size() == pygame.image.load(SELECTION_MASK).get_size()
+
+    preloader.wait()
+    assert preloader.done and preloader.progress == 1.0
+    assert preloader.ready(images[:1], [None])
+    assert not manager._pending and not manager._pending_fonts
+    small = manager.scaled(LOGIN_MASK, (40, 30))
+    assert small.get_size() == (40, 30) and small.get_flags() & pygame.SRCALPHA
+    assert manager.image(SELECTION_MASK, alpha=False) is native
+    assert manager.font(None, 20) is manager.font(None, 20)
+
+
+def test_preloader_skips_failed_jobs(disk_cache):
+    from client.assets import AssetManager
+    manager = AssetManager(budget_bytes=1 << 30)
+    preloader = manager.preload([("client/data/assets/images/missing.png", None, True)])
+    preloader.wait()
+    assert preloader.done and not manager._images
+
+
+# ---------------- Retained renderer ----------------
+def _frame(renderer, screen, background, font, selected, extra=True):
+    renderer.begin(screen, background)
+    renderer.fill("panel", (10, 10, 80, 60), (0, 0, 0, 100), border_radius=5)
+    for i in range(3):
+        color = (50, 150, 255) if i == selected else (255, 255, 255)
+        renderer.text(("option", i), font, f"Option {i}", color, midleft=(20, 20 + i * 20))
+    if extra:
+        renderer.fill("cursor", (90, 20, 2, 10), (255, 255, 255))
+    return renderer.present()
+
+
+def test_retained_renderer_repaints_only_changes():
+    from client.ui.render import RetainedRenderer
+    pygame.font.init()
+    font = pygame.font.Font(None, 18)
+    screen = pygame.Surface((120, 100))
+    background = pygame.Surface((120, 100))
+    background.fill((30, 60, 90))
+    background.fill((200, 0, 0), (0, 0, 60, 50))
+    renderer = RetainedRenderer()
+
+    assert _frame(renderer, screen, background, font, 0) == [screen.get_rect()]
+    assert _frame(renderer, screen, background, font, 0) == []
+
+    dirty = _frame(renderer, screen, background, font, 1, extra=False)
+    assert dirty and all(rect.w < 120 for rect in dirty)
+    assert any(rect.collidepoint(90, 20) for rect in dirty)  # removed cursor
+
+    reference = pygame.Surface((120, 100))
+    _frame(RetainedRenderer(), reference, background, font, 1, extra=False)
+    assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(reference, "RGB")
+
+    other = background.copy()
+    assert _frame(renderer, screen, other, font, 1, extra=False) == [screen.get_rect()]
+    renderer.invalidate()
+    assert _frame(renderer, screen, other, font, 1, extra=False) == [screen.get_rect()]
+
+
+# ---------------- Frame scheduler ----------------
+def test_frame_scheduler_sleeps_until_timer_or_network_event():
+    import threading
+    import time
+    from client.ui.scheduler import NETWORK_EVENT, FrameScheduler, post_network_event
+    pygame.event.clear()
+    frame = FrameScheduler(fps=1000)
+
+    start = time.perf_counter()
+    assert frame.events(wake_in=0.1) == []
+    assert 0.09 <= time.perf_counter() - start < 0.5
+    assert frame.idle_waits == 1
+
+    # Posts from another thread wake the wait early and are coalesced
+    threading.Timer(0.05, lambda: (post_network_event(), post_network_event())).start()
+    start = time.perf_counter()
+    events = frame.events(wake_in=5)
+    assert time.perf_counter() - start < 1
+    assert [e.type for e in events] == [NETWORK_EVENT]
+    post_network_event()  # consumed, so the next post goes through
+    assert [e.type for e in frame.events()] == [NETWORK_EVENT]
+
+
+def test_frame_scheduler_does_not_wait_while_animating():
+    import time
+    from client.ui.scheduler import FrameScheduler
+    pygame.event.clear()
+    frame = FrameScheduler(fps=1000)
+    frame.animate(1.0)
+    start = time.perf_counter()
+    for _ in range(5):
+        frame.events(wake_in=5)
+    assert time.perf_counter() - start < 0.5
+    assert frame.idle_waits == 0
+
+
+# ---------------- Text cache ----------------
+def test_text_cache_reuses_surfaces_within_bound():
+    from client.ui.text import TextCache
+    pygame.font.init()
+    font = pygame.font.Font(None, 20)
+    cache = TextCache(max_entries=2)
+    first = cache.render(font, "Start", True, (255, 255, 255))
+    assert cache.render(font, "Start", True, [255, 255, 255]) is first
+    assert cache.render(font, "Start", True, (50, 150, 255)) is not first
+    cache.render(font, "Exit", True, (255, 255, 255))  # evicts the white "Start"
+    assert cache.render(font, "Start", True, (255, 255, 255)) is not first
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert cache.hit_rate == 0.2
+
+
+def test_render_input_reuses_recent_values_per_field():
+    from client.ui.text import TextCache
+    pygame.font.init()
+    font = pygame.font.Font(None, 24)
+    cache = TextCache(max_entries=1)
+    white = (255, 255, 255)
+    typed = ["h", "hu", "hun", "hunt", "hunt", "hun", "hu", "hun", "hunt", "hunte"]
+    surfaces = [cache.render_input("username", font, text, white) for text in typed]
+    assert (cache.hits, cache.misses) == (5, 5)  # backspacing and retyping hit
+    assert surfaces[2] is surfaces[5] is surfaces[7]
+    assert surfaces[-1].get_size() == font.size("hunte")
+
+    cache.render(font, "label", True, white)  # label LRU does not evict field history
+    assert cache.render_input("username", font, "hunt", white) is surfaces[3]
+    assert cache.render_input("password", font, "hunt", white) is not surfaces[3]
+    for n in range(70):
+        cache.render_input("password", font, "*" * n, white, history=8)
+    assert cache.render_input("username", font, "h", white) is surfaces[0]
+    assert len(cache._inputs["password"]) == 8
+
+
+# ---------------- Overlays ----------------
+def test_overlay_cache_bakes_cropped_surfaces_once():
+    from client.ui.render import OverlayCache
+    cache = OverlayCache(max_entries=2)
+    mask = pygame.Mask((200, 100))
+    mask.draw(pygame.Mask((30, 20), fill=True), (50, 40))
+    surface, rect = cache.mask(mask, (255, 215, 0, 100))
+    assert rect == pygame.Rect(50, 40, 30, 20) and surface.get_size() == (30, 20)
+    assert surface.get_at((0, 0)) == (255, 215, 0, 100)
+    assert cache.mask(mask, (255, 215, 0, 100))[0] is surface
+    panel = cache.fill((40, 10), (0, 0, 0, 100), border_radius=4)
+    assert cache.fill((40, 10), (0, 0, 0, 100), border_radius=4) is panel
+    cache.fill((8, 8), (1, 2, 3, 4))  # evicts the mask overlay
+    assert cache.mask(mask, (255, 215, 0, 100))[0] is not surface
+
+
+def test_character_selection_highlights_use_baked_overlays(disk_cache, monkeypatch):
+    from client import config
+    from client.ui import character_selection, render
+    from client.ui.character_selection import CharacterSelection
+    from core.game_state import GameState
+    pygame.font.init()
+    monkeypatch.setattr(config, "SCREEN_WIDTH", 480)
+    monkeypatch.setattr(config, "SCREEN_HEIGHT", 270)
+    fresh = render.OverlayCache(64)
+    monkeypatch.setattr(render, "overlays", fresh)
+    monkeypatch.setattr(character_selection, "overlays", fresh)
+    screen = pygame.Surface((480, 270))
+    state = GameState.from_snapshot({"characters": [{"id": 1, "name": "Hero", "stats": {"Level": 3}}]})
+    selection = CharacterSelection(screen, state, client=None)
+    baked = len(fresh._surfaces)
+    assert baked == 3 + 2 * len(selection.masks["slots"])
+
+    selection.draw()
+    selection.selected_slot = 0
+    for field in selection.focus_order * 2:
+        selection.active_field = field
+        selection.draw()
+        for rect in selection.renderer.present():
+            assert rect.w < 480 or rect.h < 270  # never a full-screen repaint
+    assert len(fresh._surfaces) == baked
+
+
+# ---------------- Resolution changes ----------------
+@pytest.fixture
+def resolution(monkeypatch):
+    """Isolated listeners and config; the display is put back afterwards."""
+    from client import config
+    from client.ui import display
+    monkeypatch.setattr(display, "_listeners", [])
+    for name in ("SCREEN_WIDTH", "SCREEN_HEIGHT", "SCREEN_MODE"):
+        monkeypatch.setattr(config, name, getattr(config, name))
+    yield display
+    pygame.display.set_mode((1, 1))
+
+
+def test_resolution_listeners_run_in_order_and_are_held_weakly(resolution):
+    from client import config
+    calls = []
+
+    class Screen:
+        def on_resolution_change(self, screen):
+            calls.append(("screen", screen.get_size()))
+
+    resolution.on_resolution_change(lambda screen: calls.append(("app", screen.get_size())))
+    kept, dropped = Screen(), Screen()
+    resolution.on_resolution_change(kept.on_resolution_change)
+    resolution.on_resolution_change(dropped.on_resolution_change)
+    del dropped
+
+    screen = resolution.change_resolution((64, 48), "Window")
+    assert screen.get_size() == (64, 48) and (config.SCREEN_WIDTH, config.SCREEN_HEIGHT) == (64, 48)
+    assert calls == [("app", (64, 48)), ("screen", (64, 48))]
+    assert len(resolution._listeners) == 2
+
+
+def test_settings_resample_once_per_resolution(resolution, disk_cache, monkeypatch):
+    from client import config
+    from client.assets import AssetManager
+    from client.ui import setting_menu
+    pygame.font.init()
+    resampled = []
+    for name in ("scale", "smoothscale"):
+        real = getattr(pygame.transform, name)
+        monkeypatch.setattr(pygame.transform, name,
+                            lambda surface, size, real=real, name=name: resampled.append((name, size)) or real(surface, size))
+    monkeypatch.setattr(config, "SMOOTH_SCALING", True)
+    monkeypatch.setattr(setting_menu, "assets", AssetManager(budget_bytes=1 << 30))
+    monkeypatch.setattr(setting_menu.SettingsMenu, "save_config", lambda self: None)
+
+    settings = setting_menu.SettingsMenu(resolution.set_mode((80, 60), "Window"))
+    assert resampled == [("smoothscale", (80, 60))]
+    for _ in range(5):
+        settings.draw()
+    assert len(resampled) == 1
+
+    settings.current_resolution_index = 0  # 800x600
+    settings.apply_changes()
+    assert settings.screen.get_size() == (800, 600)
+    for _ in range(5):
+        settings.selected_index = (settings.selected_index + 1) % len(settings.options)
+        settings.draw()
+    assert resampled == [("smoothscale", (80, 60)), ("smoothscale", (800, 600))]
+
+
+# ---------------- Scenes ----------------
+def test_scene_manager_lifecycle_and_cached_scenes(resolution):
+    from client.ui.scenes import Scene, SceneManager
+    calls, built = [], []
+
+    class Recorder(Scene):
+        def __init__(self, name):
+            self.name = name
+            built.append(name)
+
+        def enter(self, **params):
+            calls.append((self.name, "enter", params))
+
+        def exit(self):
+            calls.append((self.name, "exit"))
+
+        def suspend(self):
+            calls.append((self.name, "suspend"))
+
+        def resume(self, result):
+            calls.append((self.name, "resume", result))
+
+    manager = SceneManager(pygame.display.get_surface())
+    for name in ("a", "b", "c"):
+        manager.register(name, lambda screen, name=name: Recorder(name))
+
+    manager.push("a")
+    manager.push("b", x=1)
+    manager.pop("done")
+    manager.push("b")
+    manager.replace("c")
+    manager.quit("bye")
+    assert built == ["a", "b", "c"]
+    assert calls == [
+        ("a", "enter", {}),
+        ("a", "suspend"), ("b", "enter", {"x": 1}),
+        ("b", "exit"), ("a", "resume", "done"),
+        ("a", "suspend"), ("b", "enter", {}),
+        ("b", "exit"), ("c", "enter", {}),
+        ("c", "exit"), ("a", "exit"),
+    ]
+    assert manager.stack == [] and manager.result == "bye"
+
+
+def test_menu_and_settings_share_one_loop_without_rebuilding(resolution, monkeypatch):
+    from client.ui.menu import Menu
+    from client.ui.scenes import SceneManager
+    from client.ui.setting_menu import SettingsMenu
+    pygame.font.init()
+    screen = resolution.set_mode((160, 120), "Window")
+    built = []
+    manager = SceneManager(screen)
+    manager.register("menu", lambda screen: built.append("menu") or Menu(screen))
+    manager.register("settings", lambda screen: built.append("settings") or SettingsMenu(screen))
+
+    pygame.event.clear()
+    for key in (pygame.K_DOWN, pygame.K_RETURN, pygame.K_ESCAPE,  # settings and back
+                pygame.K_RETURN, pygame.K_ESCAPE,                 # and again
+                pygame.K_DOWN, pygame.K_RETURN):                  # Exit
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=""))
+    assert manager.run("menu") == "exit"
+    assert built == ["menu", "settings"]
+
+
+def test_character_delete_prompt_is_a_pushed_scene(resolution, disk_cache):
+    from client.ui.character_selection import CharacterSelection, ConfirmPrompt
+    from client.ui.scenes import SceneManager
+    from core.game_state import GameState
+    pygame.font.init()
+
+    class Client:
+        def __init__(self):
+            self.requests = {}  # char_id -> Future of the server's reply
+
+        def delete_character_async(self, char_id):
+            self.requests[char_id] = Future()
+            return self.requests[char_id]
+
+    client = Client()
+    state = GameState.from_snapshot({"characters": [{"id": 7, "name": "Hero", "stats": {}},
+                                                    {"id": 8, "name": "Mage", "stats": {}}]})
+    manager = SceneManager(resolution.set_mode((480, 270), "Window"))
+    manager.register("character_selection", lambda screen: CharacterSelection(screen, state, client))
+    manager.push("character_selection")
+    selection = manager.top
+    selection.selected_slot = 0
+
+    selection.activate("delete_btn")
+    assert isinstance(manager.top, ConfirmPrompt)
+    selection.selected_slot = None  # e.g. reset by a state change while the prompt is open
+    manager.input.dispatch(manager, [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_y)])
+    assert manager.top is selection
+    assert list(client.requests) == [7]
+
+    selection.update()  # no reply yet: nothing changes, and nothing blocked
+    assert 7 in state.characters
+    client.requests[7].set_result({"action": "delete_character_ok"})
+    selection.update()
+    assert list(state.characters) == [8] and selection.selected_slot is None
+    assert [c.id for c in selection.characters] == [8] and list(selection.labels) == [8]
+
+
+def test_server_messages_reach_scenes_through_the_frame_loop(resolution):
+    from client.ui.character_creation import CharacterCreation
+    from client.ui.scenes import Scene, SceneManager
+    from network.dispatcher import MessageDispatcher
+    pygame.font.init()
+
+    class Client:
+        dispatcher = MessageDispatcher()
+
+    class Parent(Scene):
+        def enter(self, **params):
+            self.manager.push("character_creation")
+
+        def resume(self, result):
+            self.manager.pop(result)
+
+    client = Client()
+    manager = SceneManager(resolution.set_mode((160, 120), "Window"), dispatcher=client.dispatcher)
+    manager.register("character_creation", lambda screen: CharacterCreation(screen, client))
+    client.dispatcher.post({"action": "character_created", "character": {"name": "Hero"}})
+    assert manager.run(Parent()) == {"name": "Hero"}
+
+
+# ---------------- Hit-testing ----------------
+def test_hit_grid_rects_first_added_wins_and_set_rects_reuses():
+    from client.ui.hittest import HitGrid
+    grid = HitGrid()
+    grid.add("a", pygame.Rect(10, 10, 30, 20))
+    grid.add("b", (30, 25, 40, 40))  # overlaps "a" at (30..39, 25..29)
+    assert grid.at((10, 10)) == "a" and grid.at((39, 29)) == "a"
+    assert grid.at((40, 29)) == "b" and grid.at((69, 64)) == "b"
+    assert grid.at((70, 64)) is None and grid.at((9, 10)) is None
+
+    grid.set_rects([(0, pygame.Rect(0, 0, 5, 5))])
+    cells = grid._cells
+    grid.set_rects([(0, pygame.Rect(0, 0, 5, 5))])
+    assert grid._cells is cells and grid.at((4, 4)) == 0 and grid.at((30, 30)) is None
+
+
+def test_hit_grid_matches_linear_mask_scan(disk_cache, monkeypatch):
+    from client import config
+    from client.ui.character_selection import CharacterSelection
+    from core.game_state import GameState
+    pygame.font.init()
+    monkeypatch.setattr(config, "SCREEN_WIDTH", 320)
+    monkeypatch.setattr(config, "SCREEN_HEIGHT", 180)
+    selection = CharacterSelection(pygame.Surface((320, 180)), GameState(), client=None)
+
+    def linear(pos):  # the scan _get_field_at_pos used to do
+        for i, mask in enumerate(selection.masks["slots"]):
+            if mask.get_at(pos):
+                return f"slot{i}"
+        for name in ("start_btn", "delete_btn", "return_btn"):
+            if selection.masks[name].get_at(pos):
+                return name
+        return None
+
+    found = set()
+    for x in range(320):
+        for y in range(180):
+            field = selection._get_field_at_pos((x, y))
+            assert field == linear((x, y)), (x, y)
+            found.add(field)
+    assert len(found) == 1 + len(selection.focus_order)
+
+
+# ---------------- Input dispatch ----------------
+def test_input_dispatcher_coalesces_motion_and_routes_through_tables(resolution):
+    from client.ui.scenes import Scene, SceneManager
+    calls = []
+
+    class Stub(Scene):
+        keys = {pygame.K_a: "open_other"}
+
+        def __init__(self, name):
+            self.name = name
+
+        def hit_test(self, pos):
+            calls.append((self.name, "hit", pos))
+            return "left" if pos[0] < 50 else "right"
+
+        def hover(self, region):
+            calls.append((self.name, "hover", region))
+
+        def click(self, region, event):
+            calls.append((self.name, "click", region))
+
+        def key(self, event):
+            calls.append((self.name, "key", event.key))
+
+        def handle_event(self, event):
+            calls.append((self.name, "event", event.type))
+
+        def open_other(self):
+            calls.append((self.name, "open_other"))
+            self.manager.push(other)
+
+    def motion(x):
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, 5), rel=(1, 0), buttons=(0, 0, 0))
+
+    def keydown(key):
+        return pygame.event.Event(pygame.KEYDOWN, key=key, unicode="")
+
+    manager = SceneManager(pygame.display.get_surface())
+    main, other = Stub("main"), Stub("other")
+    manager.push(main)
+    dispatcher = manager.input
+
+    dispatcher.dispatch(manager, [motion(x) for x in range(10, 20)])
+    dispatcher.dispatch(manager, [motion(30)])  # same region: hit-tested, not re-hovered
+    assert calls == [("main", "hit", (19, 5)), ("main", "hover", "left"), ("main", "hit", (30, 5))]
+    assert dispatcher.motion_dropped == 9 and dispatcher.hover_changes == 1
+
+    calls.clear()
+    dispatcher.dispatch(manager, [keydown(pygame.K_b), motion(31),
+                                  pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(60, 5), button=1),
+                                  keydown(pygame.K_a), keydown(pygame.K_b),
+                                  pygame.event.Event(pygame.USEREVENT)])
+    assert calls == [
+        ("main", "key", pygame.K_b),
+        ("main", "hit", (31, 5)), ("main", "hover", "left"),  # a key press re-arms hover
+        ("main", "hit", (60, 5)), ("main", "click", "right"),
+        ("main", "open_other"),
+        ("other", "key", pygame.K_b), ("other", "event", pygame.USEREVENT),
+    ]
+    assert dispatcher.frames == 3 and dispatcher.events == 17
+    assert dispatcher.last_ms >= 0 and dispatcher.mean_ms == dispatcher.total_ms / 3